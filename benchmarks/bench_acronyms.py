@@ -0,0 +1,94 @@
+'''Throughput of `extract_acronyms` across document lengths and acronym counts.
+
+The synthetic documents are made of filler sentences in which acronyms are defined,
+e.g., "... the National Population Housing Census (NPHC) ...", and used again. The
+single-pass scanner is compared against the former approach that builds one regex
+alternation of all the acronyms of the document, which also checks that both find
+the same acronyms.
+
+Usage:
+    python benchmarks/bench_acronyms.py [MAX_CHARS] [MAX_ACRONYMS]
+'''
+import random
+import re
+import sys
+import time
+
+from wb_cleaning.extraction import acronyms
+
+FILLER = (
+    "The programme supports the livelihoods of refugees and host communities through "
+    "investment in infrastructure, education, and social protection while poverty declined. "
+)
+WORDS = ["Agency", "Bank", "Council", "Development", "Fund", "Global", "Housing", "International",
+         "Joint", "Knowledge", "Labour", "National", "Office", "Population", "Regional", "Trust"]
+
+
+def alternation_extract_acronyms(txt):
+    keyword = '|'.join([rf'\({k[1:-1]}\)' for k in acronyms.acronyms_pattern.findall(txt)])
+    pattern = re.compile("((?:[a-zA-ZÀ-ÖØ-öø-ÿа-ҳА-Ҳ'-]+ ){0,5})(" + keyword + ")")
+    detected_acronyms = {}
+
+    for candidate, acronym in pattern.findall(acronyms.whitespaces_pattern.sub(' ', txt)):
+        full_name = acronyms.get_full_name(candidate, acronym[1:-1])
+
+        if full_name is not None:
+            detected_acronyms[acronym[1:-1]] = full_name
+
+    return detected_acronyms
+
+
+def make_text(num_chars, num_acronyms, seed=1029):
+    rng = random.Random(seed)
+    definitions = []
+
+    for _ in range(num_acronyms):
+        words = rng.sample(WORDS, rng.randint(2, 5))
+        acronym = "".join(word[0] for word in words)
+        definitions.append(f"the {' '.join(words)} ({acronym}) ")
+
+    sentences = []
+    size = 0
+
+    while size < num_chars:
+        sentence = FILLER
+        if definitions and rng.random() < 0.5:
+            sentence = rng.choice(definitions) + sentence
+        sentences.append(sentence)
+        size += len(sentence)
+
+    return "".join(sentences)[:num_chars]
+
+
+def timeit(func, txt):
+    start = time.perf_counter()
+    result = func(txt)
+
+    return time.perf_counter() - start, result
+
+
+def main(max_chars=1_000_000, max_acronyms=1000):
+    num_chars = 10_000
+
+    while num_chars <= max_chars:
+        num_acronyms = 10
+
+        while num_acronyms <= max_acronyms:
+            txt = make_text(num_chars, num_acronyms)
+
+            scan_time, scanned = timeit(acronyms.extract_acronyms, txt)
+            alternation_time, expected = timeit(alternation_extract_acronyms, txt)
+
+            print(f"{num_chars:>10,} chars {num_acronyms:>5} acronyms: "
+                  f"scan={scan_time:.4f}s alternation={alternation_time:.4f}s "
+                  f"speedup={alternation_time / scan_time:.1f}x same={scanned == expected}")
+
+            num_acronyms *= 10
+
+        num_chars *= 10
+
+
+if __name__ == "__main__":
+    main(
+        max_chars=int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        max_acronyms=int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
@@ -0,0 +1,83 @@
+'''Comparison of the rule based entity recognizer against the statistical `ner`.
+
+For each alphabetical token, which are the only tokens the cleaner keeps, the
+reference label is whether the statistical model tags it with one of the
+excluded entity types. The precision and recall of the rule based recognizer
+are computed against this reference, together with the throughput of both.
+
+Usage:
+    python benchmarks/bench_entity_rules.py [TEXT_DIR] [MAX_DOCS]
+'''
+import glob
+import os
+import sys
+import time
+
+from wb_cleaning.cleaning import cleaner, entity_rules
+from wb_cleaning.types.cleaning import RULE_BASED_ENTITIES
+
+SAMPLE_TEXTS = [
+    "In 2019, about 30 percent of the US$2.5 billion commitments went to twelve countries.",
+    "The project will benefit two million people and create thousands of jobs.",
+    "Inflation reached 15 per cent while the budget deficit was 300 million dollars.",
+    "The meeting started at 10:30 am and lasted for three hours until noon.",
+    "One of the main objectives is to reduce poverty by half within five years.",
+    "Remittances of hundreds of millions of euros support over 20 % of households.",
+]
+
+EXCLUDED = {e.value for e in RULE_BASED_ENTITIES}
+
+
+def load_texts(text_dir=None, max_docs=100):
+    if text_dir is None:
+        return SAMPLE_TEXTS * 20
+
+    texts = []
+    for fname in sorted(glob.glob(os.path.join(text_dir, "*.txt")))[:max_docs]:
+        with open(fname, "rb") as fl:
+            texts.append(cleaner.BaseCleaner.normalize_text(
+                fl.read().decode("utf-8", errors="ignore")))
+
+    return texts
+
+
+def parse(nlp, texts, disable):
+    start = time.perf_counter()
+    docs = list(nlp.pipe(texts, disable=disable))
+
+    return docs, time.perf_counter() - start
+
+
+def excluded_tokens(doc):
+    return [token.is_alpha and token.ent_type_ in EXCLUDED for token in doc]
+
+
+def main(text_dir=None, max_docs=100):
+    nlp = cleaner.get_nlp()
+    cleaner.add_entity_ruler()
+    texts = load_texts(text_dir, max_docs)
+    num_chars = sum(len(text) for text in texts)
+
+    statistical, statistical_time = parse(
+        nlp, texts, disable=["parser", entity_rules.ENTITY_RULER_NAME])
+    rule_based, rule_based_time = parse(nlp, texts, disable=["parser", "ner"])
+
+    tp = fp = fn = 0
+    for ref_doc, doc in zip(statistical, rule_based):
+        for ref, pred in zip(excluded_tokens(ref_doc), excluded_tokens(doc)):
+            tp += ref and pred
+            fp += pred and not ref
+            fn += ref and not pred
+
+    precision = tp / (tp + fp) if tp + fp else 0
+    recall = tp / (tp + fn) if tp + fn else 0
+
+    print(f"Excluded alphabetical tokens: precision={precision:.3f} recall={recall:.3f} (tp={tp}, fp={fp}, fn={fn})")
+    print(f"statistical: {statistical_time:.3f}s ({num_chars / statistical_time:,.0f} chars/s)")
+    print(f"rule_based: {rule_based_time:.3f}s ({num_chars / rule_based_time:,.0f} chars/s)")
+
+
+if __name__ == "__main__":
+    main(
+        text_dir=sys.argv[1] if len(sys.argv) > 1 else None,
+        max_docs=int(sys.argv[2]) if len(sys.argv) > 2 else 100)
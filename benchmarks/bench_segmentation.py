@@ -0,0 +1,84 @@
+'''Throughput of `recover_segmented_words` on large OCR-like inputs.
+
+The input is either a text file, e.g., the raw text of a PDF, or a synthetic text
+made of paragraphs in which some of the words are fragmented by spaces as in the
+output of OCR. The text is repeated to the given sizes to check that the running
+time grows linearly, with and without the memoized splits of the fragments.
+
+Usage:
+    python benchmarks/bench_segmentation.py [TEXT_FILE|-] [MAX_CHARS]
+'''
+import random
+import sys
+import time
+
+from wb_cleaning.cleaning import segmentation
+
+PARAGRAPH = (
+    "Of the world's displaced people, the majority are hosted in developing countries. "
+    "The programme protected by unhcr supports the livelihoods of refugees and host "
+    "communities through investment in infrastructure, education, and social protection. "
+    "Government expenditure on agriculture increased while poverty declined in 2019."
+)
+
+
+def fragment(word, rng):
+    cuts = sorted(rng.sample(range(1, len(word)), k=min(len(word) - 1, rng.randint(1, 3))))
+    pieces = [word[start:end] for start, end in zip([0] + cuts, cuts + [len(word)])]
+
+    return " ".join(pieces)
+
+
+def make_text(num_chars, fragment_prob=0.1, seed=1029):
+    rng = random.Random(seed)
+    paragraphs = []
+    size = 0
+
+    while size < num_chars:
+        words = [fragment(word, rng) if len(word) > 3 and rng.random() < fragment_prob else word
+                 for word in PARAGRAPH.split()]
+        paragraphs.append(" ".join(words))
+        size += len(paragraphs[-1]) + 1
+
+    return "\n".join(paragraphs)[:num_chars]
+
+
+def run(text, cold=True):
+    if cold:
+        segmentation.split_fragment.cache_clear()
+
+    start = time.perf_counter()
+    segmentation.recover_segmented_words(text)
+
+    return time.perf_counter() - start
+
+
+def main(fname=None, max_chars=1_000_000):
+    if fname is not None:
+        with open(fname) as text_file:
+            base_text = text_file.read()
+    else:
+        base_text = make_text(max_chars)
+
+    # Warm up the compiled patterns.
+    segmentation.recover_segmented_words(base_text[:1000])
+
+    num_chars = 10_000
+
+    while num_chars <= max_chars:
+        text = (base_text * (num_chars // max(len(base_text), 1) + 1))[:num_chars]
+
+        cold = run(text, cold=True)
+        warm = run(text, cold=False)
+
+        print(f"{num_chars:>10,} chars: cold={cold:.3f}s ({num_chars / cold / 1e6:.2f}MB/s) "
+              f"warm={warm:.3f}s ({num_chars / warm / 1e6:.2f}MB/s) "
+              f"{segmentation.split_fragment.cache_info()}")
+
+        num_chars *= 10
+
+
+if __name__ == "__main__":
+    main(
+        fname=sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != "-" else None,
+        max_chars=int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
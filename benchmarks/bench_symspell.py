@@ -0,0 +1,91 @@
+'''Quality and latency of the SymSpell suggester against enchant's `suggest`.
+
+The held-out set is either a tab separated file of `misspelling<TAB>correct word`
+pairs, or misspellings generated with one or two random edits (deletion, insertion,
+substitution, transposition) of common words of development reports.
+
+For each suggester, this reports the fraction of misspellings whose correct word
+is the top suggestion, is in the top 5, and is picked by the respeller, together
+with the mean latency of a suggestion.
+
+Usage:
+    python benchmarks/bench_symspell.py [MISSPELLINGS_TSV] [NUM_WORDS]
+'''
+import random
+import string
+import sys
+import time
+
+from wb_cleaning.cleaning import respelling, symspell
+from wb_cleaning.interfaces import language
+
+SAMPLE_WORDS = [
+    "poverty", "development", "government", "infrastructure", "agriculture",
+    "education", "investment", "regression", "household", "employment",
+    "financial", "sustainable", "assessment", "environmental", "productivity",
+    "population", "institutional", "expenditure", "vulnerability", "governance",
+]
+
+
+def misspell(word, rng, num_edits=1):
+    for _ in range(num_edits):
+        i = rng.randrange(len(word))
+        edit = rng.choice(["delete", "insert", "substitute", "transpose"])
+
+        if edit == "delete" and len(word) > 3:
+            word = word[:i] + word[i + 1:]
+        elif edit == "insert":
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+        elif edit == "transpose" and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+
+    return word
+
+
+def load_pairs(fname=None, num_words=200, seed=1029):
+    if fname is not None:
+        with open(fname) as pairs_file:
+            return [tuple(line.rstrip("\n").split("\t")[:2]) for line in pairs_file if "\t" in line]
+
+    rng = random.Random(seed)
+    words = [rng.choice(SAMPLE_WORDS) for _ in range(num_words)]
+
+    return [(misspell(word, rng, rng.choice([1, 1, 2])), word) for word in words]
+
+
+def evaluate(name, suggest, pairs):
+    top1 = top5 = 0
+
+    start = time.perf_counter()
+    suggestions = [suggest(misspelled) for misspelled, _ in pairs]
+    elapsed = time.perf_counter() - start
+
+    for (_, correct), candidates in zip(pairs, suggestions):
+        candidates = [candidate.lower() for candidate in candidates]
+        top1 += bool(candidates) and candidates[0] == correct
+        top5 += correct in candidates[:5]
+
+    payloads = respelling.infer_correct_words_batch(
+        [misspelled for misspelled, _ in pairs], suggester=name)
+    respelled = sum((payload["correct_word"] or "").lower() == correct
+                    for payload, (_, correct) in zip(payloads, pairs))
+
+    print(f"{name}: top1={top1 / len(pairs):.3f} top5={top5 / len(pairs):.3f} "
+          f"respelled={respelled / len(pairs):.3f} latency={elapsed / len(pairs) * 1e6:,.0f}us")
+
+
+def main(fname=None, num_words=200):
+    pairs = load_pairs(fname, num_words)
+    en_dict = language.get_en_dict()
+    index = symspell.get_index()
+
+    evaluate("enchant", en_dict.suggest, pairs)
+    evaluate("symspell", index.lookup, pairs)
+
+
+if __name__ == "__main__":
+    main(
+        fname=sys.argv[1] if len(sys.argv) > 1 else None,
+        num_words=int(sys.argv[2]) if len(sys.argv) > 2 else 200)
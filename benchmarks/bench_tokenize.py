@@ -0,0 +1,58 @@
+'''Benchmark of the vectorized token filter of BaseCleaner against the per-token filter.
+
+Usage:
+    python benchmarks/bench_tokenize.py [TEXT_DIR] [MAX_DOCS]
+'''
+import glob
+import os
+import sys
+import timeit
+
+from wb_cleaning import dir_manager
+from wb_cleaning.cleaning import cleaner
+from wb_cleaning.types.cleaning import CleaningConfig
+from wb_cleaning.utils.scripts import load_config
+
+SAMPLE_TEXT = """The World Bank Group works in every major area of development.
+It provides a wide array of financial products and technical assistance,
+and it helps countries share and apply innovative knowledge and solutions
+to the challenges they face. In 2019, about 30 percent of the US$2.5 billion
+commitments went to 12 countries in Sub-Saharan Africa. """
+
+
+def load_texts(text_dir=None, max_docs=20):
+    if text_dir is None:
+        return [SAMPLE_TEXT * 200] * max_docs
+
+    texts = []
+    for fname in sorted(glob.glob(os.path.join(text_dir, "*.txt")))[:max_docs]:
+        with open(fname, "rb") as fl:
+            texts.append(fl.read().decode("utf-8", errors="ignore"))
+
+    return texts
+
+
+def main(text_dir=None, max_docs=20, repeat=5):
+    config = load_config(dir_manager.get_configs_dir(
+        'cleaning', 'default.yml'), 'cleaning_config')
+    config = CleaningConfig(**config).dict()
+
+    bc = cleaner.BaseCleaner(config=config)
+    docs = [bc.text_to_doc(text) for text in load_texts(text_dir, max_docs)]
+    n_tokens = sum(len(doc) for doc in docs)
+
+    for doc in docs:
+        assert bc._tokenize_tokens(doc) == bc._tokenize_array(doc)
+
+    for name in ["_tokenize_tokens", "_tokenize_array"]:
+        method = getattr(bc, name)
+        elapsed = min(timeit.repeat(
+            lambda: [method(doc) for doc in docs], number=1, repeat=repeat))
+        print(f"{name}: {elapsed:.4f}s for {len(docs)} docs / {n_tokens} tokens "
+              f"({n_tokens / elapsed:,.0f} tokens/s)")
+
+
+if __name__ == "__main__":
+    main(
+        text_dir=sys.argv[1] if len(sys.argv) > 1 else None,
+        max_docs=int(sys.argv[2]) if len(sys.argv) > 2 else 20)
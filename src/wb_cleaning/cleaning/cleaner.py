@@ -1,91 +1,299 @@
 """Main cleaner module.
 """
+from __future__ import annotations
 
+import functools
 import glob
+import itertools
+import json
+import hashlib
+import multiprocessing
 import os
 import pickle
 import re
 import warnings
-from collections import Counter
-from typing import Callable, Generator, Optional
-from gensim.utils import simple_preprocess
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Callable, Generator, Iterable, Optional
 
-import spacy
-from spacy.tokens import Doc
 import numpy as np
 
-from spacy_langdetect import LanguageDetector, spacy_langdetect
-
-import fasttext
-from polyglot.detect import Detector
-
-from wb_cleaning.cleaning import stopwords, respelling
+from wb_cleaning.cleaning import stopwords, respelling, entity_rules
 from wb_cleaning.extraction import phrase
 # from wb_cleaning.extraction import extractor
 from wb_cleaning import dir_manager
+from wb_cleaning.ops import resources
+from wb_cleaning.ops.disk_cache import DiskCache, make_cache_key
+from wb_cleaning.processing.doc_store import SpillingDocCache, TokenIdCorpus
+from wb_cleaning.processing.manifest import CorpusManifest
 
-# Download fasttext language model from: https://dl.fbaipublicfiles.com/fasttext/supervised-models/lid.176.ftz
-FASTTEXT_LANG_MODEL = None
+if TYPE_CHECKING:
+    # spaCy and the language detection libraries are imported by the loaders on first use.
+    import spacy
 
 
-def fasttext_detect_language(spacy_object):
-    global FASTTEXT_LANG_MODEL
+def _load_fasttext_lang_model():
+    import fasttext
+
+    # Download fasttext language model from: https://dl.fbaipublicfiles.com/fasttext/supervised-models/lid.176.ftz
+    return fasttext.load_model(
+        dir_manager.get_path_from_root("models", "fasttext", "lid.176.ftz"))
+
+
+resources.register("fasttext_lang_model", _load_fasttext_lang_model)
 
-    if FASTTEXT_LANG_MODEL is None:
-        FASTTEXT_LANG_MODEL = fasttext.load_model(
-            dir_manager.get_path_from_root("models", "fasttext", "lid.176.ftz"))
 
-    ln, sc = FASTTEXT_LANG_MODEL.predict(spacy_object.text)
+def _get_text(spacy_object) -> str:
+    # The language detectors accept raw strings as well as spacy objects
+    # so that the language can be checked before parsing the text.
+    return spacy_object if isinstance(spacy_object, str) else spacy_object.text
+
+
+def fasttext_detect_language(spacy_object):
+    ln, sc = resources.get("fasttext_lang_model").predict(
+        _get_text(spacy_object))
     ln = ln[0].split('__')[-1]
     sc = sc[0]
     return {"language": str(ln), "score": float(sc)}
 
 
 def polyglot_detect_language(spacy_object):
+    from polyglot.detect import Detector
+
     lang = Detector(
-        ''.join(x for x in spacy_object.text if x.isprintable()), quiet=True)
+        ''.join(x for x in _get_text(spacy_object) if x.isprintable()), quiet=True)
     lang = lang.language
 
     return {"language": lang.code, "score": float(lang.confidence / 100)}
 
 
+def langdetect_detect_language(spacy_object):
+    # Same as `spacy_langdetect._detect_language` but also works on strings.
+    from langdetect import detect_langs
+
+    detected_language = detect_langs(_get_text(spacy_object))[0]
+
+    return {"language": str(detected_language.lang), "score": float(detected_language.prob)}
+
+
 def hybrid_detect_language(spacy_object):
+    from polyglot.detect import Detector
+
     lang = Detector(
-        ''.join(x for x in spacy_object.text if x.isprintable()), quiet=True)
+        ''.join(x for x in _get_text(spacy_object) if x.isprintable()), quiet=True)
     if lang.reliable:
         lang = lang.language
         data = {"language": lang.code, "score": float(lang.confidence / 100)}
     else:
-        data = spacy_langdetect._detect_language(spacy_object)
+        data = langdetect_detect_language(spacy_object)
 
     return data
 
 
-class DocLanguageDetector(LanguageDetector):
-    """Derived class from the `spacy_langdetect` module.
-    This is done because we don't use the dependency parser for performance
-    but the library is dependent on it. There's no use-case for sentence level
-    language detection anyway, so let's just do doc level detection.
+LANGUAGE_DETECTORS = {
+    "fasttext": fasttext_detect_language,
+    "polyglot": polyglot_detect_language,
+    "hybrid": hybrid_detect_language,
+}
+
+
+def sample_text(text: str, sample_size: Optional[int] = None) -> str:
+    """Returns a window of at most `sample_size` characters taken from the middle of the text.
+
+    The middle of a document is usually more representative of its language
+    than the cover page or the references. The window is trimmed to whitespace
+    so that words are not cut.
     """
+    if sample_size is None or len(text) <= sample_size:
+        return text
 
-    def __call__(self, doc):
-        assert isinstance(
-            doc, Doc), "doc must be an instance of spacy Doc. But got a {}".format(type(doc))
-        doc.set_extension(
-            "language", getter=self._language_detection_function, force=True)
+    start = (len(text) - sample_size) // 2
+    window = text[start:start + sample_size]
 
-        return doc
+    first, last = window.find(" "), window.rfind(" ")
+    if first < last:
+        window = window[first + 1:last]
+
+    return window
+
+
+@functools.lru_cache(maxsize=1)
+def _get_doc_language_detector_class():
+    # The class derives from `spacy_langdetect` which imports spaCy, so it is only defined on first use.
+    from spacy.tokens import Doc
+    from spacy_langdetect import LanguageDetector
+
+    class DocLanguageDetector(LanguageDetector):
+        """Derived class from the `spacy_langdetect` module.
+        This is done because we don't use the dependency parser for performance
+        but the library is dependent on it. There's no use-case for sentence level
+        language detection anyway, so let's just do doc level detection.
+        """
+
+        def __init__(self, language_detection_function=None):
+            super().__init__(language_detection_function)
+
+            # Register the extension eagerly so that docs returned by `nlp.pipe`
+            # with `n_process > 1` can still access `doc._.language` in the
+            # parent process.
+            Doc.set_extension(
+                "language", getter=self._language_detection_function, force=True)
+
+        def __call__(self, doc):
+            assert isinstance(
+                doc, Doc), "doc must be an instance of spacy Doc. But got a {}".format(type(doc))
+            doc.set_extension(
+                "language", getter=self._language_detection_function, force=True)
+
+            return doc
+
+    # Pickled by reference to the module attribute, e.g., when sent to the `nlp.pipe` workers.
+    DocLanguageDetector.__module__ = __name__
+    DocLanguageDetector.__qualname__ = "DocLanguageDetector"
+
+    return DocLanguageDetector
 
 
 # https://spacy.io/api/annotation
 POS_TAGS = ["POS", "ADJ", "ADP", "ADV", "AUX", "CONJ", "CCONJ", "DET", "INTJ", "NOUN",
             "NUM", "PART", "PRON", "PROPN", "PUNCT", "SCONJ", "SYM", "VERB", "X", "SPACE", ]
 MAX_LENGTH = 1000000
+PIPE_BATCH_SIZE = 32
+WHITESPACES_PATTERN = re.compile(r"\s+")
+
+
+def _load_nlp():
+    import spacy
+
+    nlp = spacy.load("en_core_web_sm", disable=["parser"])
+    nlp.Defaults.stop_words |= set(stopwords.stopwords)
+    nlp.add_pipe(_get_doc_language_detector_class()(hybrid_detect_language),
+                 name='language_detector', last=True)
+
+    return nlp
+
+
+resources.register("nlp", _load_nlp)
+
+
+def get_nlp():
+    """Returns the spaCy pipeline used by the cleaners. The model is loaded on first use.
+    """
+    return resources.get("nlp")
+
+
+def add_entity_ruler():
+    """Adds the pattern based `entity_ruler` to the shared pipeline, if not yet added.
+
+    The ruler is only added once a cleaner uses the `rule_based` entity recognizer.
+    Only one of `ner` or the `entity_ruler` runs for a cleaner, see `get_disabled_pipes`,
+    and the ruler is disabled by default in `BaseCleaner.text_to_doc` so that it
+    doesn't overwrite the entities of `ner`.
+    """
+    nlp = get_nlp()
+
+    if entity_rules.ENTITY_RULER_NAME not in nlp.pipe_names:
+        nlp.add_pipe(entity_rules.create_entity_ruler(nlp),
+                     name=entity_rules.ENTITY_RULER_NAME, before="language_detector")
+
+
+@functools.lru_cache(maxsize=1)
+def get_token_filter_attrs() -> list:
+    """Attributes of the tokens used by the vectorized token filter in `BaseCleaner._tokenize_array`.
+    """
+    from spacy.attrs import IS_ALPHA, LENGTH, POS, ENT_TYPE, IS_STOP, LEMMA, LOWER
 
-nlp = spacy.load("en_core_web_sm", disable=["parser"])
-nlp.Defaults.stop_words |= set(stopwords.stopwords)
-nlp.add_pipe(DocLanguageDetector(hybrid_detect_language),
-             name='language_detector', last=True)
+    return [IS_ALPHA, LENGTH, POS, ENT_TYPE, IS_STOP, LEMMA, LOWER]
+
+
+def __getattr__(name):
+    # Keep `cleaner.nlp` and the other module attributes depending on
+    # spaCy or on the models available without loading them at import.
+    if name == "nlp":
+        return get_nlp()
+
+    if name == "TOKEN_FILTER_ATTRS":
+        return get_token_filter_attrs()
+
+    if name == "DocLanguageDetector":
+        return _get_doc_language_detector_class()
+
+    if name == "FASTTEXT_LANG_MODEL":
+        warnings.warn(
+            "`cleaner.FASTTEXT_LANG_MODEL` is deprecated, use `resources.get('fasttext_lang_model')`.",
+            DeprecationWarning, stacklevel=2)
+        return resources.get("fasttext_lang_model")
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+PARAGRAPH_SEP_PATTERN = re.compile(r"\n\s*\n")
+SENTENCE_SEP_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def _pack_pieces(pieces: Iterable[str], sep: str, max_length: int) -> Generator[str, None, None]:
+    """Greedily concatenates consecutive pieces into chunks of at most `max_length` characters.
+    """
+    chunk = []
+    chunk_length = 0
+
+    for piece in pieces:
+        if chunk and chunk_length + len(sep) + len(piece) > max_length:
+            yield sep.join(chunk)
+            chunk = []
+            chunk_length = 0
+
+        chunk.append(piece)
+        chunk_length += len(piece) + (len(sep) if len(chunk) > 1 else 0)
+
+    if chunk:
+        yield sep.join(chunk)
+
+
+def _split_long_piece(piece: str, max_length: int) -> Generator[str, None, None]:
+    """Splits a piece of text without a sentence boundary at whitespaces.
+    """
+    while len(piece) > max_length:
+        split_at = piece.rfind(" ", 0, max_length)
+        if split_at <= 0:
+            split_at = max_length
+
+        yield piece[:split_at]
+        piece = piece[split_at:].lstrip()
+
+    yield piece
+
+
+def _iter_text_pieces(text: str, max_length: int) -> Generator[str, None, None]:
+    """Yields paragraphs, or sentences for paragraphs longer than `max_length`.
+    """
+    for paragraph in PARAGRAPH_SEP_PATTERN.split(text):
+        if len(paragraph) <= max_length:
+            yield paragraph
+            continue
+
+        for sentence in SENTENCE_SEP_PATTERN.split(paragraph):
+            yield from _split_long_piece(sentence, max_length)
+
+
+def split_text_into_chunks(text: str, max_length: int) -> Generator[str, None, None]:
+    """Splits a text into chunks of at most `max_length` characters.
+
+    Paragraph boundaries are preferred, then sentence boundaries, and as a last
+    resort whitespaces. Consecutive paragraphs are packed together up to
+    `max_length` so that short paragraphs don't end up as tiny documents.
+    At least one chunk is always generated.
+    """
+    if len(text) <= max_length:
+        yield text
+        return
+
+    chunks = _pack_pieces(
+        (piece for piece in _iter_text_pieces(text, max_length) if piece.strip()),
+        sep="\n\n", max_length=max_length)
+
+    # A text made only of whitespaces has no pieces.
+    yield next(chunks, "")
+    yield from chunks
 
 
 def expand_acronyms(text: str) -> str:
@@ -94,11 +302,38 @@ def expand_acronyms(text: str) -> str:
     return text
 
 
+def get_config_hash(config: dict) -> str:
+    """Computes the md5 hash of the json of the config with sorted keys.
+
+    Unlike the `cleaning_config_id`, which hashes the sorted characters of the
+    config, configs differing only by swapped values get different hashes.
+    """
+    return hashlib.md5(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _enum_value(value):
+    # Config values may either be plain strings or the str enums in `wb_cleaning.types.cleaning`.
+    return getattr(value, "value", value)
+
+
 class BaseCleaner:
-    def __init__(self, config: dict, extractors: Optional[list] = None, logger=None) -> None:
+    def __init__(self, config: dict, extractors: Optional[list] = None, logger=None,
+                 language_detector: str = "hybrid", language_sample_size: Optional[int] = None,
+                 vectorized_tokenize: bool = True, output_cache: Optional[DiskCache] = None) -> None:
 
         self.set_config(config)
 
+        if language_detector not in LANGUAGE_DETECTORS:
+            raise ValueError(
+                f'Unexpected `language_detector` {language_detector}. Accepted values: {sorted(LANGUAGE_DETECTORS)}...')
+
+        # The language is checked on the raw text before parsing so that
+        # documents in invalid languages don't go through the spaCy pipeline.
+        self.detect_language = LANGUAGE_DETECTORS[language_detector]
+        self.language_sample_size = language_sample_size
+        # Counts of the (language, accepted) decisions of the language filter.
+        self.language_decisions = Counter()
+
         self.include_pos = (
             set(self.config['cleaner']['params']['pos_tags']) if
             self.config['cleaner']['flags']['include_pos_tags'] else set())
@@ -109,6 +344,17 @@ class BaseCleaner:
 
         self.min_token_length = self.config['cleaner']['params']['min_token_length']
         self.max_token_length = self.config['cleaner']['params']['max_token_length']
+
+        from spacy.parts_of_speech import IDS as POS_IDS
+
+        # Ids used by the vectorized token filter in `_tokenize_array`.
+        self.vectorized_tokenize = vectorized_tokenize
+        self.include_pos_ids = np.array(
+            sorted(POS_IDS[_enum_value(pos)] for pos in self.include_pos), dtype=np.uint64)
+        self.exclude_entity_ids = np.array(
+            sorted(get_nlp().vocab.strings.add(_enum_value(ent)) for ent in self.exclude_entities), dtype=np.uint64)
+        self.data_id = get_nlp().vocab.strings.add("data")
+
         self.extractors = (
             extractors or []
         )  # extractor.CountryExtractor(nlp, lower=True)
@@ -116,18 +362,41 @@ class BaseCleaner:
         self.spelling_model = respelling.SpellingModels(config)
         self.logger = logger
 
+        # Persistent cache of the cleaned outputs keyed by the text and the `config_hash`.
+        self.output_cache = output_cache
+        self.config_hash = get_config_hash(self.config)
+        self.cleaning_config_id = self.config.get("cleaning_config_id") or self.config_hash
+
+    def __getstate__(self):
+        # The spelling models hold enchant objects that can't be pickled.
+        # These are rebuilt when unpickled, e.g., once in each worker process.
+        state = self.__dict__.copy()
+        state["spelling_model"] = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.spelling_model = respelling.SpellingModels(self.config)
+
     @staticmethod
-    def text_to_doc(text: str) -> spacy.tokens.doc.Doc:
-        """Performs basic normalization and converts text to spacy document.
+    def normalize_text(text: str) -> str:
+        """Performs basic normalization of the text prior to parsing.
 
         NOTE:
             Don't make the text here in lower case since we need to preserve
             the case for the extractors.
 
+        """
+        return BaseCleaner.normalize_characters(WHITESPACES_PATTERN.sub(" ", text))
+
+    @staticmethod
+    def normalize_characters(text: str) -> str:
+        """Completes `normalize_text` for a text whose whitespaces are already
+        collapsed into single spaces.
         """
         text = (
-            text.replace("\n", " ")
-            .replace("’", "'")
+            text.replace("’", "'")
             .replace("“", '"')
             .replace("”", '"')
         )
@@ -136,11 +405,47 @@ class BaseCleaner:
         text = re.sub(r"(?i)\bcovid19\b", "covid", text)
         text = re.sub(r"(?i)\bcovid\b", "covid", text)
 
-        text = re.sub(r"\s+", " ", text).strip()[:MAX_LENGTH]
-        doc = nlp(text)
+        return text.strip()[:MAX_LENGTH]
+
+    @staticmethod
+    def text_to_doc(text: str, disable: Optional[list] = None) -> spacy.tokens.doc.Doc:
+        """Performs basic normalization and converts text to spacy document.
+
+        The `entity_ruler` is disabled unless `disable` is given.
+        """
+        if disable is None:
+            disable = [entity_rules.ENTITY_RULER_NAME]
+
+        doc = get_nlp()(BaseCleaner.normalize_text(text), disable=disable)
 
         return doc
 
+    def get_disabled_pipes(self) -> list:
+        """Derives the spaCy components that are not needed by the config.
+
+        NOTE:
+            The tagger is always kept since the lemmas in spaCy 2 depend on the
+            POS tags, and the lemmas are the output of the cleaner. The entities
+            are only needed if entity types are excluded. These are recognized
+            either by the statistical `ner` or by the pattern based `entity_ruler`.
+
+        """
+        required = {"tagger", "language_detector"}
+
+        if self.exclude_entities:
+            if _enum_value(self.config["cleaner"]["params"]["entity_recognizer"]) == "rule_based":
+                add_entity_ruler()
+                required.add(entity_rules.ENTITY_RULER_NAME)
+            else:
+                required.add("ner")
+
+        return [name for name in get_nlp().pipe_names if name not in required]
+
+    @property
+    def disabled_pipes(self) -> list:
+        # Derived on use since the `entity_ruler` may be added to the shared pipeline by another cleaner.
+        return self.get_disabled_pipes()
+
     def set_config(self, config):
         """Sets the config to instance.
         """
@@ -155,6 +460,12 @@ class BaseCleaner:
         return doc
 
     def _tokenize(self, doc: spacy.tokens.doc.Doc) -> list:
+        if self.vectorized_tokenize:
+            return self._tokenize_array(doc)
+
+        return self._tokenize_tokens(doc)
+
+    def _tokenize_tokens(self, doc: spacy.tokens.doc.Doc) -> list:
         tokens = [
             token.lemma_.lower() if token.lower_ != "data" else "data"
             for token in doc
@@ -163,15 +474,55 @@ class BaseCleaner:
 
         return tokens
 
-    def get_clean_tokens(self, text: str) -> list:
-        """Method for cleaning text strings typically read from text files.
+    def _tokenize_array(self, doc: spacy.tokens.doc.Doc) -> list:
+        """Vectorized equivalent of `_tokenize_tokens`.
 
-        Returns:
-            lists of clean tokens
+        The attributes needed by `_is_valid_token` are pulled with a single
+        `doc.to_array` call and the filters are applied as a numpy mask.
+        The lemmas of the surviving tokens are then converted to strings
+        once per unique lemma.
+        """
+        if len(doc) == 0:
+            return []
+
+        attrs = doc.to_array(get_token_filter_attrs())
+
+        lengths = attrs[:, 1]
+        mask = attrs[:, 0].astype(bool)
+        mask &= (lengths >= self.min_token_length) & (
+            lengths <= self.max_token_length)
+
+        if self.include_pos:
+            mask &= np.isin(attrs[:, 2], self.include_pos_ids)
+
+        if self.exclude_entities:
+            mask &= ~np.isin(attrs[:, 3], self.exclude_entity_ids)
+
+        if self.config["cleaner"]['flags']["filter_stopwords"]:
+            mask &= ~attrs[:, 4].astype(bool)
+
+        token_ids = np.flatnonzero(mask)
+        lemma_ids, inverse = np.unique(
+            attrs[token_ids, 5], return_inverse=True)
+
+        lemmas = np.array(
+            [doc.vocab.strings[int(lemma_id)].lower() if lemma_id else None
+             for lemma_id in lemma_ids], dtype=object)[inverse]
+
+        lemmas[attrs[token_ids, 6] == self.data_id] = "data"
+
+        # Lemmas not yet assigned in the doc are resolved by the token.
+        for i in np.flatnonzero(lemmas == None):  # noqa: E711
+            lemmas[i] = doc[int(token_ids[i])].lemma_.lower()
+
+        return lemmas.tolist()
+
+    def _preprocess_text(self, text: str) -> str:
+        """Applies the text level transformations prior to parsing.
         """
         # Fix not properly parsed tokens.
         if self.config["cleaner"]["flags"]["fix_fragmented_tokens"]:
-            text = self.spelling_model.recover_segmented_words(
+            text = self.spelling_model.recover_segmented_words_with_model(
                 text, max_len=self.config["cleaner"]["params"]["fragmented_token_max_len"]
             )
 
@@ -179,31 +530,255 @@ class BaseCleaner:
             # Expand acronyms
             text = expand_acronyms(text)
 
-        doc = BaseCleaner.text_to_doc(text)
-        doc_lang = doc._.language
-
-        if self.config["cleaner"]["flags"]["filter_language"]:
-            lang_score = {
-                lang["lang"]: lang["score"] for lang in self.config["cleaner"]["params"]["languages"]}
-            # Return empty list if language is not valid.
-            if not (
-                (doc_lang["language"] in lang_score) and
-                    (doc_lang["score"] >= lang_score[doc_lang["language"]])):
-                if self.logger is not None:
-                    self.logger.debug(
-                        'Text is not in valid language (`%s`)...', doc_lang["language"])
-                return []
+        return text
+
+    def _is_valid_language(self, doc_lang: dict) -> bool:
+        """Checks the detected language of a document against the configured languages.
+        """
+        if not self.config["cleaner"]["flags"]["filter_language"]:
+            return True
+
+        lang_score = {
+            lang["lang"]: lang["score"] for lang in self.config["cleaner"]["params"]["languages"]}
+
+        is_valid = (
+            (doc_lang["language"] in lang_score) and
+            (doc_lang["score"] >= lang_score[doc_lang["language"]]))
+
+        if not is_valid and self.logger is not None:
+            self.logger.debug(
+                'Text is not in valid language (`%s`)...', doc_lang["language"])
+
+        return is_valid
+
+    def get_language(self, text: str) -> dict:
+        """Detects the language of the raw text.
+        """
+        return self._detect_normalized_language(BaseCleaner.normalize_text(text))
+
+    def _detect_normalized_language(self, normalized_text: str) -> dict:
+        return self.detect_language(
+            sample_text(normalized_text, self.language_sample_size))
+
+    def check_language(self, text: str, doc_lang: Optional[dict] = None) -> bool:
+        """Checks the language of the raw text before it gets parsed.
+
+        The decision is recorded in `language_decisions`.
 
+        Returns:
+            True if the language filter is disabled or the text is in a valid language.
+        """
+        if not self.config["cleaner"]["flags"]["filter_language"]:
+            return True
+
+        if doc_lang is None:
+            doc_lang = self.get_language(text)
+
+        is_valid = self._is_valid_language(doc_lang)
+
+        self.language_decisions[(doc_lang["language"], is_valid)] += 1
+
+        return is_valid
+
+    def _split_text(self, text: str) -> Iterable[str]:
+        """Splits long texts into chunks if `chunk_long_documents` is set.
+        """
+        if self.config["cleaner"]["flags"]["chunk_long_documents"]:
+            return split_text_into_chunks(
+                text, self.config["cleaner"]["params"]["max_chunk_length"])
+
+        return [text]
+
+    def text_to_docs(self, text: str, batch_size: int = PIPE_BATCH_SIZE,
+                     normalized_text: Optional[str] = None) -> Generator[spacy.tokens.doc.Doc, None, None]:
+        """Converts text to a stream of spacy documents.
+
+        If `chunk_long_documents` is set, texts longer than `max_chunk_length` are
+        split at paragraph or sentence boundaries and the chunks are streamed
+        through `nlp.pipe` instead of truncating the text to `MAX_LENGTH`.
+        This keeps the memory bounded regardless of the size of the text.
+
+        The `normalized_text`, if already computed from `text`, is parsed
+        directly when the text is not split into chunks.
+        """
+        flags = self.config["cleaner"]["flags"]
+
+        if normalized_text is not None and not (
+                flags["chunk_long_documents"] and
+                len(text) > self.config["cleaner"]["params"]["max_chunk_length"]):
+            texts = [normalized_text]
+        else:
+            texts = (BaseCleaner.normalize_text(chunk)
+                     for chunk in self._split_text(text))
+
+        return get_nlp().pipe(
+            texts, batch_size=batch_size, disable=self.disabled_pipes)
+
+    def _doc_to_tokens(self, doc: spacy.tokens.doc.Doc) -> list:
+        """Generates the valid tokens from an already parsed document.
+        """
         if self.config["cleaner"]["flags"]["tag_whitelisted_entities"]:
             doc = self._apply_extractors(doc)
 
-        tokens = self._tokenize(doc)
+        return self._tokenize(doc)
 
+    def _finalize_tokens(self, tokens: list) -> list:
+        """Applies the respelling and final removal of stop words to the tokens of a document.
+        """
         if self.config["cleaner"]["flags"]["correct_misspelling"]:
             tokens = self.spelling_model.fix_spellings(tokens)
 
         # Final removal of stop words
-        return [token for token in tokens if token not in nlp.Defaults.stop_words]
+        stop_words = get_nlp().Defaults.stop_words
+
+        return [token for token in tokens if token not in stop_words]
+
+    def _finalize_tokens_batch(self, docs_tokens: list) -> list:
+        """Batched version of `_finalize_tokens`.
+
+        The misspelled words of all the documents are resolved at once.
+        """
+        if self.config["cleaner"]["flags"]["correct_misspelling"]:
+            docs_tokens = self.spelling_model.fix_spellings_batch(docs_tokens)
+
+        stop_words = get_nlp().Defaults.stop_words
+
+        return [[token for token in tokens if token not in stop_words] for tokens in docs_tokens]
+
+    def get_extractors_id(self) -> str:
+        """Identifies the `extractors` by the qualified names of their functions or classes.
+        """
+        return ",".join(
+            f"{getattr(extractor, '__module__', '')}."
+            f"{getattr(extractor, '__qualname__', type(extractor).__qualname__)}"
+            for extractor in self.extractors)
+
+    def get_output_cache_key(self, text: str, method: str) -> Optional[str]:
+        """Computes the key of the text in the `output_cache`, if set.
+
+        The key is derived from the content of the text, the `config_hash`,
+        the method generating the output, the `extractors`, and the language
+        detection settings.
+        """
+        if self.output_cache is None:
+            return None
+
+        return make_cache_key(
+            text, self.config_hash, method, self.get_extractors_id(),
+            self.detect_language.__name__, str(self.language_sample_size))
+
+    def get_clean_tokens(self, text: str) -> list:
+        """Method for cleaning text strings typically read from text files.
+
+        Returns:
+            lists of clean tokens
+        """
+        return next(self.generate_clean_tokens([text], batch_size=1))
+
+    def _iter_pipe_inputs(self, texts: Iterable[str]) -> Generator[tuple, None, None]:
+        """Yields the normalized texts (or chunks of texts) with a context
+        containing the index of the text, its key in the `output_cache`,
+        and the clean tokens if these are already known.
+
+        Texts in invalid languages or found in the `output_cache` are replaced
+        by an empty string to keep the order of the outputs aligned with the inputs.
+        """
+        for index, text in enumerate(texts):
+            key = self.get_output_cache_key(text, "get_clean_tokens")
+
+            if key is not None:
+                tokens = self.output_cache.get(key)
+
+                if tokens is not None:
+                    yield "", (index, None, tokens)
+                    continue
+
+            if not self.check_language(text):
+                if key is not None:
+                    self.output_cache.set(key, [])
+
+                yield "", (index, None, [])
+                continue
+
+            for chunk in self._split_text(self._preprocess_text(text)):
+                yield BaseCleaner.normalize_text(chunk), (index, key, None)
+
+    def generate_clean_tokens(
+            self, texts: Iterable[str], batch_size: int = PIPE_BATCH_SIZE,
+            n_process: int = 1) -> Generator[list, None, None]:
+        """Cleans a stream of texts using spaCy's batched `nlp.pipe`.
+
+        The documents are parsed in batches of `batch_size` and optionally
+        across `n_process` worker processes. The clean tokens are yielded
+        in the same order as the input texts.
+
+        Args:
+            texts:
+                Iterable of raw text strings.
+            batch_size:
+                Number of texts buffered and parsed together by spaCy.
+            n_process:
+                Number of processes used by spaCy to parse the texts.
+
+        Returns:
+            A generator of lists of clean tokens, one for each input text.
+
+        """
+        docs = get_nlp().pipe(
+            self._iter_pipe_inputs(texts), as_tuples=True,
+            batch_size=batch_size, n_process=n_process, disable=self.disabled_pipes)
+
+        # Tokens and cache keys of the texts waiting for the batched respelling.
+        # The key is None if the tokens are already final.
+        pending = []
+
+        # Chunks of the same text are contiguous so we can group them by the text index.
+        for _, text_docs in itertools.groupby(docs, key=lambda doc_context: doc_context[1][0]):
+            doc, (_, key, tokens) = next(text_docs)
+
+            if tokens is None:
+                tokens = self._doc_to_tokens(doc)
+                for doc, _ in text_docs:
+                    tokens.extend(self._doc_to_tokens(doc))
+
+                pending.append((tokens, key, False))
+            else:
+                pending.append((tokens, None, True))
+
+            if len(pending) >= batch_size:
+                yield from self._finalize_pending(pending)
+                pending = []
+
+        yield from self._finalize_pending(pending)
+
+    def _finalize_pending(self, pending: list) -> list:
+        """Finalizes the tokens of a batch of texts and stores them in the `output_cache`.
+        """
+        finalized = iter(self._finalize_tokens_batch(
+            [tokens for tokens, _, is_final in pending if not is_final]))
+
+        docs_tokens = []
+        for tokens, key, is_final in pending:
+            if not is_final:
+                tokens = next(finalized)
+
+                if key is not None:
+                    self.output_cache.set(key, tokens)
+
+            docs_tokens.append(tokens)
+
+        return docs_tokens
+
+    def get_clean_tokens_batch(
+            self, texts: Iterable[str], batch_size: int = PIPE_BATCH_SIZE,
+            n_process: int = 1) -> list:
+        """Batched version of `get_clean_tokens`.
+
+        Returns:
+            list of lists of clean tokens in the same order as `texts`
+        """
+        return list(self.generate_clean_tokens(
+            texts, batch_size=batch_size, n_process=n_process))
 
     def get_clean_text(self, text: str) -> str:
         """Cleans a given text.
@@ -212,23 +787,184 @@ class BaseCleaner:
 
     def get_tokens_and_phrases(self, text: str, return_phrase_count: bool = False) -> dict:
         """This method parses and extracts phrases from texts based on POS which uses SpaCy.
+
+        The text goes through the same preprocessing as in `get_clean_tokens`.
         """
-        doc = BaseCleaner.text_to_doc(text)
-        doc = self._apply_extractors(doc)
+        key = self.get_output_cache_key(
+            text, f"get_tokens_and_phrases:{return_phrase_count}")
+
+        if key is not None:
+            tokens_and_phrases = self.output_cache.get(key)
+
+            if tokens_and_phrases is not None:
+                return tokens_and_phrases
+
         tokens = []
+        phrases = []
+
+        for doc in self.text_to_docs(self._preprocess_text(text)):
+            phrases.extend(self._get_doc_phrases(self._apply_extractors(doc), tokens))
+
+        tokens_and_phrases = self._make_tokens_and_phrases(
+            tokens, phrases, return_phrase_count, key)
 
-        # tokens = self._tokenize(doc)
-        phrases = phrase.get_spacy_phrases(
+        return tokens_and_phrases
+
+    def _get_doc_phrases(self, doc: spacy.tokens.doc.Doc, token_container: list) -> list:
+        """Extracts the phrases of a parsed document, the valid tokens are added to `token_container`.
+        """
+        return phrase.get_spacy_phrases(
             doc,
             min_token_length=self.min_token_length,
             token_func=self._is_valid_token,
-            token_container=tokens,
+            token_container=token_container,
         )
 
+    def _make_tokens_and_phrases(self, tokens: list, phrases: list, return_phrase_count: bool,
+                                 key: Optional[str] = None) -> dict:
+        """Builds the output of `get_tokens_and_phrases` and stores it in the `output_cache`.
+        """
         if return_phrase_count:
             phrases = dict(Counter(phrases).most_common())
 
-        return dict(tokens=tokens, phrases=phrases)
+        tokens_and_phrases = dict(tokens=tokens, phrases=phrases)
+
+        if key is not None:
+            self.output_cache.set(key, tokens_and_phrases)
+
+        return tokens_and_phrases
+
+    def analyze(self, text: str, tokens: bool = True, phrases: bool = True,
+                language: bool = True, countries: bool = True, acronyms: bool = True,
+                jdc_tags: bool = True, return_phrase_count: bool = False) -> dict:
+        """Computes several outputs for a text with a single normalization and parse.
+
+        Each output can be switched off so that only the needed work is done.
+        The whitespaces of the text are normalized once, and the normalized text
+        is shared by the language detection, the parsing, and the whitelist based
+        extractions. The outputs are the same as the ones of the individual methods,
+        and the tokens and phrases are read from and stored in the `output_cache`
+        under the same keys as `get_clean_tokens` and `get_tokens_and_phrases`.
+
+        The tokens and phrases are extracted from a single parse of the preprocessed text.
+
+        Args:
+            text:
+                Raw text of the document.
+            tokens:
+                Include the clean tokens, same as `get_clean_tokens`.
+            phrases:
+                Include the phrases, same as in `get_tokens_and_phrases`.
+            language:
+                Include the detected language of the text, same as `get_language`.
+            countries:
+                Include the counts of countries mentioned in the text.
+            acronyms:
+                Include the acronyms defined in the text.
+            jdc_tags:
+                Include the counts of JDC tags found in the text.
+            return_phrase_count:
+                Return the phrases as a dictionary of counts instead of a list.
+
+        Returns:
+            A dictionary with a key for each of the requested outputs.
+
+        """
+        output = {}
+        whitespace_normalized_text = WHITESPACES_PATTERN.sub(" ", text)
+        normalized_text = BaseCleaner.normalize_characters(whitespace_normalized_text)
+
+        doc_lang = self._detect_normalized_language(normalized_text) if language else None
+
+        if language:
+            output["language"] = doc_lang
+
+        clean_tokens = tokens_and_phrases = None
+        tokens_key = phrases_key = None
+
+        if tokens:
+            tokens_key = self.get_output_cache_key(text, "get_clean_tokens")
+
+            if tokens_key is not None:
+                clean_tokens = self.output_cache.get(tokens_key)
+
+            if clean_tokens is None:
+                if doc_lang is None and self.config["cleaner"]["flags"]["filter_language"]:
+                    doc_lang = self._detect_normalized_language(normalized_text)
+
+                if not self.check_language(text, doc_lang=doc_lang):
+                    clean_tokens = []
+
+                    if tokens_key is not None:
+                        self.output_cache.set(tokens_key, clean_tokens)
+
+        if phrases:
+            phrases_key = self.get_output_cache_key(
+                text, f"get_tokens_and_phrases:{return_phrase_count}")
+
+            if phrases_key is not None:
+                tokens_and_phrases = self.output_cache.get(phrases_key)
+
+        parse_tokens = tokens and clean_tokens is None
+        parse_phrases = phrases and tokens_and_phrases is None
+
+        if parse_tokens or parse_phrases:
+            tag_entities = self.config["cleaner"]["flags"]["tag_whitelisted_entities"]
+            preprocessed_text = self._preprocess_text(text)
+
+            doc_tokens = []
+            phrase_tokens = []
+            doc_phrases = []
+
+            # The normalized text is reused if the preprocessing is a no-op.
+            for doc in self.text_to_docs(
+                    preprocessed_text,
+                    normalized_text=normalized_text if preprocessed_text is text else None):
+                extracted_doc = doc
+
+                if tag_entities or parse_phrases:
+                    extracted_doc = self._apply_extractors(doc)
+
+                if parse_tokens:
+                    doc_tokens.extend(self._tokenize(extracted_doc if tag_entities else doc))
+
+                if parse_phrases:
+                    doc_phrases.extend(self._get_doc_phrases(extracted_doc, phrase_tokens))
+
+            if parse_tokens:
+                clean_tokens = self._finalize_tokens(doc_tokens)
+
+                if tokens_key is not None:
+                    self.output_cache.set(tokens_key, clean_tokens)
+
+            if parse_phrases:
+                tokens_and_phrases = self._make_tokens_and_phrases(
+                    phrase_tokens, doc_phrases, return_phrase_count, phrases_key)
+
+        if tokens:
+            output["tokens"] = clean_tokens
+
+        if phrases:
+            output["phrases"] = tokens_and_phrases["phrases"]
+
+        if countries or acronyms or jdc_tags:
+            # Import the extractors here since they load their whitelists at import.
+            from wb_cleaning.extraction import acronyms as acronyms_extractor
+            from wb_cleaning.extraction import country_extractor, jdc_tags_extractor
+
+            if countries:
+                output["countries"] = country_extractor.get_country_counts(
+                    whitespace_normalized_text, normalized=True)
+
+            if acronyms:
+                output["acronyms"] = acronyms_extractor.detect_acronyms(
+                    whitespace_normalized_text, normalized=True)
+
+            if jdc_tags:
+                output["jdc_tags"] = jdc_tags_extractor.get_jdc_tag_counts(
+                    whitespace_normalized_text)
+
+        return output
 
     def _is_valid_token(self, token: spacy.tokens.token.Token) -> bool:
         is_valid = token.is_alpha
@@ -258,6 +994,8 @@ class SimpleCleaner(BaseCleaner):
         self.max_token_length = max_token_length
 
     def clean_text(self, text: str) -> list:
+        from gensim.utils import simple_preprocess
+
         return simple_preprocess(
             text,
             deacc=True,
@@ -266,6 +1004,82 @@ class SimpleCleaner(BaseCleaner):
         )
 
 
+def _check_seed(seed: int) -> None:
+    # Floats and strings are rejected rather than truncated to a different seed.
+    if isinstance(seed, bool) or not isinstance(seed, (int, np.integer)):
+        raise TypeError(
+            f"The seed must be an integer, got {seed!r} of type {type(seed).__name__}.")
+
+
+def in_sample(doc_id: str, process_prob: float, seed: int) -> bool:
+    """Checks whether the document is part of a sample with probability `process_prob`.
+
+    The decision only depends on the integer seed and the id of the document so the sample
+    is the same across runs and machines, and doesn't depend on the order of the files.
+    """
+    _check_seed(seed)
+
+    if process_prob >= 1:
+        return True
+
+    digest = hashlib.md5(f"{seed}:{doc_id}".encode("utf-8")).digest()
+
+    return int.from_bytes(digest[:8], "big") / 2 ** 64 < process_prob
+
+
+def read_corpus_file(fpath: str) -> str:
+    with open(fpath, "rb") as fl_rb:
+        return fl_rb.read().decode("utf-8", errors="ignore")
+
+
+# Name of the file with the attributes of a saved `CorpusCleaner`.
+CORPUS_META_FILE = "corpus_meta.json"
+
+# Name of the manifest file in the `output_dir` of a `CorpusCleaner`.
+CORPUS_MANIFEST_FILE = "manifest.sqlite"
+
+# Cleaner of the worker processes of the `CorpusCleaner`.
+_CORPUS_WORKER_CLEANER = None
+
+
+def _init_corpus_worker(cleaner: Callable[[str], str]):
+    # The cleaner, and the resources it loads, are set up once per worker.
+    global _CORPUS_WORKER_CLEANER
+    _CORPUS_WORKER_CLEANER = cleaner
+
+
+def _clean_corpus_file(fpath: str):
+    return _CORPUS_WORKER_CLEANER(read_corpus_file(fpath))
+
+
+# Transformer and dictionary of the worker processes of `CorpusCleaner.stream_gensim_transformer`.
+_TRANSFORMER_WORKER_STATE = None
+
+# Maximum number of shards submitted per worker and not yet consumed in
+# `CorpusCleaner.stream_gensim_transformer`.
+MAX_PENDING_SHARDS_PER_WORKER = 2
+
+
+def _transform_doc(cleaned_doc: list, transformer, dictionary=None) -> list:
+    doc = list(transformer[cleaned_doc])
+
+    if dictionary is not None:
+        doc = dictionary.doc2bow(doc)
+
+    return doc
+
+
+def _init_transformer_worker(transformer, dictionary):
+    global _TRANSFORMER_WORKER_STATE
+    _TRANSFORMER_WORKER_STATE = (transformer, dictionary)
+
+
+def _transform_shard(shard: list) -> list:
+    transformer, dictionary = _TRANSFORMER_WORKER_STATE
+
+    return [_transform_doc(cleaned_doc, transformer, dictionary) for cleaned_doc in shard]
+
+
 class CorpusCleaner:
     """This class manages the cleaning of files in a specified directory.
 
@@ -273,22 +1087,58 @@ class CorpusCleaner:
     of the cleaned data, e.g., phrase detection using gensim.
 
     A custom cleaner function can be used to handle the cleaning.
+
+    If `n_workers` is greater than 1, the files are cleaned in a pool of worker
+    processes. The cleaner must then be picklable, e.g., a method of a `BaseCleaner`.
+    The cleaned documents are still generated in the order of the files.
+
+    If a `checkpoint` file is given, each cleaned document is appended to it
+    so that an interrupted run can be resumed without cleaning the finished files again.
+
+    If an `output_dir` is given, each cleaned document is stored in it and recorded
+    in a `CorpusManifest`. Subsequent runs only clean the files that are new, changed,
+    or were cleaned with another `cleaning_config_id`, and drop the outputs of removed files.
+    If the cleaner is a method of a `BaseCleaner`, the `cleaning_config_id` defaults to
+    its `config_hash`, since its `cleaning_config_id` is the same for configs differing
+    only by swapped values.
+
+    If `cache_max_bytes` is given, at most about this many bytes of cleaned documents are
+    kept in memory and the rest are spilled to a segment file in `cache_dir`. Iterating
+    over the corpus after `reset` reads the spilled documents back from disk. The segment
+    file is removed by `close`, which is also called on exit when used as a context manager.
     """
 
     def __init__(self, dir: str, cleaner: Callable[[str], str],
                  id_pattern: Optional[str] = None, extension: str = "txt",
-                 process_prob: float = 1, seed: float = 1029) -> None:
+                 process_prob: float = 1, seed: int = 1029,
+                 n_workers: int = 1, chunksize: int = 1, checkpoint: Optional[str] = None,
+                 output_dir: Optional[str] = None, cleaning_config_id: Optional[str] = None,
+                 cache_max_bytes: Optional[int] = None, cache_dir: Optional[str] = None) -> None:
 
         self.dir = dir
         self.cleaner = cleaner
         self.id_pattern = id_pattern
         self.extension = extension
         self.process_prob = process_prob
-        self.seed = seed
-
-        self.clean_doc_cache = {}
+        _check_seed(seed)
+        self.seed = int(seed)
+        self.n_workers = n_workers
+        self.chunksize = chunksize
+        self.checkpoint = checkpoint
+        self.output_dir = output_dir
+
+        if cleaning_config_id is None:
+            cleaning_config_id = getattr(
+                getattr(cleaner, "__self__", None), "config_hash", None)
+
+        self.cleaning_config_id = cleaning_config_id
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_dir = cache_dir
+
+        self.clean_doc_cache = self.make_doc_cache()
         self.clean_doc_hash2id = {}
         self.clean_doc_id2hash = None
+        self.doc_store = None
 
         self.clean_doc_generator = self.cleaned_doc_generator(
             dir, cleaner, id_pattern, extension
@@ -297,6 +1147,24 @@ class CorpusCleaner:
         self.fully_trained = False
         self.frozen = False
 
+    def make_doc_cache(self):
+        if self.cache_max_bytes is None:
+            return {}
+
+        return SpillingDocCache(self.cache_max_bytes, self.cache_dir)
+
+    def close(self):
+        """Removes the documents spilled to disk by the `clean_doc_cache`.
+        """
+        if isinstance(self.__dict__.get("clean_doc_cache"), SpillingDocCache):
+            self.clean_doc_cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def check_train_state(self):
         if not self.fully_trained:
             raise ValueError("Corpus not fully processed!")
@@ -304,18 +1172,26 @@ class CorpusCleaner:
     def reset(self):
         self.check_train_state()
 
-        self.clean_doc_generator = iter(
-            [
-                self.clean_doc_cache[self.clean_doc_id2hash[id]]
-                for id in sorted(self.clean_doc_id2hash)
-            ]
-        )
+        self.clean_doc_generator = self.replay_docs()
+
+    def replay_docs(self) -> Generator[list, None, None]:
+        """Generates the cleaned documents in the order they were processed.
+        """
+        if self.doc_store is not None:
+            yield from self.doc_store
+            return
+
+        for id in sorted(self.clean_doc_id2hash):
+            yield self.clean_doc_cache[self.clean_doc_id2hash[id]]
 
     def clear_docs(self):
+        self.close()
+
         clear_keys = {
-            "clean_doc_cache": {},
+            "clean_doc_cache": self.make_doc_cache(),
             "clean_doc_hash2id": {},
             "clean_doc_id2hash": None,
+            "doc_store": None,
             "fully_trained": False,
             "frozen": False,
         }
@@ -336,6 +1212,12 @@ class CorpusCleaner:
         return next(self.clean_doc_generator)
 
     def save(self, fname):
+        """Saves the cleaned corpus in the directory `fname`.
+
+        The documents are stored as a `TokenIdCorpus` which is memory-mapped by `load`.
+        Documents that are texts instead of lists of tokens, e.g., the outputs of
+        `BaseCleaner.get_clean_text`, are pickled to the file `fname` instead.
+        """
         self.check_train_state()
 
         valid_docs = [
@@ -343,45 +1225,77 @@ class CorpusCleaner:
             "id_pattern",
             "extension",
             "frozen",
-            "clean_doc_cache",
-            "clean_doc_hash2id",
-            "clean_doc_id2hash",
             "fully_trained",
             "process_prob",
             "seed",
         ]
 
         payload = {key: self.__dict__[key] for key in valid_docs}
+        payload["doc_hashes"] = [self.clean_doc_id2hash[id]
+                                 for id in sorted(self.clean_doc_id2hash)]
 
-        with open(fname, "wb") as fl:
-            pickle.dump(payload, fl)
+        docs = self.replay_docs()
+        first_doc = next(docs, None)
+        docs = itertools.chain([] if first_doc is None else [first_doc], docs)
 
-    def load(self, fname):
-        with open(fname, "rb") as fl:
-            self.__dict__ = pickle.load(fl)
+        if isinstance(first_doc, str):
+            payload.pop("doc_hashes")
+            payload["clean_doc_cache"] = {
+                self.clean_doc_id2hash[id]: doc for id, doc in zip(sorted(self.clean_doc_id2hash), docs)}
+            payload["clean_doc_hash2id"] = self.clean_doc_hash2id
+            payload["clean_doc_id2hash"] = self.clean_doc_id2hash
 
-        self.frozen = True
-        self.reset()
+            with open(fname, "wb") as fl:
+                pickle.dump(payload, fl)
 
-    def cleaned_doc_generator(self, dir: str, cleaner: Callable[[str], str],
-                              id_pattern: Optional[str] = None, extension: str = "txt") -> Generator[list, None, None]:
-        """A generator that loads files from a directory and returns a cleaned document.
-        This also caches the cleaned data.
+            return
+
+        TokenIdCorpus.write(fname, docs)
+
+        with open(os.path.join(fname, CORPUS_META_FILE), "w") as fl:
+            json.dump(payload, fl)
+
+    def load(self, fname):
+        """Loads a corpus saved by `save`. The documents are decoded lazily on iteration.
+
+        Pickled corpora saved by earlier versions are still supported but are fully loaded in memory.
         """
-        np.random.seed(self.seed)
-        rands = np.random.random(10000000)
+        self.close()
 
-        doc_idx = 0
+        if os.path.isdir(fname):
+            with open(os.path.join(fname, CORPUS_META_FILE)) as fl:
+                payload = json.load(fl)
 
-        for index, fpath in enumerate(glob.glob(os.path.join(dir, f"*.{extension}"))):
+            doc_hashes = payload.pop("doc_hashes")
 
-            if self.process_prob < rands[index]:
-                continue
+            self.__dict__ = payload
+            self.clean_doc_cache = {}
+            self.clean_doc_hash2id = {file_hash: doc_idx for doc_idx,
+                                      file_hash in enumerate(doc_hashes)}
+            self.clean_doc_id2hash = dict(enumerate(doc_hashes))
+            self.doc_store = TokenIdCorpus(fname)
+        else:
+            with open(fname, "rb") as fl:
+                self.__dict__ = pickle.load(fl)
+
+            self.doc_store = None
+
+        self.frozen = True
+        self.reset()
 
+    def _iter_corpus_files(self, dir: str, id_pattern: Optional[str] = None,
+                           extension: str = "txt") -> Generator[tuple, None, None]:
+        """Yields the path, name, and hash of the files in the directory that are in the sample.
+
+        The sample is drawn on the ids of the documents, i.e., the file names or the
+        ids matched by the `id_pattern`, so that files of the same document are sampled together.
+        """
+        for fpath in glob.glob(os.path.join(dir, f"*.{extension}")):
             fname = fpath.split("/")[-1]
 
             if id_pattern is None:
-                file_hash = hash(fname)
+                # Unlike `hash`, this is stable across processes and runs.
+                file_hash = hashlib.md5(fname.encode("utf-8")).hexdigest()
             else:
                 match = re.search(id_pattern, fname)
                 if match:
@@ -391,39 +1305,191 @@ class CorpusCleaner:
                         f"No valid id found in file {fname}. Skipping...")
                     continue
 
+            if not in_sample(fname if id_pattern is None else file_hash, self.process_prob, self.seed):
+                continue
+
+            yield fpath, fname, file_hash
+
+    def iter_checkpoint(self) -> Generator[tuple, None, None]:
+        """Streams the (file name, cleaned document) entries of the checkpoint file.
+        """
+        if self.checkpoint is None or not os.path.isfile(self.checkpoint):
+            return
+
+        with open(self.checkpoint) as checkpoint_file:
+            for line in checkpoint_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be incomplete if the run was interrupted.
+                    continue
+
+                yield entry["fname"], entry["doc"]
+
+    def get_manifest(self) -> Optional[CorpusManifest]:
+        if self.output_dir is None:
+            return None
+
+        return CorpusManifest(os.path.join(self.output_dir, CORPUS_MANIFEST_FILE))
+
+    def get_output_path(self, fname: str) -> str:
+        return os.path.join(self.output_dir, f"{os.path.splitext(fname)[0]}.json")
+
+    def load_outputs(self, manifest: CorpusManifest, corpus_files: list, dir: str, extension: str):
+        """Drops the outputs of removed files and loads the up to date outputs of the corpus files.
+        """
+        for entry in manifest.remove_missing(glob.glob(os.path.join(dir, f"*.{extension}"))):
+            if entry["output_path"] and os.path.isfile(entry["output_path"]):
+                os.remove(entry["output_path"])
+
+        for fpath, _, file_hash in corpus_files:
+            if file_hash in self.clean_doc_cache:
+                continue
+
+            if manifest.is_current(fpath, self.cleaning_config_id):
+                with open(manifest.get(fpath)["output_path"]) as output_file:
+                    self.clean_doc_cache[file_hash] = json.load(output_file)
+
+    def store_output(self, manifest: CorpusManifest, fpath: str, fname: str, doc: list):
+        output_path = self.get_output_path(fname)
+
+        with open(output_path, "w") as output_file:
+            json.dump(doc, output_file)
+
+        manifest.update(fpath, self.cleaning_config_id, output_path)
+
+    def _generate_pending_docs(self, cleaner: Callable[[str], str], fpaths: list) -> Generator:
+        """Cleans the files, in a worker pool if `n_workers` > 1, in the order of `fpaths`.
+        """
+        if self.n_workers <= 1 or not fpaths:
+            for fpath in fpaths:
+                yield cleaner(read_corpus_file(fpath))
+            return
+
+        with multiprocessing.Pool(
+                min(self.n_workers, len(fpaths)),
+                initializer=_init_corpus_worker, initargs=(cleaner,)) as pool:
+            yield from pool.imap(_clean_corpus_file, fpaths, chunksize=self.chunksize)
+
+    def cleaned_doc_generator(self, dir: str, cleaner: Callable[[str], str],
+                              id_pattern: Optional[str] = None, extension: str = "txt") -> Generator[list, None, None]:
+        """A generator that loads files from a directory and returns a cleaned document.
+        This also caches the cleaned data.
+        """
+        corpus_files = list(self._iter_corpus_files(dir, id_pattern, extension))
+
+        # The checkpoint is streamed into the `clean_doc_cache` so that it's never fully in memory.
+        checkpoint_hashes = {fname: file_hash for _, fname, file_hash in corpus_files
+                             if file_hash not in self.clean_doc_cache}
+
+        for fname, doc in self.iter_checkpoint():
+            if fname in checkpoint_hashes:
+                self.clean_doc_cache[checkpoint_hashes[fname]] = doc
+
+        manifest = self.get_manifest()
+        if manifest is not None:
+            self.load_outputs(manifest, corpus_files, dir, extension)
+
+        # Files whose ids collide, e.g., with the `id_pattern`, share the document
+        # of the first of them. Only that one is cleaned to keep the pending docs aligned.
+        pending_fpaths = {}
+        for fpath, _, file_hash in corpus_files:
             if file_hash not in self.clean_doc_cache:
-                with open(fpath, "rb") as fl_rb:
-                    doc = fl_rb.read().decode("utf-8", errors="ignore")
-                    text = cleaner(doc)
+                pending_fpaths.setdefault(file_hash, fpath)
+
+        pending_docs = self._generate_pending_docs(cleaner, list(pending_fpaths.values()))
+
+        checkpoint_file = open(self.checkpoint, "a") if self.checkpoint else None
+
+        try:
+            for doc_idx, (fpath, fname, file_hash) in enumerate(corpus_files):
+
+                if file_hash not in self.clean_doc_cache:
+                    text = next(pending_docs)
                     self.clean_doc_cache[file_hash] = text
 
-            self.clean_doc_hash2id[file_hash] = doc_idx
-            doc_idx += 1
+                    if manifest is not None:
+                        self.store_output(manifest, fpath, fname, text)
+
+                    if checkpoint_file is not None:
+                        checkpoint_file.write(json.dumps(
+                            dict(fname=fname, doc=text)) + "\n")
+                        checkpoint_file.flush()
+
+                self.clean_doc_hash2id[file_hash] = doc_idx
+
+                yield self.clean_doc_cache[file_hash]
+        finally:
+            if checkpoint_file is not None:
+                checkpoint_file.close()
+
+            if manifest is not None:
+                manifest.close()
 
-            yield self.clean_doc_cache[file_hash]
+            pending_docs.close()
 
         self.clean_doc_id2hash = {j: i for i,
                                   j in self.clean_doc_hash2id.items()}
         self.fully_trained = True
 
-    def stream_gensim_transformer(self, transformer, dictionary=None, cache=True):
+    def _iter_doc_shards(self, shard_size: int) -> Generator[list, None, None]:
+        docs = self.__iter__()
+
+        while True:
+            shard = list(itertools.islice(docs, shard_size))
+
+            if not shard:
+                return
+
+            yield shard
+
+    def stream_gensim_transformer(self, transformer, dictionary=None, cache=True,
+                                  n_workers: int = 1, shard_size: int = 256):
         """This function takes a suitable gensim transformer that takes a list of tokens as input.
 
         An example of this transformer is the Phraser transformer in gensim.
 
         If a dictionary is provided, it will automatically transform the document into a bag-of-word
         representation.
+
+        If `n_workers` is greater than 1, the corpus is split into shards of `shard_size`
+        documents which are transformed in a pool of worker processes. The transformer and
+        the dictionary are sent once to each worker and the documents are still generated in order.
+        At most `MAX_PENDING_SHARDS_PER_WORKER` shards per worker are read ahead of the consumer.
         """
         self.check_train_state()
         self.reset()
 
-        for cleaned_doc in self.__iter__():
-            doc = list(transformer[cleaned_doc])
+        if n_workers <= 1:
+            for cleaned_doc in self.__iter__():
+                yield _transform_doc(cleaned_doc, transformer, dictionary)
+            return
+
+        with multiprocessing.Pool(
+                n_workers, initializer=_init_transformer_worker,
+                initargs=(transformer, dictionary)) as pool:
+            max_pending = n_workers * MAX_PENDING_SHARDS_PER_WORKER
+            pending = deque()
 
-            if dictionary is not None:
-                doc = dictionary.doc2bow(doc)
+            for shard in self._iter_doc_shards(shard_size):
+                pending.append(pool.apply_async(_transform_shard, (shard,)))
+
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().get()
+
+            while pending:
+                yield from pending.popleft().get()
+
+    def save_mm_corpus(self, fname: str, transformer, dictionary,
+                       n_workers: int = 1, shard_size: int = 256):
+        """Transforms the corpus into bag-of-words and streams it to a MatrixMarket file.
+
+        The file can be loaded with `gensim.corpora.MmCorpus(fname)` without loading the corpus in memory.
+        """
+        from gensim.corpora import MmCorpus
 
-            yield doc
+        MmCorpus.serialize(fname, self.stream_gensim_transformer(
+            transformer, dictionary, n_workers=n_workers, shard_size=shard_size), id2word=dictionary)
 
 
 if __name__ == "__main__":
@@ -442,7 +1508,7 @@ if __name__ == "__main__":
         We need to do something about the linear regresion.
         The bayesian information is not liot here."""
 
-    print([(i.text, i.pos_, i.lemma_) for i in nlp(test_txt)])
+    print([(i.text, i.pos_, i.lemma_) for i in get_nlp()(test_txt)])
 
     t = bc.get_clean_tokens(test_txt)
 
@@ -0,0 +1,295 @@
+"""This module builds and loads the correction table used by the frozen respeller.
+
+The table maps each word unknown to the spell checker in a corpus to the payload of
+its inferred correction, i.e., the correct word, if any, and its score. It is built
+offline by running the cleaning pipeline without respelling on the corpus, gathering
+the misspelled tokens, and resolving them in parallel with the respeller.
+
+At cleaning time, a `frozen` respeller only consults the table. Neither enchant nor
+the respeller cache are used, so the results are deterministic and fast. The table is
+stored as memory-mapped arrays so it loads instantly and is shared by the worker processes.
+
+Build the table with:
+    python -m wb_cleaning.cleaning.corrections --input-dir data/corpus --n-workers 8
+"""
+import argparse
+import copy
+import functools
+import itertools
+import json
+import multiprocessing
+import os
+from collections import Counter
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from wb_cleaning import dir_manager
+from wb_cleaning.cleaning.lexicon import build_hash_table, find_slot, word_hash
+
+DEFAULT_TABLE_DIR = dir_manager.get_path_from_root("models", "corrections")
+
+META_FILE = "meta.json"
+TABLE_FILE = "table.npy"
+ENTRIES_FILE = "entries.npy"
+WORDS_FILE = "words.npy"
+WORD_OFFSETS_FILE = "word_offsets.npy"
+CORRECTIONS_FILE = "corrections.npy"
+CORRECTION_OFFSETS_FILE = "correction_offsets.npy"
+SCORES_FILE = "scores.npy"
+
+# Number of words resolved at once by a worker.
+RESOLVE_CHUNK_SIZE = 1000
+
+
+def _encode_strings(strings: List[str]):
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(item) for item in encoded])
+
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def write_correction_table(path: str, payloads: Iterable[dict], params: Optional[dict] = None,
+                           load_factor: float = 0.5) -> int:
+    """Stores the `word`, `correct_word`, and `score` of the payloads as a correction table in `path`.
+
+    The `params` used to infer the corrections are recorded with the table.
+    Returns the number of words in the table.
+    """
+    payloads = list({payload["word"]: payload for payload in payloads}.values())
+
+    table, slots = build_hash_table(
+        (word_hash(payload["word"]) for payload in payloads), load_factor=load_factor)
+
+    if len(slots) != len(payloads):
+        raise ValueError("Hash collision between the words of the table...")
+
+    entries = np.full(len(table), -1, dtype=np.int32)
+    for entry_id, payload in enumerate(payloads):
+        entries[slots[word_hash(payload["word"])]] = entry_id
+
+    words, word_offsets = _encode_strings([payload["word"] for payload in payloads])
+    # Words without correction are stored as empty strings.
+    corrections, correction_offsets = _encode_strings(
+        [payload["correct_word"] or "" for payload in payloads])
+
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    np.save(os.path.join(path, TABLE_FILE), table)
+    np.save(os.path.join(path, ENTRIES_FILE), entries)
+    np.save(os.path.join(path, WORDS_FILE), words)
+    np.save(os.path.join(path, WORD_OFFSETS_FILE), word_offsets)
+    np.save(os.path.join(path, CORRECTIONS_FILE), corrections)
+    np.save(os.path.join(path, CORRECTION_OFFSETS_FILE), correction_offsets)
+    np.save(os.path.join(path, SCORES_FILE), np.array(
+        [payload["score"] for payload in payloads], dtype=np.float64))
+
+    with open(os.path.join(path, META_FILE), "w") as meta_file:
+        json.dump(dict(num_words=len(payloads), params=params or {}), meta_file)
+
+    return len(payloads)
+
+
+class CorrectionTable:
+    """Read-only mapping of misspelled words to their correction payloads, backed by memory-mapped arrays.
+
+    Example:
+        table = CorrectionTable(DEFAULT_TABLE_DIR)
+        table.get("regresion")  # {"word": "regresion", "correct_word": "regression", "score": 0.71, ...}
+    """
+
+    def __init__(self, path: str = DEFAULT_TABLE_DIR):
+        self.path = path
+
+        with open(os.path.join(path, META_FILE)) as meta_file:
+            meta = json.load(meta_file)
+
+        self.params = meta["params"]
+
+        self.table = self._load_array(TABLE_FILE)
+        self.entries = self._load_array(ENTRIES_FILE)
+        self.words = self._load_array(WORDS_FILE)
+        self.word_offsets = self._load_array(WORD_OFFSETS_FILE)
+        self.corrections = self._load_array(CORRECTIONS_FILE)
+        self.correction_offsets = self._load_array(CORRECTION_OFFSETS_FILE)
+        self.scores = self._load_array(SCORES_FILE)
+
+    def _load_array(self, fname: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, fname), mmap_mode="r").view(np.ndarray)
+
+    @staticmethod
+    def _decode(blob: np.ndarray, offsets: np.ndarray, entry_id: int) -> str:
+        return blob[offsets[entry_id]:offsets[entry_id + 1]].tobytes().decode("utf-8")
+
+    def _find_entry(self, word: str) -> int:
+        slot = find_slot(self.table, word_hash(word))
+
+        if slot < 0:
+            return -1
+
+        entry_id = int(self.entries[slot])
+
+        # Guard against a collision with a word not in the table.
+        if self._decode(self.words, self.word_offsets, entry_id) != word:
+            return -1
+
+        return entry_id
+
+    def __contains__(self, word: str) -> bool:
+        return self._find_entry(word) >= 0
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def _payload(self, entry_id: int) -> dict:
+        return dict(
+            word=self._decode(self.words, self.word_offsets, entry_id),
+            correct_word=self._decode(self.corrections, self.correction_offsets, entry_id) or None,
+            score=float(self.scores[entry_id]),
+        )
+
+    def get(self, word: str, default=None):
+        entry_id = self._find_entry(word)
+
+        return self._payload(entry_id) if entry_id >= 0 else default
+
+    def __getitem__(self, word: str) -> dict:
+        entry_id = self._find_entry(word)
+
+        if entry_id < 0:
+            raise KeyError(word)
+
+        return self._payload(entry_id)
+
+    def items(self) -> list:
+        return [(payload["word"], payload) for payload in map(self._payload, range(len(self)))]
+
+
+@functools.lru_cache(maxsize=None)
+def get_correction_table(path: Optional[str] = None) -> CorrectionTable:
+    """Loads the correction table once per process.
+    """
+    path = path or DEFAULT_TABLE_DIR
+
+    if not os.path.isfile(os.path.join(path, META_FILE)):
+        raise FileNotFoundError(
+            f"No correction table in {path}. Build it with: python -m wb_cleaning.cleaning.corrections")
+
+    return CorrectionTable(path)
+
+
+def get_table_params(config: dict) -> dict:
+    """Extracts the parameters of the inference of the corrections from the cleaning config.
+    """
+    respeller_conf = config["respeller"]
+    params = dict(respeller_conf["infer_correct_words"]["infer_correct_word_params"])
+    suggester = respeller_conf.get("suggester", "enchant")
+
+    return dict(
+        sim_thresh=params.get("sim_thresh", 0.0),
+        min_len=params.get("min_len", 3),
+        use_suggest_score=params.get("use_suggest_score", True),
+        suggester=getattr(suggester, "value", suggester),
+        symspell_index=respeller_conf.get("symspell_index"),
+    )
+
+
+def gather_misspelled_words(docs_tokens: Iterable[List[str]], spell_checker) -> List[str]:
+    """Lists the tokens of the documents unknown to the spell checker, the most frequent first.
+    """
+    counts = Counter(itertools.chain.from_iterable(docs_tokens))
+
+    spell_checker.set_tokens(word for word, _ in counts.most_common())
+
+    return [err_word.word for err_word in spell_checker]
+
+
+# Respeller of the worker processes of `resolve_words`.
+_RESOLVE_WORKER_RESPELLER = None
+
+
+def _init_resolve_worker(config: dict):
+    from wb_cleaning.cleaning.respelling import Respeller
+
+    global _RESOLVE_WORKER_RESPELLER
+    _RESOLVE_WORKER_RESPELLER = Respeller(config=config)
+
+
+def _resolve_chunk(words: List[str]) -> List[dict]:
+    infer_params = _RESOLVE_WORKER_RESPELLER.config[
+        "respeller"]["infer_correct_words"]["infer_correct_word_params"]
+
+    # Words missing from the shared respeller cache are inferred in a single batch.
+    _RESOLVE_WORKER_RESPELLER.resolve_words(words, **infer_params)
+
+    return [_RESOLVE_WORKER_RESPELLER.infer_correct_word(word, **infer_params) for word in words]
+
+
+def resolve_words(words: List[str], config: dict, n_workers: int = 1,
+                  chunk_size: int = RESOLVE_CHUNK_SIZE) -> List[dict]:
+    """Infers the corrections of the words with the respeller of the config, in `n_workers` processes.
+
+    Returns the payloads of the words in the same order.
+    """
+    chunks = [words[start:start + chunk_size] for start in range(0, len(words), chunk_size)]
+
+    if n_workers > 1:
+        with multiprocessing.Pool(
+                n_workers, initializer=_init_resolve_worker, initargs=(config,)) as pool:
+            results = list(pool.imap(_resolve_chunk, chunks))
+    else:
+        _init_resolve_worker(config)
+        results = [_resolve_chunk(chunk) for chunk in chunks]
+
+    return list(itertools.chain.from_iterable(results))
+
+
+def build_correction_table(input_dir: str, config: dict, path: str = DEFAULT_TABLE_DIR,
+                           n_workers: int = 1, extension: str = "txt") -> int:
+    """Builds the correction table of the corpus in `input_dir` with the cleaning `config`.
+
+    The corpus is cleaned without respelling to gather the misspelled tokens,
+    which are then resolved. Returns the number of words in the table.
+    """
+    from wb_cleaning.cleaning.cleaner import BaseCleaner, CorpusCleaner
+    from wb_cleaning.cleaning.respelling import OptimizedSpellChecker
+
+    gather_config = copy.deepcopy(config)
+    gather_config["cleaner"]["flags"]["correct_misspelling"] = False
+    gather_config["respeller"]["frozen"] = False
+
+    cleaner = BaseCleaner(config=gather_config)
+    corpus = CorpusCleaner(
+        input_dir, cleaner.get_clean_tokens, extension=extension, n_workers=n_workers)
+
+    words = gather_misspelled_words(corpus, OptimizedSpellChecker(config=gather_config))
+    payloads = resolve_words(words, gather_config, n_workers=n_workers)
+
+    return write_correction_table(path, payloads, params=get_table_params(gather_config))
+
+
+if __name__ == "__main__":
+    from wb_cleaning.types.cleaning import CleaningConfig
+    from wb_cleaning.utils.scripts import load_config
+
+    parser = argparse.ArgumentParser(
+        description="Build the correction table of a corpus used by the frozen respeller.")
+    parser.add_argument("--input-dir", required=True,
+                        help="Directory of the text files of the corpus.")
+    parser.add_argument("--config", default=dir_manager.get_path_from_root(
+        "configs", "cleaning", "default.yml"))
+    parser.add_argument("--output", default=DEFAULT_TABLE_DIR)
+    parser.add_argument("--extension", default="txt")
+    parser.add_argument("--n-workers", type=int, default=1)
+    args = parser.parse_args()
+
+    cleaning_config = CleaningConfig(
+        **load_config(args.config, "cleaning_config", None)).dict()
+
+    num_words = build_correction_table(
+        args.input_dir, cleaning_config, path=args.output,
+        n_workers=args.n_workers, extension=args.extension)
+
+    print(f"Stored the corrections of {num_words} words in {args.output}")
@@ -0,0 +1,141 @@
+"""This module implements a frozen lexicon of known words for the spell checker.
+
+The lexicon is an open addressing hash table of the 64-bit hashes of the words,
+stored as a numpy array and memory-mapped at load. Checking a word is a few array
+lookups, without a call to enchant, and the table is shared by all the worker
+processes through the page cache.
+
+The lexicon should be built from the same sources as the enchant dictionary, i.e.,
+the en_US dictionary and the whitelisted words, so that a word in the lexicon is also
+known to enchant. Words not in the lexicon are still checked with enchant.
+
+Build the lexicon with:
+    python -m wb_cleaning.cleaning.lexicon --wordlist /usr/share/hunspell/en_US.dic
+"""
+import argparse
+import functools
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from wb_cleaning import dir_manager
+from wb_cleaning.cleaning.symspell import DEFAULT_WORDLISTS, hash_key, read_wordlist
+
+DEFAULT_LEXICON_FILE = dir_manager.get_path_from_root(
+    "models", "lexicon", "lexicon.npy")
+
+EMPTY_SLOT = 0
+
+
+def word_hash(word: str) -> int:
+    # Zero marks the empty slots of the table.
+    return hash_key(word) or 1
+
+
+def build_hash_table(values: Iterable[int], load_factor: float = 0.5) -> Tuple[np.ndarray, Dict[int, int]]:
+    """Builds the open addressing table of the distinct non-zero 64-bit `values`.
+
+    Returns the table and the slot of each value, e.g., to store data aligned with the table.
+    """
+    values = set(values)
+
+    size = 1 << max(int(np.ceil(np.log2(max(len(values), 1) / load_factor))), 1)
+    mask = size - 1
+
+    table = np.full(size, EMPTY_SLOT, dtype=np.uint64)
+    slots = {}
+
+    for value in values:
+        slot = value & mask
+
+        while table[slot] != EMPTY_SLOT:
+            slot = (slot + 1) & mask
+
+        table[slot] = value
+        slots[value] = slot
+
+    return table, slots
+
+
+def find_slot(table: np.ndarray, value: int) -> int:
+    """Returns the slot of `value` in the table, or -1 if not present.
+    """
+    mask = len(table) - 1
+    slot = value & mask
+
+    while True:
+        # Compare as python ints since numpy may compare uint64 and int as floats.
+        item = int(table[slot])
+
+        if item == value:
+            return slot
+
+        if item == EMPTY_SLOT:
+            return -1
+
+        slot = (slot + 1) & mask
+
+
+def build_lexicon(fname: str, wordlists: List[str], load_factor: float = 0.5) -> int:
+    """Builds the hash table of the words in the word lists and saves it in `fname`.
+
+    Returns the number of words in the lexicon.
+    """
+    table, slots = build_hash_table(
+        (word_hash(word) for wordlist in wordlists for word in read_wordlist(wordlist)),
+        load_factor=load_factor)
+
+    dirname = os.path.dirname(os.path.abspath(fname))
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    np.save(fname, table)
+
+    return len(slots)
+
+
+class FrozenLexicon:
+    """Read-only set of words backed by a memory-mapped hash table.
+
+    Example:
+        lexicon = FrozenLexicon(DEFAULT_LEXICON_FILE)
+        "poverty" in lexicon  # True
+    """
+
+    def __init__(self, fname: str = DEFAULT_LEXICON_FILE):
+        self.fname = fname
+        self.table = np.load(fname, mmap_mode="r").view(np.ndarray)
+
+    def __contains__(self, word: str) -> bool:
+        return find_slot(self.table, word_hash(word)) >= 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.table))
+
+
+@functools.lru_cache(maxsize=None)
+def get_lexicon(fname: Optional[str] = None) -> Optional[FrozenLexicon]:
+    """Loads the lexicon once per process. Returns None if the lexicon has not been built.
+    """
+    fname = fname or DEFAULT_LEXICON_FILE
+
+    if not os.path.isfile(fname):
+        return None
+
+    return FrozenLexicon(fname)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the frozen lexicon of known words used by the spell checker.")
+    parser.add_argument("--wordlist", action="append", default=[],
+                        help="Additional word list or hunspell .dic file, e.g., the en_US dictionary.")
+    parser.add_argument("--output", default=DEFAULT_LEXICON_FILE)
+    parser.add_argument("--load-factor", type=float, default=0.5)
+    args = parser.parse_args()
+
+    num_words = build_lexicon(
+        args.output, DEFAULT_WORDLISTS + args.wordlist, load_factor=args.load_factor)
+
+    print(f"Stored {num_words} words in {args.output}")
@@ -1,48 +1,51 @@
 """This module handles the recovery of words that may have been misparsed or misspelled.
 """
 # Actual service dependencies
+import functools
+import hashlib
 import itertools
+import json
 import os
-import re
-import wordninja
+import warnings
 import numpy as np
-import pandas as pd
 
+# The base class of `OptimizedSpellChecker` so enchant is still imported with the module.
 from enchant.checker import SpellChecker
-from joblib import Memory
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from nltk.metrics.distance import edit_distance
+from scipy import sparse
 from scipy.stats import rankdata
 import redis
 
 from wb_cleaning.cleaning.stopwords import stopwords
+from wb_cleaning.cleaning import corrections, lexicon, segmentation, symspell
+from wb_cleaning.cleaning.symspell import batch_edit_distance
 from wb_cleaning import dir_manager
 from wb_cleaning.interfaces import language
+from wb_cleaning.ops import cache_utils, resources
+from wb_cleaning.ops.disk_cache import DiskCache
+from wb_cleaning.ops.memory_cache import MemoryCache
 # Setup caching mechanism for speedup.
 # Take note that `get_suggestions` using enchant is
 # quite slow (~75% of the `cached_infer_correct_word` function).
 
-USE_JOBLIB_MEMORY = False
-# EN_DICT = None
+USE_DISK_CACHE = False
+RESPELLER_CACHE_LOCATION = "/dev/shm/respeller-cachedir"
 
-if not USE_JOBLIB_MEMORY:
-    try:
-        from wb_cleaning.ops.cache_utils import redis_cacher
-        cache_decorator = redis_cacher
+# Bound of the shared disk cache used when redis is not available.
+RESPELLER_DISK_CACHE_MAX_SIZE = 2 ** 30  # 1GB
+
+# Bounds of the in-process cache of each `Respeller` in front of the shared cache.
+RESPELLER_MEMORY_CACHE_MAX_BYTES = 2 ** 26  # 64MB
+RESPELLER_MEMORY_CACHE_TTL = None
 
-    except redis.ConnectionError as error:
-        args = error.args
-        print(args[0])
-        print("Redis not available, falling back to joblib cache...")
-        USE_JOBLIB_MEMORY = True
 
-if USE_JOBLIB_MEMORY:
-    RESPELLER_CACHE_LOCATION = "/dev/shm/respeller-cachedir"
+def _load_disk_cache():
+    global RESPELLER_CACHE_LOCATION
 
     try:
-        respeller_cache = Memory(RESPELLER_CACHE_LOCATION, verbose=0)
+        if not os.path.isdir(RESPELLER_CACHE_LOCATION):
+            os.makedirs(RESPELLER_CACHE_LOCATION)
     except PermissionError:
         RESPELLER_CACHE_LOCATION = dir_manager.get_data_dir(
             'shm', 'respeller-cachedir')
@@ -50,24 +53,80 @@ if USE_JOBLIB_MEMORY:
         if not os.path.isdir(RESPELLER_CACHE_LOCATION):
             os.makedirs(RESPELLER_CACHE_LOCATION)
 
-        respeller_cache = Memory(RESPELLER_CACHE_LOCATION, verbose=0)
+    return DiskCache(
+        os.path.join(RESPELLER_CACHE_LOCATION, "respeller.db"),
+        max_size=RESPELLER_DISK_CACHE_MAX_SIZE)
 
-    cache_decorator = respeller_cache.cache
 
-# # Returns self without any form of caching.
-# cache_decorator = lambda f: f
+def _load_cache_decorator():
+    """Uses redis for caching if available, else falls back to a size-bounded disk cache.
+    """
+    if not USE_DISK_CACHE:
+        try:
+            cache_utils.get_redis_cache()
+            return cache_utils.redis_cacher
+
+        except redis.ConnectionError as error:
+            args = error.args
+            print(args[0])
+            print("Redis not available, falling back to disk cache...")
+
+    return cache_utils.make_disk_cacher(_load_disk_cache())
+
+
+resources.register("respeller_cache_decorator", _load_cache_decorator)
+
+
+def __getattr__(name):
+    # Keep `respelling.en_lang` available without building the dictionary at import.
+    if name == "en_lang":
+        warnings.warn(
+            "`respelling.en_lang` is deprecated, use `resources.get('en_lang')`.",
+            DeprecationWarning, stacklevel=2)
+        return resources.get("en_lang")
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def cache_decorator(func):
+    """Applies the caching mechanism to `func` on its first call.
+
+    This defers the connection to the cache backend until it is actually needed.
+    """
+    cached_func = None
+
+    def get_cached_func():
+        nonlocal cached_func
+
+        if cached_func is None:
+            cached_func = resources.get("respeller_cache_decorator")(func)
+
+        return cached_func
 
-#
-# en_dict = language.Language().get_en_dict()
-en_lang = language.Language()
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return get_cached_func()(*args, **kwargs)
 
+    def map_cached(keys, compute_many, namespace=None):
+        """Gets the values cached under the `argument_hash` keys in the `namespace`,
+        computing the missing ones with `compute_many` in a single batch.
+
+        Backends without batch support don't cache the batch.
+        """
+        backend_func = get_cached_func()
+
+        if hasattr(backend_func, "map"):
+            return backend_func.map(keys, compute_many, namespace=namespace)
+
+        return compute_many(list(keys))
+
+    wrapper.map = map_cached
+
+    return wrapper
+
+# # Returns self without any form of caching.
+# cache_decorator = lambda f: f
 
-# def get_dict():
-#     # Use this since DictWithPWL fails when pickled/unpickled
-#     global EN_DICT
-#     if EN_DICT is None:
-#         EN_DICT = language.Language().get_en_dict()
-#     return EN_DICT
 
 # with open(dir_manager.get_data_dir("whitelists", "whitelists", "whitelist_words.txt")) as whitelist_words_file:
 
@@ -94,14 +153,44 @@ def get_suggestions(word: str, **kwargs) -> list:
 
     """
 
-    if en_lang.get_en_dict().check(word):
+    return enchant_suggest(word)
+
+
+def enchant_suggest(word: str) -> list:
+    if language.get_en_dict().check(word):
         suggest = [word]
     else:
-        suggest = en_lang.get_en_dict().suggest(word)
+        suggest = language.get_en_dict().suggest(word)
 
     return suggest
 
 
+def suggest_words(word: str, suggester: str = "enchant", symspell_index: str = None) -> list:
+    """Gets the candidate corrections of the word from the selected suggester.
+
+    The `symspell` suggester uses the precomputed `symspell.SymSpellIndex` instead of
+    enchant. It is fast enough that its results don't need to be cached.
+    """
+    if suggester == "symspell":
+        return symspell.get_index(symspell_index).lookup(word)
+
+    return get_suggestions(word, argument_hash=word)
+
+
+def suggest_words_batch(words: list, suggester: str = "enchant", symspell_index: str = None) -> list:
+    """Batched version of `suggest_words`.
+
+    The cached enchant suggestions of all the words are fetched at once.
+    """
+    if suggester == "symspell":
+        index = symspell.get_index(symspell_index)
+
+        return [index.lookup(word) for word in words]
+
+    return get_suggestions.map(
+        words, lambda missing_words: [enchant_suggest(word) for word in missing_words])
+
+
 # @cache_decorator
 # def en_dict_check(word, **kwargs):
 #     # High overhead. Uncached speed ~100us vs cached speed ~500us
@@ -132,7 +221,8 @@ def morph_word(word: str) -> str:
 @cache_decorator
 def cached_infer_correct_word(
         word: str, sim_thresh: float = 0.0, print_log: bool = False,
-        min_len: int = 3, use_suggest_score: bool = True, **kwargs) -> dict:
+        min_len: int = 3, use_suggest_score: bool = True,
+        suggester: str = "enchant", symspell_index: str = None, **kwargs) -> dict:
     """This method computes the inference score for the input word.
 
     Args:
@@ -151,8 +241,12 @@ def cached_infer_correct_word(
         use_suggest_score:
             Flag whether to use the rank of enchant's suggestion in
             computing for the similarity score.
+        suggester:
+            Source of the candidates, `enchant` or `symspell`.
+        symspell_index:
+            Path to the SymSpell index, the default index is used if None.
         **kwargs:
-            Needed for caching (`argument_hash`)
+            Needed for caching (`argument_hash`, `cache_namespace`)
 
     Returns:
         A dictionary containing the information of the inference.
@@ -176,7 +270,7 @@ def cached_infer_correct_word(
     if len(word) < min_len:
         return payload
 
-    candidates = get_suggestions(word, argument_hash=word)
+    candidates = suggest_words(word, suggester, symspell_index)
     lowered_candidates = [i.lower() for i in candidates]
 
     lword = word.lower()
@@ -193,6 +287,9 @@ def cached_infer_correct_word(
         suggest_score = np.ones(len(candidates))
 
     if candidates:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+
         try:
             m_word = morph_word(word)
             m_candidates = [morph_word(c.lower()) for c in candidates]
@@ -228,6 +325,179 @@ def cached_infer_correct_word(
     return payload
 
 
+def _group_rankdata(values: np.ndarray, groups: np.ndarray, group_starts: np.ndarray) -> np.ndarray:
+    """Same as `rankdata` (average method) applied to each group of contiguous `values`.
+    """
+    num_values = values.max() + 1
+    uniq, inverse, counts = np.unique(
+        groups * num_values + values, return_inverse=True, return_counts=True)
+
+    before = np.cumsum(counts) - counts - group_starts[uniq // num_values]
+
+    return (before + (counts + 1) / 2)[inverse.ravel()]
+
+
+def _group_tfidf(counts: sparse.csr_matrix, groups: np.ndarray,
+                 doc_freqs: sparse.csr_matrix, group_sizes: np.ndarray) -> sparse.csr_matrix:
+    """Computes the normalized tfidf of the rows of `counts` with the idf of their group.
+
+    Features that don't appear in the group are dropped as they would be
+    out of the vocabulary of a vectorizer fitted on the group only.
+    """
+    counts = counts.tocoo()
+
+    if counts.nnz == 0:
+        # None of the rows shares an n-gram with its group.
+        return sparse.csr_matrix(counts.shape, dtype=np.float64)
+
+    row_groups = groups[counts.row]
+
+    dfs = doc_freqs[row_groups, counts.col]
+    dfs = (dfs.toarray() if sparse.issparse(dfs) else np.asarray(dfs)).ravel()
+    valid = dfs > 0
+
+    idfs = np.log((1 + group_sizes[row_groups[valid]]) / (1 + dfs[valid])) + 1
+
+    tfidf = sparse.csr_matrix(
+        (counts.data[valid] * idfs, (counts.row[valid], counts.col[valid])), shape=counts.shape)
+
+    from sklearn.preprocessing import normalize
+
+    return normalize(tfidf)
+
+
+def infer_correct_words_batch(
+        words: list, sim_thresh: float = 0.0, print_log: bool = False,
+        min_len: int = 3, use_suggest_score: bool = True,
+        suggester: str = "enchant", symspell_index: str = None, **kwargs) -> list:
+    """Batched version of `cached_infer_correct_word`.
+
+    The candidates of all the words are featurized with a single character n-gram
+    vectorizer, and the idf, cosine similarity, edit distance, and ranks are computed
+    for all candidates at once. Each word gets the same score as it would from a
+    `TfidfVectorizer` fitted on its own candidates.
+
+    Args:
+        words:
+            List of unique misspelled words.
+        **kwargs:
+            Same as `cached_infer_correct_word`. The `print_log` option is ignored.
+
+    Returns:
+        A list of payloads in the same order as `words`.
+
+    """
+    payloads = []
+
+    group_payloads = []
+    group_words = []
+    candidates = []
+    cand_groups = []
+
+    checked_words = [word for word in words if len(word) >= min_len]
+    suggestions = dict(zip(checked_words, suggest_words_batch(
+        checked_words, suggester, symspell_index)))
+
+    for word in words:
+        payload = dict(
+            word=word,
+            correct_word=None,
+            score=-1,
+            sim_thresh=sim_thresh,
+            print_log=print_log,
+            min_len=min_len,
+            use_suggest_score=use_suggest_score,
+        )
+        payloads.append(payload)
+
+        if len(word) < min_len:
+            continue
+
+        word_candidates = suggestions[word]
+        lowered_candidates = [i.lower() for i in word_candidates]
+
+        lword = word.lower()
+        if lword in set(lowered_candidates):
+            payload["correct_word"] = word_candidates[lowered_candidates.index(
+                lword)]
+            payload["score"] = 1
+            continue
+
+        payload["score"] = -1.0
+
+        if not word_candidates:
+            continue
+
+        cand_groups.extend([len(group_words)] * len(word_candidates))
+        candidates.extend(word_candidates)
+        group_payloads.append(payload)
+        group_words.append(morph_word(word))
+
+    if not group_words:
+        return payloads
+
+    m_candidates = [morph_word(c.lower()) for c in candidates]
+
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    vectorizer = CountVectorizer(analyzer="char", ngram_range=(2, 4))
+
+    try:
+        cand_counts = vectorizer.fit_transform(m_candidates)
+    except ValueError:
+        # None of the candidates has a character n-gram.
+        return payloads
+
+    word_counts = vectorizer.transform(group_words)
+
+    cand_groups = np.array(cand_groups)
+    group_sizes = np.bincount(cand_groups)
+    group_starts = np.cumsum(group_sizes) - group_sizes
+
+    group_indicator = sparse.csr_matrix(
+        (np.ones(len(cand_groups)), (cand_groups, np.arange(len(cand_groups)))),
+        shape=(len(group_words), len(cand_groups)))
+    doc_freqs = (group_indicator @ (cand_counts > 0).astype(np.float64)).tocsr()
+
+    cand_vecs = _group_tfidf(cand_counts, cand_groups, doc_freqs, group_sizes)
+    word_vecs = _group_tfidf(word_counts, np.arange(
+        len(group_words)), doc_freqs, group_sizes)
+
+    sim = np.asarray(cand_vecs.multiply(
+        word_vecs[cand_groups]).sum(axis=1)).ravel()
+
+    rank_score = 1.0 / _group_rankdata(batch_edit_distance(
+        [group_words[group] for group in cand_groups], m_candidates), cand_groups, group_starts)
+
+    if use_suggest_score:
+        suggest_score = 1 / \
+            (np.arange(len(cand_groups)) - group_starts[cand_groups] + 1) ** 0.5
+    else:
+        suggest_score = np.ones(len(cand_groups))
+
+    sim_r = sim * rank_score * suggest_score
+
+    group_scores = np.maximum.reduceat(sim_r, group_starts)
+    max_inds = np.flatnonzero(sim_r == group_scores[cand_groups])
+    _, first_max = np.unique(cand_groups[max_inds], return_index=True)
+
+    # A vectorizer fitted on candidates without any character n-gram fails.
+    has_features = np.bincount(
+        cand_groups, weights=cand_counts.getnnz(axis=1) > 0, minlength=len(group_words)) > 0
+
+    for group, payload in enumerate(group_payloads):
+        if not has_features[group]:
+            continue
+
+        score = float(group_scores[group])
+        if score > sim_thresh:
+            payload["correct_word"] = candidates[max_inds[first_max[group]]]
+
+        payload["score"] = score
+
+    return payloads
+
+
 class Respeller:
     """
     Use https://joblib.readthedocs.io/en/latest/auto_examples/memory_basic_usage.html#sphx-glr-auto-examples-memory-basic-usage-py
@@ -235,7 +505,10 @@ class Respeller:
     """
 
     def __init__(self, config=None, dictionary_file=None, spell_threshold=0.25,
-                 allow_proper=False, spell_cache=None):
+                 allow_proper=False, spell_cache=None, suggester="enchant", symspell_index=None,
+                 frozen=False, correction_table=None,
+                 spell_cache_max_bytes=RESPELLER_MEMORY_CACHE_MAX_BYTES,
+                 spell_cache_ttl=RESPELLER_MEMORY_CACHE_TTL):
         """This respelling module tries to recover some misspelled words.
         This is done using enchant and text mining methods.
 
@@ -246,6 +519,21 @@ class Respeller:
 
                 This seems ok to use if entity-based and pos-tag-based filters
                 have already been applied prior to the respelling.
+            suggester:
+                Source of the candidate corrections, `enchant` or `symspell`.
+            symspell_index:
+                Path to the SymSpell index used by the `symspell` suggester.
+            frozen:
+                If set to True, the corrections are only looked up in the
+                `correction_table`. Words not in the table are not fixed.
+            correction_table:
+                Path to the table built with `wb_cleaning.cleaning.corrections`.
+            spell_cache_max_bytes:
+                Memory ceiling of the in-process cache of the inferred words
+                used when no `spell_cache` is given.
+            spell_cache_ttl:
+                Time in seconds after which the words in the in-process cache
+                are inferred again from the shared cache.
 
         """
         if config:
@@ -256,13 +544,25 @@ class Respeller:
                 spell_threshold=spell_threshold,
                 allow_proper=allow_proper,
                 spell_cache=spell_cache,
+                suggester=suggester,
+                symspell_index=symspell_index,
+                frozen=frozen,
+                correction_table=correction_table,
+                spell_cache_max_bytes=spell_cache_max_bytes,
+                spell_cache_ttl=spell_cache_ttl,
             ))
 
         respeller_conf = self.config['respeller']
 
         self.spell_cache = respeller_conf.get(
             'spell_cache', spell_cache)
-        self.spell_cache = self.spell_cache if self.spell_cache is not None else {}  # pd.Series()
+
+        if self.spell_cache is None:
+            # Bounded first tier in front of the shared redis or disk cache.
+            self.spell_cache = MemoryCache(
+                max_bytes=respeller_conf.get(
+                    'spell_cache_max_bytes', spell_cache_max_bytes),
+                ttl=respeller_conf.get('spell_cache_ttl', spell_cache_ttl))
 
         self.dictionary_file = respeller_conf.get(
             'dictionary_file', dictionary_file)
@@ -273,13 +573,35 @@ class Respeller:
         self.allow_proper = respeller_conf.get(
             'allow_proper', allow_proper)
 
+        self.suggester = respeller_conf.get(
+            'suggester', suggester)
+        # The config may contain the member of the `Suggester` enum.
+        self.suggester = getattr(self.suggester, 'value', self.suggester)
+
+        self.symspell_index = respeller_conf.get(
+            'symspell_index', symspell_index)
+
+        self.frozen = respeller_conf.get('frozen', frozen)
+        self.correction_table = respeller_conf.get(
+            'correction_table', correction_table)
+
+        # Inferences are cached in the namespace of their parameters in the shared cache,
+        # so that respellers with different parameters don't collide.
+        self._cache_namespaces = {}
+
+        if self.frozen:
+            # The table replaces the cache, the respeller cache backend is never used.
+            self.spell_cache = corrections.get_correction_table(self.correction_table)
+
         self.stopwords = set(stopwords)
 
         """
         TODO: Find a way to use an adaptive spell_threshold based on the length of the word.
         """
 
-        if (self.dictionary_file is not None) and os.path.isfile(self.dictionary_file):
+        if (self.dictionary_file is not None) and os.path.isfile(self.dictionary_file) and not self.frozen:
+            import pandas as pd
+
             self.spell_cache = pd.read_csv(self.dictionary_file)
 
     def save_spell_cache(self):
@@ -289,7 +611,9 @@ class Respeller:
 
         """
         assert self.dictionary_file is not None
-        pd.Series(self.spell_cache).to_csv(self.dictionary_file)
+        import pandas as pd
+
+        pd.Series(dict(self.spell_cache.items())).to_csv(self.dictionary_file)
 
     def infer_correct_word(
             self, word, sim_thresh: float = 0.0, print_log: bool = False,
@@ -328,21 +652,98 @@ class Respeller:
         #     use_suggest_score = self.config['respeller']['infer_correct_word'].get(
         #         'use_suggest_score', use_suggest_score)
 
-        if word not in self.spell_cache:
-            # Implement internal caching as well since Memory is still slow
-            # due to its utilization of disk.
+        payload = self.spell_cache.get(word)
+
+        if payload is None and self.frozen:
+            return dict(word=word, correct_word=None, score=-1)
+
+        if payload is None:
+            # Implement internal caching as well since the shared cache
+            # still requires a round-trip and a json decode.
             payload = cached_infer_correct_word(
                 word,
                 sim_thresh=sim_thresh,
                 print_log=print_log,
                 min_len=min_len,
                 use_suggest_score=use_suggest_score,
-                argument_hash=word,
+                suggester=self.suggester,
+                symspell_index=self.symspell_index,
+                argument_hash=self.get_cache_key(word),
+                cache_namespace=self.get_cache_namespace(
+                    sim_thresh=sim_thresh, min_len=min_len, use_suggest_score=use_suggest_score),
             )
 
             self.spell_cache[word] = payload
 
-        return self.spell_cache[word]
+        return payload
+
+    def resolve_words(self, words: list, sim_thresh: float = 0.0, print_log: bool = False,
+                      min_len: int = 3, use_suggest_score: bool = True):
+        """Infers the correct words of the misspelled words not yet in the `spell_cache` in a single batch.
+
+        Subsequent calls to `infer_correct_word` for these words are served from the `spell_cache`.
+        """
+        if self.frozen:
+            return
+
+        key_words = {self.get_cache_key(word): word for word in words
+                     if word not in self.spell_cache}
+
+        if not key_words:
+            return
+
+        def compute_many(keys):
+            return infer_correct_words_batch(
+                [key_words[key] for key in keys],
+                sim_thresh=sim_thresh,
+                print_log=print_log,
+                min_len=min_len,
+                use_suggest_score=use_suggest_score,
+                suggester=self.suggester,
+                symspell_index=self.symspell_index,
+            )
+
+        # Only the words missing from the shared cache are computed.
+        payloads = cached_infer_correct_word.map(
+            list(key_words), compute_many,
+            namespace=self.get_cache_namespace(
+                sim_thresh=sim_thresh, min_len=min_len, use_suggest_score=use_suggest_score))
+
+        for word, payload in zip(key_words.values(), payloads):
+            self.spell_cache[word] = payload
+
+    def cache_stats(self) -> dict:
+        """Returns the hit/miss/eviction counts of the in-process cache, if available.
+        """
+        stats = getattr(self.spell_cache, "stats", None)
+
+        return stats() if callable(stats) else dict(count=len(self.spell_cache))
+
+    def get_cache_namespace(self, sim_thresh: float = 0.0, min_len: int = 3,
+                            use_suggest_score: bool = True) -> str:
+        """Namespace of the inferences with the given parameters in the shared cache.
+
+        Only the parameters that change the inferences are part of the namespace,
+        so that respellers differing in other parameters, e.g., `spell_threshold`,
+        share their cached inferences.
+        """
+        params = (float(sim_thresh), int(min_len), bool(use_suggest_score))
+
+        if params not in self._cache_namespaces:
+            self._cache_namespaces[params] = hashlib.md5(json.dumps(dict(
+                sim_thresh=params[0],
+                min_len=params[1],
+                use_suggest_score=params[2],
+                suggester=self.suggester,
+                symspell_index=self.symspell_index,
+            ), sort_keys=True).encode('utf-8')).hexdigest()
+
+        return self._cache_namespaces[params]
+
+    def get_cache_key(self, word: str) -> str:
+        """Key (`argument_hash`) of the inference of the word in the shared cache.
+        """
+        return word if self.suggester == "enchant" else f"{self.suggester}:{word}"
 
     def qualified_word(self, word: str) -> bool:
         """Checks for the validity of the word.
@@ -423,16 +824,23 @@ class Respeller:
         return unfixed_words, respelled_set
 
 
+# Number of words whose enchant check is cached by each `OptimizedSpellChecker`.
+CHECK_CACHE_SIZE = 2 ** 16
+
+
 class OptimizedSpellChecker(SpellChecker):
     """
     Reduces the tokens only to unique words in the text. Output is not in the same order relative
     to the original text.
-    """
 
-    dict_words = set()
+    Known words are looked up in the frozen `lexicon`, if it has been built, before
+    falling back to enchant. The results of enchant are kept in a bounded cache of
+    `check_cache_size` words.
+    """
 
     def __init__(self, config=None, lang=None, text=None,
-                 tokenize=None, chunkers=None, filters=None):
+                 tokenize=None, chunkers=None, filters=None,
+                 lexicon_file=None, check_cache_size=CHECK_CACHE_SIZE):
 
         if config:
             self.config = config
@@ -449,13 +857,17 @@ class OptimizedSpellChecker(SpellChecker):
 
         super().__init__(
             # spell_checker_conf.get('lang', lang),
-            lang=en_lang.get_en_dict(),
+            lang=language.get_en_dict(),
             text=spell_checker_conf.get('text', text),
             tokenize=spell_checker_conf.get('tokenize', tokenize),
             chunkers=spell_checker_conf.get('chunkers', chunkers),
             filters=spell_checker_conf.get('filter', filters)
         )
 
+        self.lexicon = lexicon.get_lexicon(lexicon_file)
+        self.check_word = functools.lru_cache(
+            maxsize=check_cache_size)(self.dict.check)
+
     def set_tokens(self, tokens):
         """Set the text to be spell-checked.
 
@@ -484,10 +896,9 @@ class OptimizedSpellChecker(SpellChecker):
         # will provide the StopIteration for this method
         while True:
             pos, word = next(self._tokens)
-            if word in self.dict_words:
+            if self.lexicon is not None and word in self.lexicon:
                 continue
-            if self.dict.check(word):
-                self.dict_words.add(word)
+            if self.check_word(word):
                 continue
             if word in self._ignore_words:
                 continue
@@ -512,11 +923,50 @@ class SpellingModels:
         assert 'spell_checker' in self.config
         assert 'respeller' in self.config
 
-        self.spell_checker = OptimizedSpellChecker(
-            config=self.config)
         self.respeller = Respeller(
             config=self.config)
 
+        if self.respeller.frozen:
+            # The misspelled words are the words of the correction table so enchant is not needed.
+            self.spell_checker = None
+            self.check_table_params()
+        else:
+            self.spell_checker = OptimizedSpellChecker(
+                config=self.config)
+
+        # The domain model is loaded here, i.e., once in each worker process.
+        segmentation_model = self.config.get('cleaner', {}).get(
+            'params', {}).get('segmentation_model', 'wordninja')
+        self.segmentation_model = (
+            segmentation.get_language_model()
+            if getattr(segmentation_model, 'value', segmentation_model) == 'domain' else None)
+
+    def check_table_params(self):
+        """Checks that the correction table was built with the respelling parameters of the config.
+        """
+        table_params = self.respeller.spell_cache.params
+        config_params = corrections.get_table_params(self.config)
+
+        mismatched = {key: value for key, value in table_params.items()
+                      if config_params.get(key) != value}
+
+        if mismatched:
+            raise ValueError(
+                f"The correction table was built with other respelling parameters: {mismatched}...")
+
+    def find_misspelled_words(self, tokens) -> list:
+        """Lists the misspelled words in the tokens.
+
+        The words of the correction table are the misspelled words of a frozen respeller.
+        """
+        if self.respeller.frozen:
+            return [token for token in dict.fromkeys(tokens)
+                    if token in self.respeller.spell_cache]
+
+        self.spell_checker.set_tokens(tokens)
+
+        return [err_word.word for err_word in self.spell_checker]
+
     def fix_spellings(self, tokens: list) -> list:
         """This is the main method that handles the fixing of misspelled words.
 
@@ -529,10 +979,8 @@ class SpellingModels:
             Misspelled words having a viable fix are replaced.
 
         """
-        self.spell_checker.set_tokens(tokens)
-
         unfixed_tokens, fixed_tokens_map = self.respeller.infer_correct_words(
-            [err_word.word for err_word in self.spell_checker],
+            self.find_misspelled_words(tokens),
             return_tokens_as_list=self.config["respeller"]["infer_correct_words"]["return_tokens_as_list"],
             infer_correct_word_params=self.config["respeller"]["infer_correct_words"]["infer_correct_word_params"]
         )
@@ -549,8 +997,49 @@ class SpellingModels:
 
         return tokens
 
+    def fix_spellings_batch(self, docs_tokens: list) -> list:
+        """Batched version of `fix_spellings`.
+
+        The unique misspelled words across all the documents are resolved
+        at once and the fixes are then applied to each document.
+
+        Args:
+            docs_tokens:
+                List of the input tokens of each document.
+
+        Returns:
+            A list of the fixed tokens of each document.
+
+        """
+        infer_correct_words_conf = self.config["respeller"]["infer_correct_words"]
+
+        error_words = self.find_misspelled_words(
+            set(itertools.chain.from_iterable(docs_tokens)))
+
+        self.respeller.resolve_words(
+            error_words, **infer_correct_words_conf["infer_correct_word_params"])
+
+        unfixed_tokens, fixed_tokens_map = self.respeller.infer_correct_words(
+            error_words,
+            return_tokens_as_list=infer_correct_words_conf["return_tokens_as_list"],
+            infer_correct_word_params=infer_correct_words_conf["infer_correct_word_params"]
+        )
+
+        return [
+            list(
+                itertools.chain.from_iterable(
+                    [
+                        fixed_tokens_map.get(token, [token])
+                        for token in tokens
+                        if token not in unfixed_tokens
+                    ]
+                )
+            )
+            for tokens in docs_tokens
+        ]
+
     @staticmethod
-    def recover_segmented_words(raw_input: str, max_len: int = 5) -> str:
+    def recover_segmented_words(raw_input: str, max_len: int = 5, model=None) -> str:
         """This algorithm processes and input text to detect and fix any malformed words.
         This does not attempt to split contiguous words.
 
@@ -558,48 +1047,14 @@ class SpellingModels:
             input: "million p rote c te d   by u n h c r Of the world's displaced"
             output: "million protected by unhcr Of the world's displaced"
 
+        The fragments are segmented with `model`, or with wordninja if not given.
+        See `segmentation.recover_segmented_words`.
         """
+        return segmentation.recover_segmented_words(
+            raw_input, max_len=max_len, model=model)
 
-        alpha_streak = 0
-        word_streak = 0
-        val_span = ""
-        temp_span = ""
-        ends_space = False
-        spaces = {" ", "\n", "\t"}
-
-        # Handle plural form of acronyms, e.g., IDPs -> IDP
-        raw_text = re.sub(r"(\W[A-Z]{2,})(s)(\W)", r"\1\3", raw_input)
-        # Add non-alpha character at the end.
-        raw_text = raw_text + ' '
-
-        text = ""
-
-        for i in raw_text:
-            if i.isalpha():
-                alpha_streak += 1
-                temp_span += i
-                ends_space = False
-            else:
-                if (alpha_streak and alpha_streak <= max_len) or (val_span and ends_space):
-                    if i in spaces:
-                        val_span += temp_span + i
-                        word_streak += 1
-                        temp_span = ""
-                        # Speeds up processing vs. using val_span[-1].isspace()!
-                        ends_space = True
-                        alpha_streak = 0
-                        continue
-
-                if word_streak >= 2:
-                    text += " ".join(wordninja.split("".join(val_span.split())))
-                    text += " " + temp_span + i
-                else:
-                    text += val_span + temp_span + i
-
-                word_streak = 0
-                temp_span = ""
-                val_span = ""
-                ends_space = False
-                alpha_streak = 0
-
-        return text
+    def recover_segmented_words_with_model(self, raw_input: str, max_len: int = 5) -> str:
+        """Recovers the malformed words using the `segmentation_model` of the config.
+        """
+        return self.recover_segmented_words(
+            raw_input, max_len=max_len, model=self.segmentation_model)
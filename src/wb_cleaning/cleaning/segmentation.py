@@ -0,0 +1,313 @@
+"""This module recovers words that have been fragmented, e.g., by the OCR of a PDF.
+
+Fragmented runs, i.e., short alphabetic spans separated by whitespace, are found
+with a single compiled regex and joined back with a word segmentation model.
+Documents tend to repeat the same fragments so the splits are memoized.
+
+The segmentation model is either wordninja's English unigram model or a domain
+model built from the whitelisted word lists, e.g., knowing words like "unhcr",
+on top of wordninja's English word list. The domain model is stored as memory-mapped
+arrays so it loads instantly and is shared by the worker processes through the page cache.
+
+Build the domain model with:
+    python -m wb_cleaning.cleaning.segmentation
+"""
+import argparse
+import functools
+import importlib
+import importlib.util
+import json
+import math
+import os
+import re
+import sys
+from typing import List, Optional
+
+import numpy as np
+
+from wb_cleaning import dir_manager
+from wb_cleaning.cleaning.lexicon import build_hash_table, find_slot, word_hash
+from wb_cleaning.cleaning.symspell import read_wordlist
+from wb_cleaning.ops import resources
+
+DEFAULT_MODEL_DIR = dir_manager.get_path_from_root("models", "segmentation")
+# Frequency ordered domain word lists, used with an English word list.
+DEFAULT_WORDLISTS = [
+    dir_manager.get_data_dir("whitelists", "whitelists", "doc-freq-wiki-wordlist.txt"),
+    dir_manager.get_data_dir("whitelists", "whitelists", "phrases.txt"),
+]
+
+META_FILE = "meta.json"
+TABLE_FILE = "table.npy"
+COSTS_FILE = "costs.npy"
+
+# Number of distinct fragments whose split is memoized.
+SPLIT_CACHE_SIZE = 2 ** 16
+
+# Whitespace characters that separate the spans of a fragmented run.
+SPACES = " \n\t"
+
+# Handle plural form of acronyms, e.g., IDPs -> IDP
+ACRONYM_PLURAL_PATTERN = re.compile(r"(\W[A-Z]{2,})(s)(\W)")
+
+
+# Classes of the characters for which `str.isalpha` is True, in ASCII texts and in
+# texts without numeric characters other than digits, e.g., "²", which `\w` matches.
+ASCII_ALPHA = "[A-Za-z]"
+WORD_ALPHA = r"[^\W\d_]"
+
+
+@functools.lru_cache(maxsize=1)
+def _numeric_ranges() -> str:
+    """Ranges of the numeric characters that are neither decimal digits nor letters.
+    """
+    ranges = []
+
+    for code in range(sys.maxunicode + 1):
+        char = chr(code)
+
+        if char.isnumeric() and not char.isdecimal() and not char.isalpha():
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([code, code])
+
+    # Ranges keep the class small, a class of the individual characters is much slower to match.
+    return "".join(
+        re.escape(chr(start)) if start == end else f"{re.escape(chr(start))}-{re.escape(chr(end))}"
+        for start, end in ranges)
+
+
+@functools.lru_cache(maxsize=1)
+def _numeric_pattern():
+    return re.compile(f"[{_numeric_ranges()}]")
+
+
+def get_alpha_class(text: str) -> str:
+    """Returns the fastest regex character class matching the letters of `text` as `str.isalpha`.
+    """
+    if text.isascii():
+        return ASCII_ALPHA
+
+    if _numeric_pattern().search(text) is None:
+        return WORD_ALPHA
+
+    return rf"[^\W\d_{_numeric_ranges()}]"
+
+
+@functools.lru_cache(maxsize=None)
+def get_fragment_patterns(max_len: int = 5, alpha: str = WORD_ALPHA):
+    """Compiles the patterns of the runs of whitespace-terminated spans of at most `max_len` letters.
+
+    The first pattern matches the fragmented runs, i.e., having at least two whitespace
+    characters. Its groups are the run, the letters following the run, and the character
+    ending the run, if any. The second pattern matches a single span at the end of the text.
+    """
+    span = rf"{alpha}{{1,{max_len}}}[{SPACES}]"
+
+    fragment_pattern = re.compile(
+        rf"(?<!{alpha})({span}(?:{span}|[{SPACES}])+)({alpha}*)(.)?", re.DOTALL)
+    last_span_pattern = re.compile(rf"(?<!{alpha}){span}\Z")
+
+    return fragment_pattern, last_span_pattern
+
+
+def get_english_wordlist() -> Optional[str]:
+    """Path of the frequency ordered English word list shipped with wordninja, if installed.
+    """
+    spec = importlib.util.find_spec("wordninja")
+
+    if spec is None or spec.origin is None:
+        return None
+
+    fname = os.path.join(os.path.dirname(spec.origin), "wordninja_words.txt.gz")
+
+    return fname if os.path.isfile(fname) else None
+
+
+def build_model(path: str, wordlists: List[str], load_factor: float = 0.5) -> int:
+    """Builds the domain segmentation model from the word lists and stores it in `path`.
+
+    As in wordninja, the cost of a word is derived from its rank in a frequency ordered
+    word list assuming a Zipf distribution. Each word list is ranked separately and
+    a word takes its lowest cost, so the domain words don't push down the common English
+    words. The words of phrases, e.g., `private_sector`, are ranked separately from
+    the phrases. Returns the number of words.
+    """
+    word_costs = {}
+    max_word_len = 1
+
+    for fname in wordlists:
+        word_ranks = {}
+        for entry in read_wordlist(fname):
+            for word in entry.lower().split("_"):
+                if word:
+                    word_ranks.setdefault(word, len(word_ranks))
+
+        log_num_words = math.log(max(len(word_ranks), 2))
+
+        for word, rank in word_ranks.items():
+            value = word_hash(word)
+            cost = math.log((rank + 1) * log_num_words)
+            word_costs[value] = min(cost, word_costs.get(value, math.inf))
+            max_word_len = max(max_word_len, len(word))
+
+    table, slots = build_hash_table(word_costs, load_factor=load_factor)
+
+    costs = np.zeros(len(table), dtype=np.float32)
+    for value, slot in slots.items():
+        costs[slot] = word_costs[value]
+
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    np.save(os.path.join(path, TABLE_FILE), table)
+    np.save(os.path.join(path, COSTS_FILE), costs)
+
+    with open(os.path.join(path, META_FILE), "w") as meta_file:
+        json.dump(dict(
+            max_word_len=max_word_len,
+            num_words=len(word_costs),
+            wordlists=[os.path.basename(fname) for fname in wordlists]), meta_file)
+
+    return len(word_costs)
+
+
+class FrozenLanguageModel:
+    """Read-only unigram model of the word costs backed by memory-mapped arrays.
+
+    The `split` method implements the same dynamic programming as wordninja.
+
+    Example:
+        model = FrozenLanguageModel(DEFAULT_MODEL_DIR)
+        model.split("protectedbyunhcr")  # ["protected", "by", "unhcr"]
+    """
+
+    def __init__(self, path: str = DEFAULT_MODEL_DIR):
+        self.path = path
+
+        with open(os.path.join(path, META_FILE)) as meta_file:
+            meta = json.load(meta_file)
+
+        self.max_word_len = meta["max_word_len"]
+        self.table = np.load(os.path.join(path, TABLE_FILE), mmap_mode="r").view(np.ndarray)
+        self.costs = np.load(os.path.join(path, COSTS_FILE), mmap_mode="r").view(np.ndarray)
+
+    def word_cost(self, word: str) -> float:
+        slot = find_slot(self.table, word_hash(word))
+
+        return float(self.costs[slot]) if slot >= 0 else math.inf
+
+    def split(self, text: str) -> List[str]:
+        """Splits the letters in `text` into the sequence of words of minimum cost.
+        """
+        lower = text.lower()
+        costs = [0.0]
+        lengths = [0]
+
+        for i in range(1, len(text) + 1):
+            # Ties are resolved in favor of the shortest last word.
+            best_cost, best_len = min(
+                (costs[i - k] + self.word_cost(lower[i - k:i]), k)
+                for k in range(1, min(i, self.max_word_len) + 1))
+            costs.append(best_cost)
+            lengths.append(best_len)
+
+        words = []
+        i = len(text)
+
+        while i > 0:
+            words.append(text[i - lengths[i]:i])
+            i -= lengths[i]
+
+        return words[::-1]
+
+
+@functools.lru_cache(maxsize=None)
+def get_language_model(path: Optional[str] = None) -> FrozenLanguageModel:
+    """Loads the domain segmentation model once per process.
+    """
+    path = path or DEFAULT_MODEL_DIR
+
+    if not os.path.isfile(os.path.join(path, META_FILE)):
+        raise FileNotFoundError(
+            f"No segmentation model in {path}. Build it with: python -m wb_cleaning.cleaning.segmentation")
+
+    return FrozenLanguageModel(path)
+
+
+# wordninja loads its English model when imported, so defer it until needed.
+resources.register("wordninja", lambda: importlib.import_module("wordninja"))
+
+
+@functools.lru_cache(maxsize=SPLIT_CACHE_SIZE)
+def split_fragment(fragment: str, model: Optional[FrozenLanguageModel] = None) -> str:
+    """Memoized segmentation of the letters of a fragmented run into space separated words.
+
+    Uses wordninja's English model if `model` is None.
+    """
+    if model is None:
+        return " ".join(resources.get("wordninja").split(fragment))
+
+    return " ".join(model.split(fragment))
+
+
+def recover_segmented_words(raw_input: str, max_len: int = 5,
+                            model: Optional[FrozenLanguageModel] = None) -> str:
+    """This algorithm processes and input text to detect and fix any malformed words.
+    This does not attempt to split contiguous words.
+
+    The fragments are segmented with the domain `model`, or with wordninja if None.
+
+    Example:
+        input: "million p rote c te d   by u n h c r Of the world's displaced"
+        output: "million protected by unhcr Of the world's displaced"
+
+    """
+    raw_text = ACRONYM_PLURAL_PATTERN.sub(r"\1\3", raw_input)
+    # Add non-alpha character at the end.
+    raw_text = raw_text + " "
+
+    fragment_pattern, last_span_pattern = get_fragment_patterns(
+        max_len, get_alpha_class(raw_text))
+
+    buffer = []
+    position = 0
+
+    for match in fragment_pattern.finditer(raw_text):
+        run, tail, end = match.groups()
+        buffer.append(raw_text[position:match.start()])
+        position = match.end()
+
+        # A run reaching the end of the text is dropped, as in the original
+        # character-based implementation.
+        if end is not None:
+            buffer.append(split_fragment("".join(run.split()), model))
+            buffer.append(" " + tail + end)
+
+    # This is also the case of a single span at the end of the text.
+    last_span = last_span_pattern.search(
+        raw_text, max(position, len(raw_text) - max_len - 1))
+
+    buffer.append(raw_text[position:last_span.start() if last_span else None])
+
+    return "".join(buffer)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the domain word segmentation model used to recover fragmented words.")
+    parser.add_argument("--wordlist", action="append", default=[],
+                        help="Additional frequency ordered word list. Defaults to wordninja's English word list.")
+    parser.add_argument("--output", default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--load-factor", type=float, default=0.5)
+    args = parser.parse_args()
+
+    wordlists = args.wordlist or [get_english_wordlist()]
+    if None in wordlists:
+        parser.error("wordninja is not installed, pass an English word list with --wordlist.")
+
+    num_words = build_model(
+        args.output, DEFAULT_WORDLISTS + wordlists, load_factor=args.load_factor)
+
+    print(f"Stored {num_words} words in {args.output}")
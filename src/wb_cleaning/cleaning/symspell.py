@@ -0,0 +1,252 @@
+"""This module implements a symmetric delete (SymSpell) index for spelling suggestions.
+
+The index maps the deletes of the prefix of each known word, up to `max_distance`
+deleted characters, to the word. The candidates for a misspelled word are the words
+sharing one of the deletes of its prefix, ranked by their actual edit distance and
+by the order of the words in the source word lists, e.g., by frequency.
+
+The index is stored as numpy arrays which are memory-mapped at load, so it loads
+instantly and is shared by the worker processes through the page cache.
+
+Build the index with:
+    python -m wb_cleaning.cleaning.symspell --wordlist /usr/share/hunspell/en_US.dic
+"""
+import argparse
+import functools
+import gzip
+import hashlib
+import json
+import os
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from wb_cleaning import dir_manager
+
+DEFAULT_INDEX_DIR = dir_manager.get_path_from_root("models", "symspell")
+DEFAULT_WORDLISTS = [
+    dir_manager.get_data_dir("whitelists", "whitelists", "doc-freq-wiki-wordlist.txt"),
+]
+
+META_FILE = "meta.json"
+WORDS_FILE = "words.npy"
+WORD_OFFSETS_FILE = "word_offsets.npy"
+DELETE_HASHES_FILE = "delete_hashes.npy"
+DELETE_WORD_IDS_FILE = "delete_word_ids.npy"
+
+
+def batch_edit_distance(words: list, others: list) -> np.ndarray:
+    """Computes the Levenshtein distance of each pair `words[i]` and `others[i]`.
+
+    This gives the same result as nltk's `edit_distance` with the default arguments.
+    All pairs are processed at once, row by row of the dynamic programming table.
+    The insertions along a row are resolved with a cumulative minimum.
+    """
+    num_pairs = len(words)
+    distances = np.zeros(num_pairs, dtype=np.int64)
+
+    if num_pairs == 0:
+        return distances
+
+    word_lens = np.array([len(word) for word in words])
+    other_lens = np.array([len(other) for other in others])
+
+    # Pad with different values so that the padding never matches.
+    word_codes = np.full((num_pairs, max(word_lens.max(), 1)), -1, dtype=np.int64)
+    other_codes = np.full((num_pairs, max(other_lens.max(), 1)), -2, dtype=np.int64)
+
+    for index, (word, other) in enumerate(zip(words, others)):
+        word_codes[index, :len(word)] = list(map(ord, word))
+        other_codes[index, :len(other)] = list(map(ord, other))
+
+    cols = np.arange(other_codes.shape[1] + 1)
+    row = np.tile(cols, (num_pairs, 1))
+
+    distances[word_lens == 0] = other_lens[word_lens == 0]
+
+    for i in range(1, word_lens.max() + 1):
+        cost = (word_codes[:, i - 1:i] != other_codes).astype(np.int64)
+
+        cand = np.empty_like(row)
+        cand[:, 0] = i
+        cand[:, 1:] = np.minimum(row[:, 1:] + 1, row[:, :-1] + cost)
+
+        row = np.minimum.accumulate(cand - cols, axis=1) + cols
+
+        done = word_lens == i
+        distances[done] = row[done, other_lens[done]]
+
+    return distances
+
+
+def hash_key(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(
+        key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def generate_deletes(word: str, max_distance: int) -> set:
+    """Generates the word and all the strings obtained by deleting up to `max_distance` characters.
+    """
+    deletes = {word}
+    current = {word}
+
+    for _ in range(max_distance):
+        current = {item[:i] + item[i + 1:]
+                   for item in current for i in range(len(item))}
+        deletes.update(current)
+
+    return deletes
+
+
+def read_wordlist(fname: str) -> Iterable[str]:
+    """Reads the words from a word list (one word per line), optionally gzipped, or a hunspell `.dic` file.
+    """
+    opener = gzip.open if fname.endswith(".gz") else open
+
+    with opener(fname, "rt", encoding="utf-8", errors="ignore") as wordlist_file:
+        for line_num, line in enumerate(wordlist_file):
+            # Hunspell dictionaries start with the number of words and
+            # the words may be followed by their affix flags.
+            word = line.split("/")[0].split("\t")[0].strip()
+
+            if not word or (line_num == 0 and word.isdigit()):
+                continue
+
+            yield word
+
+
+def build_index(path: str, wordlists: List[str], max_distance: int = 2, prefix_length: int = 7) -> int:
+    """Builds the index from the word lists and stores it in `path`.
+
+    The words are ranked by their order in the word lists so frequency
+    ordered lists should come first. Returns the number of words indexed.
+    """
+    word_ids = {}
+    for fname in wordlists:
+        for word in read_wordlist(fname):
+            word_ids.setdefault(word, len(word_ids))
+
+    words = list(word_ids)
+    del word_ids
+
+    delete_hashes = []
+    delete_word_ids = []
+
+    for word_id, word in enumerate(words):
+        for key in generate_deletes(word.lower()[:prefix_length], max_distance):
+            delete_hashes.append(hash_key(key))
+            delete_word_ids.append(word_id)
+
+    delete_hashes = np.array(delete_hashes, dtype=np.uint64)
+    order = np.argsort(delete_hashes, kind="stable")
+
+    encoded_words = [word.encode("utf-8") for word in words]
+    word_offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    word_offsets[1:] = np.cumsum([len(word) for word in encoded_words])
+
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    np.save(os.path.join(path, WORDS_FILE),
+            np.frombuffer(b"".join(encoded_words), dtype=np.uint8))
+    np.save(os.path.join(path, WORD_OFFSETS_FILE), word_offsets)
+    np.save(os.path.join(path, DELETE_HASHES_FILE), delete_hashes[order])
+    np.save(os.path.join(path, DELETE_WORD_IDS_FILE),
+            np.array(delete_word_ids, dtype=np.int32)[order])
+
+    with open(os.path.join(path, META_FILE), "w") as meta_file:
+        json.dump(dict(
+            max_distance=max_distance,
+            prefix_length=prefix_length,
+            num_words=len(words),
+            wordlists=[os.path.basename(fname) for fname in wordlists]), meta_file)
+
+    return len(words)
+
+
+class SymSpellIndex:
+    """Read-only, memory-mapped symmetric delete index.
+
+    Example:
+        index = SymSpellIndex(DEFAULT_INDEX_DIR)
+        index.lookup("regresion")  # ["regression", ...]
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_DIR):
+        self.path = path
+
+        with open(os.path.join(path, META_FILE)) as meta_file:
+            meta = json.load(meta_file)
+
+        self.max_distance = meta["max_distance"]
+        self.prefix_length = meta["prefix_length"]
+
+        # Plain array views of the memory maps avoid the overhead of `np.memmap` indexing.
+        self.words = self._load_array(WORDS_FILE)
+        self.word_offsets = self._load_array(WORD_OFFSETS_FILE)
+        self.delete_hashes = self._load_array(DELETE_HASHES_FILE)
+        self.delete_word_ids = self._load_array(DELETE_WORD_IDS_FILE)
+
+    def _load_array(self, fname: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, fname), mmap_mode="r").view(np.ndarray)
+
+    def __len__(self) -> int:
+        return len(self.word_offsets) - 1
+
+    def get_word(self, word_id: int) -> str:
+        return self.words[self.word_offsets[word_id]:self.word_offsets[word_id + 1]].tobytes().decode("utf-8")
+
+    def lookup(self, word: str, max_distance: Optional[int] = None, max_suggestions: int = 10) -> List[str]:
+        """Returns the known words within `max_distance` edits of `word`.
+
+        The candidates are sorted by edit distance and then by rank. The word
+        itself is the first candidate if it is known.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+
+        max_distance = min(max_distance, self.max_distance)
+        lword = word.lower()
+
+        hashes = np.array([hash_key(key) for key in generate_deletes(
+            lword[:self.prefix_length], max_distance)], dtype=np.uint64)
+
+        starts = np.searchsorted(self.delete_hashes, hashes, side="left")
+        ends = np.searchsorted(self.delete_hashes, hashes, side="right")
+
+        word_ids = np.unique(np.concatenate(
+            [self.delete_word_ids[start:end] for start, end in zip(starts, ends)]))
+
+        candidates = [self.get_word(word_id) for word_id in word_ids]
+        distances = batch_edit_distance(
+            [lword] * len(candidates), [candidate.lower() for candidate in candidates])
+
+        # Hash collisions and matches on the prefix only are dropped here.
+        valid = np.flatnonzero(distances <= max_distance)
+        order = valid[np.lexsort((word_ids[valid], distances[valid]))]
+
+        return [candidates[i] for i in order[:max_suggestions]]
+
+
+@functools.lru_cache(maxsize=None)
+def get_index(path: Optional[str] = None) -> SymSpellIndex:
+    """Loads the index once per process.
+    """
+    return SymSpellIndex(path or DEFAULT_INDEX_DIR)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the SymSpell index used by the respeller.")
+    parser.add_argument("--wordlist", action="append", default=[],
+                        help="Additional word list or hunspell .dic file, e.g., the en_US dictionary.")
+    parser.add_argument("--output", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--max-distance", type=int, default=2)
+    parser.add_argument("--prefix-length", type=int, default=7)
+    args = parser.parse_args()
+
+    num_words = build_index(
+        args.output, DEFAULT_WORDLISTS + args.wordlist,
+        max_distance=args.max_distance, prefix_length=args.prefix_length)
+
+    print(f"Indexed {num_words} words in {args.output}")
@@ -19,44 +19,82 @@ newline_pattern = re.compile(b'[\r\n]+')
 whitespaces_pattern = re.compile(r'\s+')
 alphabet_pattern = re.compile('[a-zA-ZÀ-ÖØ-öø-ÿа-ҳА-Ҳ]+')
 
+# Maximum number of words preceding an acronym considered as its full name.
+MAX_CANDIDATE_WORDS = 5
+# Initial number of characters before an acronym searched for its candidate words.
+CANDIDATE_WINDOW_SIZE = 128
+
+# Matches the space terminated words right before the end of the searched window.
+candidate_words_pattern = re.compile(
+    rf"(?:[a-zA-ZÀ-ÖØ-öø-ÿа-ҳА-Ҳ'-]+ ){{0,{MAX_CANDIDATE_WORDS}}}\Z")
+
 stops = set(['the', 'of', 'in', 'and', 'or', 'for'])
 stops.update(nltk_stops)
 
 
-def extract_acronyms(txt):
+def get_candidate_words(txt, end, start=0):
+    """
+    Returns the (at most `MAX_CANDIDATE_WORDS`) words right before the position `end` of the whitespace-normalized `txt`.
+    Only a window of the text before `end` is searched, it is expanded if a word may have been cut.
+    """
+    window_size = CANDIDATE_WINDOW_SIZE
+
+    while True:
+        window_start = max(start, end - window_size)
+        match = candidate_words_pattern.search(txt, window_start, end)
+
+        # Words are separated by single spaces, so a match starting at
+        # one of the first two characters may continue before the window.
+        if match.start() > window_start + 1 or window_start == start:
+            return match.group()
+
+        window_size *= 2
+
+
+def get_full_name(candidate, acr):
+    """
+    Forms the full name of the acronym `acr` from the initials of the words in `candidate`, if possible.
+    """
+    candidate = ' '.join(alphabet_pattern.findall(candidate))
+
+    full_name = []
+    l = 0
+    acr_char_counts = Counter(acr)
+    for c in candidate.strip().split()[::-1]:
+        c_title = c.title()
+        if c in stops and l > 0:
+            full_name.append(c)
+        elif (c_title[0] in acr_char_counts) and (acr_char_counts[c_title[0]] > 0):
+            l += 1
+            full_name.append(c_title)
+            acr_char_counts[c_title[0]] -= 1
+        if l >= len(acr):
+            return " ".join(full_name[::-1])
+
+    return None
+
+
+def extract_acronyms(txt, normalized=False):
     """
     This function extracts candidate acronyms that satisfy a specific set of patterns.
+
+    Each parenthesized acronym, e.g., (NPHC), is found in a single scan of the text and
+    its full name is formed from the words right before it. The full name found last is kept.
+    Set `normalized` if the whitespaces of the text are already collapsed into single spaces.
     """
-    acronyms = [i.strip('(').strip(')') for i in acronyms_pattern.findall(txt)]
-    keyword = '|'.join([rf'\({k}\)' for k in acronyms])
-    # ((?:[^a-zA-Z'-]+[a-zA-Z'-]+){0,5})"
-    candidates_acronym_pattern = "((?:[a-zA-ZÀ-ÖØ-öø-ÿа-ҳА-Ҳ'-]+ ){0,5})(" + keyword + ")"
-    candidates_acronym_pattern = re.compile(candidates_acronym_pattern)
-    acronym_candidates_lists = candidates_acronym_pattern.findall(
-        whitespaces_pattern.sub(' ', txt))
+    if not normalized:
+        txt = whitespaces_pattern.sub(' ', txt)
     detected_acronyms = {}
+    start = 0
 
-    for ip in acronym_candidates_lists:
-        candidate, acronym = ip
-        candidate = ' '.join(alphabet_pattern.findall(candidate))
-
-        full_name = []
-        formed_acronym = []
-        acr = acronym.strip('(').strip(')')
-        l = 0
-        acr_char_counts = Counter(acr)
-        for c in candidate.strip().split()[::-1]:
-            c_title = c.title()
-            if c in stops and l > 0:
-                full_name.append(c)
-            elif (c_title[0] in acr_char_counts) and (acr_char_counts[c_title[0]] > 0):
-                l += 1
-                full_name.append(c_title)
-                formed_acronym.append(c_title)
-                acr_char_counts[c_title[0]] -= 1
-            if l >= len(acr):
-                detected_acronyms[acr] = " ".join(full_name[::-1])
-                break
+    for match in acronyms_pattern.finditer(txt):
+        acr = match.group()[1:-1]
+        full_name = get_full_name(get_candidate_words(txt, match.start(), start), acr)
+
+        if full_name is not None:
+            detected_acronyms[acr] = full_name
+
+        start = match.end()
 
     return detected_acronyms
 
@@ -69,7 +107,7 @@ def extract_acronyms_array(txt):
     return acronyms
 
 
-def detect_acronyms(txt):
+def detect_acronyms(txt, normalized=False):
     '''
     This method extracts acronyms from a text document. An acronym can be detected if it's defined with similar form as follows:
         National Population and Housing Census (NPHC)
@@ -77,6 +115,7 @@ def detect_acronyms(txt):
 
     Input:
         text (str): string type object where acronyms will be detected from.
+        normalized (bool): whether the whitespaces of the text are already collapsed into single spaces.
 
     Output:
         acronyms_map (dict): this is a dictionary that maps the acronym to a set of possible original forms of the acronym.
@@ -94,7 +133,7 @@ def detect_acronyms(txt):
     #         l = len(a) - 2
     #         detected_acronyms.append((a[1:-1], ' '.join(candidates[ix - l:ix])))
 
-    detected_acronyms = extract_acronyms(txt).items()
+    detected_acronyms = extract_acronyms(txt, normalized=normalized).items()
     acronyms_map = {}
 
     for a, n in detected_acronyms:
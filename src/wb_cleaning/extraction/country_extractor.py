@@ -83,8 +83,10 @@ def load_country_groups_names():
         sheet_name="groups_names", header=0, index_col=0).to_dict()["Full name"]
 
 
-def get_country_counts(txt):
-    txt = re.sub(r"\s+", " ", txt)
+def get_country_counts(txt, normalized=False):
+    # Set `normalized` if the whitespaces of the text are already collapsed into single spaces.
+    if not normalized:
+        txt = re.sub(r"\s+", " ", txt)
     try:
         replaced = replace_countries(txt)
     except IndexError:
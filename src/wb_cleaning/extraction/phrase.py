@@ -1,15 +1,17 @@
 '''
 This module contains methods that processes texts to extract phrases.
 '''
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 import functools
 
-import spacy
 import nltk
 
 from nltk import WordNetLemmatizer
 from nltk.corpus import wordnet
 
+if TYPE_CHECKING:
+    import spacy
+
 try:
     # Test if wordnet is available else download.
     wordnet.ADJ
@@ -79,7 +81,7 @@ def generate_phrase(phrase_tokens: list, phrase_pos: list, library: str):
 
 
 def get_spacy_phrases(
-        doc: spacy.tokens.doc.Doc, min_token_length: int = 3,
+        doc: "spacy.tokens.doc.Doc", min_token_length: int = 3,
         token_func: Optional[Callable] = None,
         token_container: Optional[list] = None) -> list:
     '''This function extracts phrases from a text based on the part-of-speech tag.
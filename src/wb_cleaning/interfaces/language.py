@@ -1,5 +1,6 @@
 import enchant
 from wb_cleaning import dir_manager
+from wb_cleaning.ops import resources
 
 
 class Language:
@@ -44,11 +45,10 @@ class Language:
         self.init_en_dict()
 
 
-EN_LANG = None
+resources.register("en_lang", Language)
 
 
 def get_en_dict():
-    global EN_LANG
-    if EN_LANG is None:
-        EN_LANG = Language()
-    return EN_LANG.get_en_dict()
+    # The dictionary is built on first use since adding the whitelisted
+    # words to the session takes a while.
+    return resources.get("en_lang").get_en_dict()
@@ -7,11 +7,16 @@
 # WB_CLEANING_REDIS_HOSTNAME=localhost python
 
 '''
+import argparse
+import itertools
 import os
 import json
 import joblib
 import redis
 
+from wb_cleaning.ops import resources
+from wb_cleaning.ops.disk_cache import make_cache_key
+
 
 def get_redis_params():
     '''Extracts redis params from env but fallsback to container host if not present.
@@ -46,37 +51,228 @@ def get_redis():
 
 CACHE_HASH_BUCKET = 'cache-hashes'
 
-try:
-    redis_cache = get_redis()
-    redis_cache.hset('test', '1029', '1029')
-except redis.ConnectionError:
-    # Fallback to localhost
-    os.environ['WB_CLEANING_REDIS_HOSTNAME'] = 'localhost'
-    redis_cache = get_redis()
+# Maximum number of keys sent in a single command by the batch operations.
+BATCH_CHUNK_SIZE = 1000
+
+# Buckets already registered in `CACHE_HASH_BUCKET` by this process.
+_REGISTERED_BUCKETS = set()
+
+# Separator of the function id and the namespace in the id of a bucket.
+NAMESPACE_SEPARATOR = '::'
+
+# Id of the function caching the inferences of the respeller, namespaced by `Respeller.get_cache_namespace`.
+RESPELLER_FUNC_ID = 'wb_cleaning/cleaning/respelling/cached_infer_correct_word'
 
+
+def _connect_redis():
+    '''Connects to redis and checks that the server is available.
+    '''
     try:
+        redis_cache = get_redis()
         redis_cache.hset('test', '1029', '1029')
-    except redis.ConnectionError as error:
-        args = list(error.args)
-        message = """
-        # # If redis is not yet present, instantiate a docker instance of redis using the following command...
-        # docker run --name=wb-cleaning-redis --publish=6379:6379 --hostname=redis --restart=on-failure --detach redis:latest"""
-        args[0] = f"{args[0]}\n\n{message}"
-        error.args = tuple(args)
+    except redis.ConnectionError:
+        # Fallback to localhost
+        os.environ['WB_CLEANING_REDIS_HOSTNAME'] = 'localhost'
+        redis_cache = get_redis()
+
+        try:
+            redis_cache.hset('test', '1029', '1029')
+        except redis.ConnectionError as error:
+            args = list(error.args)
+            message = """
+            # # If redis is not yet present, instantiate a docker instance of redis using the following command...
+            # docker run --name=wb-cleaning-redis --publish=6379:6379 --hostname=redis --restart=on-failure --detach redis:latest"""
+            args[0] = f"{args[0]}\n\n{message}"
+            error.args = tuple(args)
+
+            raise error
+
+    return redis_cache
+
+
+resources.register('redis_cache', _connect_redis)
+
+
+def get_redis_cache():
+    '''Returns the redis instance used for caching. The connection is made on first use.
+    '''
+    return resources.get('redis_cache')
 
-        raise error
+
+def __getattr__(name):
+    # Keep `cache_utils.redis_cache` available without connecting at import.
+    if name == 'redis_cache':
+        return get_redis_cache()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_from_bucket(bucket_id, key):
     '''Wrapper function for hget.
     '''
-    return redis_cache.hget(bucket_id, key)
+    return get_redis_cache().hget(bucket_id, key)
 
 
 def store_to_bucket(bucket_id, key, value):
     '''Wrapper function for hset.
     '''
-    return redis_cache.hset(bucket_id, key, value)
+    return get_redis_cache().hset(bucket_id, key, value)
+
+
+def get_many_from_bucket(bucket_id, keys):
+    '''Gets the values of the keys in a single round-trip using pipelined hmget.
+
+    Returns a list aligned with `keys` with None for the missing keys.
+    '''
+    if not keys:
+        return []
+
+    pipe = get_redis_cache().pipeline(transaction=False)
+
+    for start in range(0, len(keys), BATCH_CHUNK_SIZE):
+        pipe.hmget(bucket_id, keys[start:start + BATCH_CHUNK_SIZE])
+
+    return [value for chunk in pipe.execute() for value in chunk]
+
+
+def store_many_to_bucket(bucket_id, mapping):
+    '''Stores the key-value pairs in `mapping` in a single round-trip using pipelined hset.
+    '''
+    if not mapping:
+        return
+
+    items = list(mapping.items())
+    pipe = get_redis_cache().pipeline(transaction=False)
+
+    for start in range(0, len(items), BATCH_CHUNK_SIZE):
+        pipe.hset(bucket_id, mapping=dict(items[start:start + BATCH_CHUNK_SIZE]))
+
+    pipe.execute()
+
+
+def register_bucket(bucket_id):
+    '''Records the bucket in `CACHE_HASH_BUCKET`, once per process.
+    '''
+    if bucket_id not in _REGISTERED_BUCKETS:
+        store_to_bucket(CACHE_HASH_BUCKET, bucket_id, 0)
+        _REGISTERED_BUCKETS.add(bucket_id)
+
+
+def get_bucket_id(func_id, namespace=None):
+    '''Id of the bucket of the values of `func_id` cached in the `namespace`, e.g., a config id.
+    '''
+    return func_id if not namespace else f'{func_id}{NAMESPACE_SEPARATOR}{namespace}'
+
+
+def list_namespaces(func_id):
+    '''Lists the namespaces of the cached values of `func_id` recorded in `CACHE_HASH_BUCKET`.
+
+    The bucket of the values cached without a namespace, e.g., before the namespaces
+    were introduced, is listed as the empty namespace.
+    '''
+    prefix = f'{func_id}{NAMESPACE_SEPARATOR}'
+    bucket_ids = [bucket_id.decode('utf-8') for bucket_id in get_redis_cache().hkeys(CACHE_HASH_BUCKET)]
+
+    return sorted(
+        bucket_id[len(prefix):] if bucket_id != func_id else ''
+        for bucket_id in bucket_ids if bucket_id == func_id or bucket_id.startswith(prefix))
+
+
+def get_namespace_size(func_id, namespace):
+    '''Returns the number of values cached in the namespace and the memory they use in bytes, if available.
+    '''
+    redis_cache = get_redis_cache()
+    bucket_id = get_bucket_id(func_id, namespace)
+
+    try:
+        memory = redis_cache.memory_usage(bucket_id)
+    except redis.ResponseError:
+        # The MEMORY command is not supported by the server.
+        memory = None
+
+    return dict(count=redis_cache.hlen(bucket_id), memory=memory)
+
+
+def copy_namespace(func_id, source, target, overwrite=False):
+    '''Copies the cached values of the `source` namespace to the `target` namespace.
+
+    Existing values in the `target` are kept unless `overwrite` is True.
+    Returns the number of values copied.
+    '''
+    redis_cache = get_redis_cache()
+    source_id = get_bucket_id(func_id, source)
+    target_id = get_bucket_id(func_id, target)
+
+    items = redis_cache.hscan_iter(source_id, count=BATCH_CHUNK_SIZE)
+    num_copied = 0
+
+    while True:
+        chunk = dict(itertools.islice(items, BATCH_CHUNK_SIZE))
+
+        if not chunk:
+            break
+
+        if overwrite:
+            store_many_to_bucket(target_id, chunk)
+            num_copied += len(chunk)
+        else:
+            pipe = redis_cache.pipeline(transaction=False)
+
+            for key, value in chunk.items():
+                pipe.hsetnx(target_id, key, value)
+
+            num_copied += sum(pipe.execute())
+
+    register_bucket(target_id)
+
+    return num_copied
+
+
+def evict_namespace(func_id, namespace):
+    '''Deletes the cached values of the namespace and returns their number.
+    '''
+    redis_cache = get_redis_cache()
+    bucket_id = get_bucket_id(func_id, namespace)
+
+    count = redis_cache.hlen(bucket_id)
+    redis_cache.delete(bucket_id)
+    redis_cache.hdel(CACHE_HASH_BUCKET, bucket_id)
+    _REGISTERED_BUCKETS.discard(bucket_id)
+
+    return count
+
+
+def map_bucket(bucket_id, keys, compute_many):
+    '''Gets the json values of the keys from the bucket. The missing keys are computed
+    with `compute_many` in a single call and stored back in the bucket.
+
+    Args:
+        bucket_id:
+            Name of the redis hash.
+        keys:
+            List of keys.
+        compute_many:
+            Function that takes a list of keys and returns the list of their values.
+
+    Returns:
+        A list of the values aligned with `keys`.
+    '''
+    keys = list(keys)
+    values = {}
+
+    for key, fromcache in zip(keys, get_many_from_bucket(bucket_id, keys)):
+        if fromcache is not None:
+            values[key] = json.loads(fromcache.decode('utf-8'))
+
+    missing_keys = [key for key in dict.fromkeys(keys) if key not in values]
+
+    if missing_keys:
+        computed = dict(zip(missing_keys, compute_many(missing_keys)))
+        store_many_to_bucket(
+            bucket_id, {key: json.dumps(value) for key, value in computed.items()})
+        values.update(computed)
+
+    return [values[key] for key in keys]
 
 
 def get_func_fullname(func):
@@ -103,27 +299,32 @@ def get_argument_hash(func, args, kwargs, ignore_list=None):
 
 
 def redis_cacher(func):
-    # TODO: add a namespace
     '''
     Must be used only to cache string in the meantime.
     For unhashed key, specify the `argument_hash` kwargs.
+    The values are stored in the bucket of the `cache_namespace` kwargs, if given.
+
+    The wrapper also has a `map(keys, compute_many, namespace=None)` method
+    to get the values of many `argument_hash` keys in a single round-trip.
     '''
+    func_id = get_func_fullname(func)
+
     def wrapper(*args, **kwargs):
 
         argument_hash = kwargs.get(
             'argument_hash', get_argument_hash(func, args, kwargs))
-        func_id = get_func_fullname(func)
+        bucket_id = get_bucket_id(func_id, kwargs.get('cache_namespace'))
 
-        store_to_bucket(CACHE_HASH_BUCKET, func_id, 0)
+        register_bucket(bucket_id)
 
-        fromcache = redis_cache.hget(func_id, argument_hash)
+        fromcache = get_from_bucket(bucket_id, argument_hash)
 
         if fromcache is None:
             value = func(*args, **kwargs)
             tocache = json.dumps(value)
 
             # print(func_id, argument_hash)
-            redis_cache.hset(func_id, argument_hash, tocache)
+            store_to_bucket(bucket_id, argument_hash, tocache)
         else:
             # Decode since redis returns a byte encoded string
             fromcache = fromcache.decode('utf-8')
@@ -131,4 +332,102 @@ def redis_cacher(func):
 
         return value
 
+    def map_cached(keys, compute_many, namespace=None):
+        bucket_id = get_bucket_id(func_id, namespace)
+        register_bucket(bucket_id)
+
+        return map_bucket(bucket_id, keys, compute_many)
+
+    wrapper.map = map_cached
+
     return wrapper
+
+
+def make_disk_cacher(disk_cache):
+    '''Creates a decorator similar to `redis_cacher` that stores the values in a `DiskCache`.
+
+    This is the fallback when redis is not available. Unlike a joblib `Memory`,
+    the size of the cache is bounded by the `max_size` of the `DiskCache`.
+
+    Example:
+        cacher = make_disk_cacher(DiskCache('/tmp/cache.db', max_size=2 ** 28))
+        cached_func = cacher(func)
+    '''
+    def cacher(func):
+        func_id = get_func_fullname(func)
+
+        def wrapper(*args, **kwargs):
+            argument_hash = kwargs.get(
+                'argument_hash', get_argument_hash(func, args, kwargs))
+            key = make_cache_key(
+                get_bucket_id(func_id, kwargs.get('cache_namespace')), argument_hash)
+
+            value = disk_cache.get(key)
+
+            if value is None:
+                value = func(*args, **kwargs)
+                disk_cache.set(key, value)
+
+            return value
+
+        def map_cached(keys, compute_many, namespace=None):
+            bucket_id = get_bucket_id(func_id, namespace)
+            keys = list(keys)
+            values = {}
+
+            for key in keys:
+                if key not in values:
+                    value = disk_cache.get(make_cache_key(bucket_id, key))
+
+                    if value is not None:
+                        values[key] = value
+
+            missing_keys = [key for key in dict.fromkeys(keys) if key not in values]
+
+            if missing_keys:
+                computed = dict(zip(missing_keys, compute_many(missing_keys)))
+                disk_cache.set_many(
+                    {make_cache_key(bucket_id, key): value for key, value in computed.items()})
+                values.update(computed)
+
+            return [values[key] for key in keys]
+
+        wrapper.map = map_cached
+
+        return wrapper
+
+    return cacher
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Manage the namespaces of the redis cache, e.g., of the respeller configs.')
+    parser.add_argument('--func-id', default=RESPELLER_FUNC_ID,
+                        help='Id of the cached function. Defaults to the inference of the respeller.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help='List the namespaces and their sizes.')
+
+    size_parser = subparsers.add_parser('size', help='Show the size of a namespace.')
+    size_parser.add_argument('namespace')
+
+    copy_parser = subparsers.add_parser('copy', help='Copy the values of a namespace to another.')
+    copy_parser.add_argument('source')
+    copy_parser.add_argument('target')
+    copy_parser.add_argument('--overwrite', action='store_true')
+
+    evict_parser = subparsers.add_parser('evict', help='Delete the values of a namespace.')
+    evict_parser.add_argument('namespace')
+
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name in list_namespaces(args.func_id):
+            # The un-namespaced bucket is shown as "" which is how it's passed to the other commands.
+            print(name or '""', get_namespace_size(args.func_id, name))
+    elif args.command == 'size':
+        print(get_namespace_size(args.func_id, args.namespace))
+    elif args.command == 'copy':
+        print(f'Copied {copy_namespace(args.func_id, args.source, args.target, args.overwrite)} values')
+    elif args.command == 'evict':
+        print(f'Evicted {evict_namespace(args.func_id, args.namespace)} values')
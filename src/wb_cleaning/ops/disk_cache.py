@@ -0,0 +1,217 @@
+'''This module implements a persistent key-value cache backed by sqlite.
+
+The cache is content-addressed by the caller, e.g., the hash of a text and the id
+of the configuration used to process it. Values are stored as json. The total size
+of the stored values is bounded and the least recently used entries are evicted
+once `max_size` bytes is exceeded.
+'''
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_MAX_SIZE = 2 ** 30  # 1GB
+
+# Number of hits whose access time is buffered before being written to the database.
+ACCESS_FLUSH_SIZE = 1000
+
+
+def make_cache_key(*parts: str) -> str:
+    '''Computes a stable key from the given parts, e.g., text content and config id.
+    '''
+    hasher = hashlib.sha256()
+
+    for part in parts:
+        hasher.update(part.encode('utf-8', errors='surrogatepass'))
+        hasher.update(b'\0')
+
+    return hasher.hexdigest()
+
+
+class DiskCache:
+    '''Size-bounded, persistent key-value cache using sqlite as embedded backend.
+
+    Args:
+        path:
+            Path to the sqlite database file. It is created if it doesn't exist.
+        max_size:
+            Maximum total size in bytes of the stored values.
+        cull_ratio:
+            Fraction of `max_size` to which the cache is reduced when the limit
+            is exceeded. This avoids evicting entries on every write.
+
+    The access times of the hits are buffered and written with the next write,
+    eviction, or every `ACCESS_FLUSH_SIZE` hits, so that reads don't commit.
+    '''
+
+    def __init__(self, path: str, max_size: int = DEFAULT_MAX_SIZE, cull_ratio: float = 0.9):
+        self.path = path
+        self.max_size = max_size
+        self.cull_ratio = cull_ratio
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._accessed = {}
+        self._connect()
+
+    def _connect(self):
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        self.conn = sqlite3.connect(self.path, timeout=60)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+            'size INTEGER NOT NULL, accessed REAL NOT NULL)')
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+        self.conn.commit()
+
+        self.size = self._compute_size()
+
+    def _compute_size(self) -> int:
+        return self.conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+
+    def __getstate__(self):
+        # The sqlite connection can't be pickled, e.g., when sent to worker processes.
+        state = self.__dict__.copy()
+        state.pop('conn')
+        state['_accessed'] = {}
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._connect()
+
+    def __contains__(self, key: str) -> bool:
+        return self.conn.execute(
+            'SELECT 1 FROM cache WHERE key = ?', (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def get(self, key: str, default=None):
+        '''Returns the value stored for `key` or `default` if not present.
+        '''
+        row = self.conn.execute(
+            'SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._accessed[key] = time.time()
+
+        if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+            self._flush_accessed()
+            self.conn.commit()
+
+        return json.loads(row[0])
+
+    def _flush_accessed(self):
+        '''Writes the buffered access times, the caller commits.
+        '''
+        if self._accessed:
+            self.conn.executemany(
+                'UPDATE cache SET accessed = ? WHERE key = ?',
+                [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def set(self, key: str, value):
+        '''Stores a json serializable `value` under `key`.
+        '''
+        value = json.dumps(value).encode('utf-8')
+
+        row = self.conn.execute(
+            'SELECT size FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            self.size -= row[0]
+
+        self._flush_accessed()
+        self.conn.execute(
+            'INSERT OR REPLACE INTO cache (key, value, size, accessed) VALUES (?, ?, ?, ?)',
+            (key, value, len(value), time.time()))
+        self.conn.commit()
+
+        self.size += len(value)
+
+        if self.size > self.max_size:
+            self.evict()
+
+    def set_many(self, mapping: dict):
+        '''Stores the json serializable values of `mapping` in a single transaction.
+        '''
+        if not mapping:
+            return
+
+        accessed = time.time()
+        rows = [(key, json.dumps(value).encode('utf-8')) for key, value in mapping.items()]
+
+        self._flush_accessed()
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO cache (key, value, size, accessed) VALUES (?, ?, ?, ?)',
+            [(key, value, len(value), accessed) for key, value in rows])
+        self.conn.commit()
+
+        # Replaced entries make the running size inaccurate so recompute it.
+        self.size = self._compute_size()
+
+        if self.size > self.max_size:
+            self.evict()
+
+    def delete(self, key: str):
+        self.conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+        self.conn.commit()
+        self.size = self._compute_size()
+
+    def evict(self):
+        '''Removes the least recently used entries until the size is below `cull_ratio * max_size`.
+        '''
+        self._flush_accessed()
+
+        # Other processes may share the same database so get the actual size.
+        self.size = self._compute_size()
+        target_size = self.max_size * self.cull_ratio
+
+        evict_keys = []
+        for key, size in self.conn.execute('SELECT key, size FROM cache ORDER BY accessed'):
+            if self.size <= target_size:
+                break
+
+            evict_keys.append((key,))
+            self.size -= size
+
+        self.conn.executemany('DELETE FROM cache WHERE key = ?', evict_keys)
+        self.conn.commit()
+        self.evictions += len(evict_keys)
+
+    def clear(self):
+        self._accessed.clear()
+        self.conn.execute('DELETE FROM cache')
+        self.conn.commit()
+        self.size = 0
+
+    def stats(self) -> dict:
+        '''Returns the hit/miss/eviction counts of this instance and the size of the cache.
+        '''
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            count=len(self),
+            size=self.size,
+            max_size=self.max_size,
+        )
+
+    def close(self):
+        self._flush_accessed()
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,125 @@
+'''This module implements a bounded in-process cache with an optional time-to-live.
+
+It is meant as the first tier in front of a shared cache, e.g., redis or a `DiskCache`,
+so that hot entries are served from the process memory without a round-trip or a
+json decode, while the memory used by long-running workers stays bounded.
+'''
+import json
+import time
+from collections import OrderedDict
+
+# Approximate memory used by an entry in addition to the size of its json value.
+ENTRY_OVERHEAD_BYTES = 200
+
+_MISSING = object()
+
+
+def estimate_size(key, value) -> int:
+    return len(str(key)) + len(json.dumps(value)) + ENTRY_OVERHEAD_BYTES
+
+
+class MemoryCache:
+    '''Least recently used cache bounded by number of items and estimated size in bytes.
+
+    Args:
+        max_items:
+            Maximum number of entries, unbounded if None.
+        max_bytes:
+            Memory ceiling in bytes of the entries as computed by `sizeof`, unbounded if None.
+        ttl:
+            Time in seconds after which an entry expires, never if None.
+        sizeof:
+            Function estimating the memory used by a key and its value.
+    '''
+
+    def __init__(self, max_items: int = None, max_bytes: int = None, ttl: float = None,
+                 sizeof=estimate_size):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+
+        # key -> (value, size, expiry)
+        self.entries = OrderedDict()
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def get(self, key, default=None, count: bool = True):
+        '''Returns the value of `key` or `default` if it is missing or expired.
+        '''
+        entry = self.entries.get(key)
+
+        if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += count
+            return default
+
+        self.hits += count
+        self.entries.move_to_end(key)
+
+        return entry[0]
+
+    def set(self, key, value):
+        if key in self.entries:
+            self._remove(key)
+
+        size = self.sizeof(key, value) if self.max_bytes is not None else 0
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        self.entries[key] = (value, size, expiry)
+        self.size += size
+
+        while self.entries and (
+                (self.max_items is not None and len(self.entries) > self.max_items) or
+                (self.max_bytes is not None and self.size > self.max_bytes)):
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
+
+    def items(self) -> list:
+        return [(key, entry[0]) for key, entry in self.entries.items()]
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        '''Returns the hit/miss/eviction/expiration counts and the size of the cache.
+        '''
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            count=len(self),
+            size=self.size,
+            max_size=self.max_bytes,
+        )
@@ -0,0 +1,61 @@
+'''This module implements a registry of lazily loaded resources.
+
+Heavy resources such as the spaCy model, the fasttext language model, the enchant
+dictionary, and the connection to the cache backend are registered with a loader
+at import time but are only loaded on first use. This keeps the import of the
+cleaning modules cheap for short-lived workers and CLI tools.
+
+Only the resources are deferred, not every library. enchant is still imported
+with `respelling` since `OptimizedSpellChecker` subclasses its `SpellChecker`,
+and nltk imports sklearn and pandas, if installed, when it is imported.
+
+Example:
+    register('nlp', lambda: spacy.load('en_core_web_sm'))
+    nlp = get('nlp')  # The model is loaded here.
+'''
+import threading
+
+_LOADERS = {}
+_RESOURCES = {}
+_LOCK = threading.RLock()
+
+
+def register(name, loader):
+    '''Registers a loader for the resource `name`.
+
+    Re-registering a name replaces the loader and releases any loaded instance.
+    '''
+    with _LOCK:
+        _LOADERS[name] = loader
+        _RESOURCES.pop(name, None)
+
+
+def get(name):
+    '''Returns the resource `name`, loading it if needed.
+    '''
+    try:
+        return _RESOURCES[name]
+    except KeyError:
+        pass
+
+    with _LOCK:
+        if name not in _RESOURCES:
+            if name not in _LOADERS:
+                raise KeyError(f'No loader registered for resource `{name}`...')
+
+            _RESOURCES[name] = _LOADERS[name]()
+
+        return _RESOURCES[name]
+
+
+def is_loaded(name):
+    '''Checks whether the resource `name` has already been loaded.
+    '''
+    return name in _RESOURCES
+
+
+def release(name):
+    '''Drops the loaded instance of `name`. It will be loaded again on next use.
+    '''
+    with _LOCK:
+        _RESOURCES.pop(name, None)
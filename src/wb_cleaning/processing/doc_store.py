@@ -0,0 +1,239 @@
+'''
+Module containing the on-disk formats used to store cleaned documents.
+
+A `TokenIdCorpus` is a directory with the vocabulary of the corpus, a single
+contiguous array of the token ids of all the documents, and the offsets of each
+document in that array. The token ids are memory-mapped at load so iterating over
+a large corpus doesn't require reading it into memory.
+
+A `SpillingDocCache` is a mapping of cleaned documents that keeps at most a given
+number of bytes in memory. The least recently used documents are moved to a segment
+file on disk and are read back transparently.
+'''
+import json
+import os
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+VOCAB_FILE = 'vocab.json'
+TOKENS_FILE = 'tokens.bin'
+OFFSETS_FILE = 'offsets.npy'
+SEGMENT_PREFIX = 'segment_'
+SEGMENT_SUFFIX = '.jsonl'
+
+TOKEN_ID_DTYPE = np.int32
+OFFSET_DTYPE = np.int64
+
+
+class TokenIdCorpus:
+    '''Read-only, memory-mapped sequence of tokenized documents.
+
+    Documents are decoded into lists of tokens only when accessed.
+
+    Example:
+        TokenIdCorpus.write('corpus_dir', [['world', 'bank'], ['bank']])
+        corpus = TokenIdCorpus('corpus_dir')
+        corpus[1]  # ['bank']
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(os.path.join(path, VOCAB_FILE)) as vocab_file:
+            self.vocab = json.load(vocab_file)
+
+        self.offsets = np.load(os.path.join(path, OFFSETS_FILE))
+
+        if self.offsets[-1] > 0:
+            self.tokens = np.memmap(
+                os.path.join(path, TOKENS_FILE), dtype=TOKEN_ID_DTYPE, mode='r')
+        else:
+            # Empty files can't be memory-mapped.
+            self.tokens = np.zeros(0, dtype=TOKEN_ID_DTYPE)
+
+    @staticmethod
+    def write(path: str, docs: Iterable[List[str]]) -> int:
+        '''Writes the documents to `path` in the token id format and returns the number of documents.
+
+        The documents are consumed as a stream so only the vocabulary is kept in memory.
+        A TypeError is raised if a document is not a list of tokens, e.g., a string.
+        '''
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        token2id = {}
+        offsets = [0]
+
+        with open(os.path.join(path, TOKENS_FILE), 'wb') as tokens_file:
+            for doc in docs:
+                if not isinstance(doc, (list, tuple)):
+                    raise TypeError(
+                        f'Document {len(offsets) - 1} is a {type(doc).__name__}, expected a list of tokens...')
+
+                token_ids = [token2id.setdefault(token, len(token2id))
+                             for token in doc]
+                np.asarray(token_ids, dtype=TOKEN_ID_DTYPE).tofile(tokens_file)
+                offsets.append(offsets[-1] + len(token_ids))
+
+        np.save(os.path.join(path, OFFSETS_FILE),
+                np.asarray(offsets, dtype=OFFSET_DTYPE))
+
+        with open(os.path.join(path, VOCAB_FILE), 'w') as vocab_file:
+            # The dict preserves the insertion order which is the order of the ids.
+            json.dump(list(token2id), vocab_file)
+
+        return len(offsets) - 1
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> List[str]:
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError('Document index out of range...')
+
+        vocab = self.vocab
+        token_ids = self.tokens[self.offsets[index]:self.offsets[index + 1]]
+
+        return [vocab[token_id] for token_id in token_ids.tolist()]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+# Approximate memory used by each token of a document in addition to its characters,
+# i.e., the size of an empty str object and of the pointer in the list.
+TOKEN_OVERHEAD_BYTES = 57
+
+
+def estimate_doc_size(doc: List[str]) -> int:
+    return sum(map(len, doc)) + TOKEN_OVERHEAD_BYTES * len(doc)
+
+
+class SpillingDocCache(MutableMapping):
+    '''Mapping of documents with an in-memory LRU of at most `max_bytes` that spills to disk.
+
+    Documents evicted from memory are appended to a segment file in `path`, a temporary
+    directory if not given, and only their offsets are kept in memory. Each cache has its
+    own uniquely named segment so that caches can share a `path`.
+
+    The segment, and the temporary directory if created by the cache, are removed by
+    `close`, or when the cache is garbage collected.
+    '''
+
+    def __init__(self, max_bytes: int, path: Optional[str] = None):
+        owned_path = None
+
+        if path is None:
+            path = owned_path = tempfile.mkdtemp(prefix='wb_cleaning_docs_')
+        elif not os.path.isdir(path):
+            os.makedirs(path)
+
+        self.max_bytes = max_bytes
+        self.path = path
+
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.spilled = {}
+
+        self.hits = 0
+        self.disk_reads = 0
+        self.spills = 0
+
+        fd, self.segment_path = tempfile.mkstemp(
+            prefix=SEGMENT_PREFIX, suffix=SEGMENT_SUFFIX, dir=path)
+        self.segment = open(fd, 'w+b')
+
+        self._finalizer = weakref.finalize(
+            self, _remove_segment, self.segment, self.segment_path, owned_path)
+
+    def __contains__(self, key) -> bool:
+        return key in self.memory or key in self.spilled
+
+    def __len__(self) -> int:
+        return len(self.memory) + len(self.spilled)
+
+    def __iter__(self):
+        yield from list(self.memory)
+        yield from list(self.spilled)
+
+    def __getitem__(self, key) -> List[str]:
+        if key in self.memory:
+            self.hits += 1
+            self.memory.move_to_end(key)
+
+            return self.memory[key]
+
+        offset, length = self.spilled[key]
+        self.disk_reads += 1
+
+        # Documents read from disk are not promoted to memory so that
+        # replaying a corpus larger than the budget doesn't thrash the cache.
+        self.segment.flush()
+        self.segment.seek(offset)
+
+        return json.loads(self.segment.read(length))
+
+    def __setitem__(self, key, doc: List[str]):
+        if key in self:
+            del self[key]
+
+        self.memory[key] = doc
+        self.memory_bytes += estimate_doc_size(doc)
+
+        while self.memory_bytes > self.max_bytes and self.memory:
+            self.spill()
+
+    def __delitem__(self, key):
+        if key in self.memory:
+            self.memory_bytes -= estimate_doc_size(self.memory.pop(key))
+        else:
+            # The space in the segment file is not reclaimed.
+            del self.spilled[key]
+
+    def spill(self):
+        '''Moves the least recently used document in memory to the segment file.
+        '''
+        key, doc = self.memory.popitem(last=False)
+        self.memory_bytes -= estimate_doc_size(doc)
+
+        data = json.dumps(doc).encode('utf-8')
+
+        self.segment.seek(0, os.SEEK_END)
+        self.spilled[key] = (self.segment.tell(), len(data))
+        self.segment.write(data)
+        self.spills += 1
+
+    def stats(self) -> dict:
+        return dict(
+            hits=self.hits,
+            disk_reads=self.disk_reads,
+            spills=self.spills,
+            memory_docs=len(self.memory),
+            memory_bytes=self.memory_bytes,
+            spilled_docs=len(self.spilled),
+        )
+
+    def close(self):
+        '''Removes the segment file. The cache can't be used afterwards.
+        '''
+        self._finalizer()
+
+
+def _remove_segment(segment, segment_path: str, owned_path: Optional[str]):
+    segment.close()
+
+    if os.path.exists(segment_path):
+        os.remove(segment_path)
+
+    if owned_path is not None:
+        shutil.rmtree(owned_path, ignore_errors=True)
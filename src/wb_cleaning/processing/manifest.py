@@ -0,0 +1,157 @@
+'''
+Module containing the manifest used to incrementally clean a corpus.
+
+The manifest records, for each source file, its size, modification time, content
+hash, the `cleaning_config_id` used to clean it, and the location of the output.
+A file needs to be cleaned again only if its content or the cleaning config changed.
+
+The `cleaning_config_id` must differ for any change of the config, e.g., the
+`BaseCleaner.config_hash`. The id stored in the config itself is the same for
+configs differing only by swapped values and would reuse outdated outputs.
+
+Downstream jobs can query the manifest, e.g., `manifest.stale(cleaning_config_id)`
+lists the outputs that were produced with a different config.
+'''
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Iterable, List, Optional
+
+HASH_BLOCK_SIZE = 2 ** 20
+
+
+def file_content_hash(fpath: str) -> str:
+    '''Computes the md5 hash of the content of the file.
+    '''
+    hasher = hashlib.md5()
+
+    with open(fpath, 'rb') as fl:
+        for block in iter(lambda: fl.read(HASH_BLOCK_SIZE), b''):
+            hasher.update(block)
+
+    return hasher.hexdigest()
+
+
+class CorpusManifest:
+    '''Persistent record of the cleaned files of a corpus, stored in sqlite.
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connect()
+
+    def _connect(self):
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        self.conn = sqlite3.connect(self.path, timeout=60)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS manifest ('
+            'fpath TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, '
+            'content_hash TEXT NOT NULL, cleaning_config_id TEXT, '
+            'output_path TEXT, updated REAL NOT NULL)')
+        self.conn.commit()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('conn')
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._connect()
+
+    def __contains__(self, fpath: str) -> bool:
+        return self.get(fpath) is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM manifest').fetchone()[0]
+
+    def get(self, fpath: str) -> Optional[dict]:
+        row = self.conn.execute(
+            'SELECT * FROM manifest WHERE fpath = ?', (fpath,)).fetchone()
+
+        return None if row is None else dict(row)
+
+    def entries(self) -> List[dict]:
+        return [dict(row) for row in self.conn.execute('SELECT * FROM manifest ORDER BY fpath')]
+
+    def is_current(self, fpath: str, cleaning_config_id: Optional[str]) -> bool:
+        '''Checks whether the recorded output of `fpath` is up to date.
+
+        The content hash is only computed if the size or modification time of the file changed.
+        '''
+        entry = self.get(fpath)
+
+        if entry is None or entry['cleaning_config_id'] != cleaning_config_id:
+            return False
+
+        if entry['output_path'] is not None and not os.path.isfile(entry['output_path']):
+            return False
+
+        stat = os.stat(fpath)
+
+        if stat.st_size == entry['size'] and stat.st_mtime == entry['mtime']:
+            return True
+
+        if file_content_hash(fpath) != entry['content_hash']:
+            return False
+
+        # Only the metadata of the file changed, e.g., it was copied.
+        self.conn.execute(
+            'UPDATE manifest SET size = ?, mtime = ? WHERE fpath = ?',
+            (stat.st_size, stat.st_mtime, fpath))
+        self.conn.commit()
+
+        return True
+
+    def update(self, fpath: str, cleaning_config_id: Optional[str], output_path: Optional[str] = None):
+        '''Records that `fpath` was cleaned with `cleaning_config_id` and its output stored in `output_path`.
+        '''
+        stat = os.stat(fpath)
+
+        self.conn.execute(
+            'INSERT OR REPLACE INTO manifest '
+            '(fpath, size, mtime, content_hash, cleaning_config_id, output_path, updated) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (fpath, stat.st_size, stat.st_mtime, file_content_hash(fpath),
+             cleaning_config_id, output_path, time.time()))
+        self.conn.commit()
+
+    def remove_missing(self, fpaths: Iterable[str]) -> List[dict]:
+        '''Drops the entries of the files not in `fpaths`, e.g., deleted from the corpus, and returns them.
+        '''
+        fpaths = set(fpaths)
+        removed = [entry for entry in self.entries()
+                   if entry['fpath'] not in fpaths]
+
+        self.conn.executemany(
+            'DELETE FROM manifest WHERE fpath = ?', [(entry['fpath'],) for entry in removed])
+        self.conn.commit()
+
+        return removed
+
+    def stale(self, cleaning_config_id: Optional[str] = None) -> List[dict]:
+        '''Lists the entries whose output is outdated.
+
+        An output is stale if the source file changed or was removed, or if it
+        was cleaned with a config other than `cleaning_config_id`, when given.
+        '''
+        stale_entries = []
+
+        for entry in self.entries():
+            if cleaning_config_id is not None and entry['cleaning_config_id'] != cleaning_config_id:
+                stale_entries.append(entry)
+            elif not os.path.isfile(entry['fpath']):
+                stale_entries.append(entry)
+            elif not self.is_current(entry['fpath'], entry['cleaning_config_id']):
+                stale_entries.append(entry)
+
+        return stale_entries
+
+    def close(self):
+        self.conn.close()
@@ -73,6 +73,33 @@ class Entity(str, enum.Enum):
         use_enum_values = True
 
 
+class EntityRecognizer(str, enum.Enum):
+    '''Enum of the methods used to recognize the entities.
+    '''
+    statistical = "statistical"     # SpaCy's statistical `ner` component.
+    # Token patterns for the CARDINAL, TIME, PERCENT, and MONEY entities.
+    rule_based = "rule_based"
+
+    class Config:
+        use_enum_values = True
+
+
+# Entity types supported by the `rule_based` entity recognizer.
+RULE_BASED_ENTITIES = {
+    Entity.cardinal, Entity.time, Entity.percent, Entity.money}
+
+
+class SegmentationModel(str, enum.Enum):
+    '''Enum of the word segmentation models used to recover fragmented tokens.
+    '''
+    wordninja = "wordninja"         # wordninja's English unigram model.
+    # Unigram model of the whitelisted words, see `wb_cleaning.cleaning.segmentation`.
+    domain = "domain"
+
+    class Config:
+        use_enum_values = True
+
+
 class LanguageFilter(BaseModel):
     """Data type for language detection.
     """
@@ -100,6 +127,7 @@ class CleanerFlags(BaseModel):
     """Container of flags that control the
     behavior of the cleaning pipeline.
     """
+    chunk_long_documents: bool = False
     correct_misspelling: bool = True
     exclude_entity_types: bool = True
     expand_acronyms: bool = True
@@ -117,6 +145,10 @@ class CleanerParams(BaseModel):
         ...,
         description="List of SpaCy entity types to be `excluded` in the cleaned text. The `exclude_entity_types` flag must be set to `True` before this takes effect.")
 
+    entity_recognizer: EntityRecognizer = Field(
+        EntityRecognizer.statistical,
+        description="Method used to recognize the entities. The `rule_based` recognizer is much faster than the `statistical` one but only supports the CARDINAL, TIME, PERCENT, and MONEY entities.")
+
     fragmented_token_max_len: int = Field(
         5, description="Maximum number of tokens to consider for fixing fragmented lines of text. The `fix_fragmented_tokens` flag must be set to `True` before this takes effect.")
 
@@ -124,6 +156,9 @@ class CleanerParams(BaseModel):
         [LanguageFilter(lang='en', score=0.98)],
         description="List of languages code defined in the `pyenchant` library that will be considered as valid. The `filter_language` flag must be set to `True` before this takes effect.")
 
+    max_chunk_length: int = Field(
+        100000, gt=0, le=1000000, description="Maximum number of characters of a chunk of text processed at once. Texts longer than this are split at paragraph or sentence boundaries. The `chunk_long_documents` flag must be set to `True` before this takes effect.")
+
     max_token_length: int = Field(
         50, description="Maximum character limit for a token to be considered as valid.")
 
@@ -134,10 +169,21 @@ class CleanerParams(BaseModel):
         ...,
         description="List of SpaCy part-of-speech tags to be `included` in the cleaned text. The `include_pos_tags` flag must be set to `True` before this takes effect.")
 
+    segmentation_model: SegmentationModel = Field(
+        SegmentationModel.wordninja,
+        description="Word segmentation model used to recover fragmented tokens. The `domain` model is built from the whitelisted word lists and must be built first with `python -m wb_cleaning.cleaning.segmentation`. The `fix_fragmented_tokens` flag must be set to `True` before this takes effect.")
+
     @validator('entities')
     def sort_entities(cls, v):
         return sorted(v)
 
+    @validator('entity_recognizer')
+    def rule_based_supports_entities(cls, v, values, **kwargs):
+        if v == EntityRecognizer.rule_based and set(values.get('entities', [])) - RULE_BASED_ENTITIES:
+            raise ValueError(
+                f'The `rule_based` entity recognizer only supports the {sorted(e.value for e in RULE_BASED_ENTITIES)} entities!')
+        return v
+
     @validator('languages')
     def sort_languages(cls, v):
         return sorted(v)
@@ -202,6 +248,16 @@ class Cleaner(BaseModel):
         self.cleaner_config_id = generate_model_hash(json.loads(self.json()))
 
 
+class Suggester(str, enum.Enum):
+    '''Enum of the sources of candidate corrections for misspelled words.
+    '''
+    enchant = "enchant"     # Suggestions of the enchant dictionary.
+    symspell = "symspell"   # Precomputed symmetric delete index.
+
+    class Config:
+        use_enum_values = True
+
+
 class RespellerInferCorrectWord(BaseModel):
     sim_thresh: float = Field(0.0, ge=0, le=1, description="")
     print_log: bool = Field(False, description="")
@@ -224,6 +280,18 @@ class Respeller(BaseModel):
     spell_threshold: float = Field(0.25)
     allow_proper: bool = Field(True)
     spell_cache: dict = Field(None)
+    spell_cache_max_bytes: int = Field(
+        2 ** 26, ge=0, description="Memory ceiling in bytes of the in-process cache of the inferred words used when no `spell_cache` is given.")
+    spell_cache_ttl: float = Field(
+        None, gt=0, description="Time in seconds after which the words in the in-process cache are inferred again from the shared cache. The words don't expire if not set.")
+    suggester: Suggester = Field(
+        Suggester.enchant, description="Source of the candidate corrections of misspelled words.")
+    symspell_index: str = Field(
+        None, description="Path to the SymSpell index used by the `symspell` suggester. The index in `models/symspell` is used if not set.")
+    frozen: bool = Field(
+        False, description="Flag whether the corrections are only looked up in the `correction_table`, without using enchant or the respeller cache. Words not in the table are not fixed.")
+    correction_table: str = Field(
+        None, description="Path to the correction table built with `python -m wb_cleaning.cleaning.corrections` and used by the `frozen` respeller. The table in `models/corrections` is used if not set.")
     infer_correct_words: RespellerInferCorrectWords = Field(
         RespellerInferCorrectWords(),
         description="Set of parameters for the `infer_correct_words` method.")
@@ -0,0 +1,602 @@
+import os
+import random
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from wb_cleaning import dir_manager
+from wb_cleaning.cleaning import cleaner
+from wb_cleaning.types.cleaning import CleaningConfig
+from wb_cleaning.utils.scripts import load_config
+
+SAMPLE_TEXT = """Hello world, why are you all here at the World Bank?
+    We need to do something about the linear regresion. The data shows that
+    30 percent of the 2.5 million households earned less than $100 in 2019.
+    The bayesian information is not liot here, at 10:30 am on Monday."""
+
+
+def split_lower(text):
+    return text.lower().split()
+
+
+def identity_extractor(doc):
+    return doc
+
+
+class TrackedCleaner:
+    """Stand-in of a `BaseCleaner` recording the cleaned texts.
+    """
+
+    def __init__(self, config, cleaned):
+        self.cleaning_config_id = config["cleaning_config_id"]
+        self.config_hash = cleaner.get_config_hash(config)
+        self.cleaned = cleaned
+
+    def clean(self, text):
+        self.cleaned.append(text)
+        return split_lower(text)
+
+
+class IdentityTransformer:
+    def __getitem__(self, doc):
+        return doc
+
+
+def get_config(params=None, **flags):
+    config = load_config(dir_manager.get_configs_dir(
+        'cleaning', 'default.yml'), 'cleaning_config')
+    config['cleaner']['flags'].update(flags)
+    config['cleaner']['params'].update(params or {})
+
+    return CleaningConfig(**config).dict()
+
+
+class TestConfigHash:
+    def test_swapped_flags(self):
+        config = get_config(filter_stopwords=True, include_pos_tags=False)
+        swapped = get_config(filter_stopwords=False, include_pos_tags=True)
+
+        # The `cleaning_config_id` hashes the sorted characters of the config.
+        assert config["cleaning_config_id"] == swapped["cleaning_config_id"]
+        assert cleaner.get_config_hash(config) != cleaner.get_config_hash(swapped)
+        assert cleaner.get_config_hash(config) == cleaner.get_config_hash(
+            get_config(filter_stopwords=True, include_pos_tags=False))
+
+
+class TestSplitTextIntoChunks:
+    def test_paragraph_boundaries(self):
+        paragraphs = [f"Paragraph {i} of the text." for i in range(20)]
+        chunks = list(cleaner.split_text_into_chunks("\n\n".join(paragraphs), 80))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 80 for chunk in chunks)
+        # Paragraphs are packed together but never split.
+        assert [p for chunk in chunks for p in chunk.split("\n\n")] == paragraphs
+
+    def test_long_sentence(self):
+        text = " ".join(f"word{i}" for i in range(200))
+        chunks = list(cleaner.split_text_into_chunks(text, 50))
+
+        assert all(len(chunk) <= 50 for chunk in chunks)
+        assert " ".join(chunks).split() == text.split()
+
+    def test_short_text(self):
+        assert list(cleaner.split_text_into_chunks("Short text.", 50)) == ["Short text."]
+
+    def test_whitespace_only(self):
+        # At least one chunk is generated so that the outputs stay aligned with the texts.
+        assert list(cleaner.split_text_into_chunks(" \n\n \t" * 100, 50)) == [""]
+        assert list(cleaner.split_text_into_chunks("", 50)) == [""]
+
+
+class TestBaseCleaner:
+    def test_tokenize_array_same_as_tokens(self):
+        for flags in [
+                dict(),
+                dict(include_pos_tags=False),
+                dict(exclude_entity_types=False, filter_stopwords=False)]:
+            bc = cleaner.BaseCleaner(config=get_config(**flags))
+            doc = bc.text_to_doc(SAMPLE_TEXT)
+
+            assert bc._tokenize_tokens(doc) == bc._tokenize_array(doc)
+
+    @pytest.mark.parametrize("flags", [
+        dict(),
+        dict(include_pos_tags=False),
+        dict(exclude_entity_types=False),
+        dict(include_pos_tags=False, exclude_entity_types=False, filter_stopwords=False),
+    ])
+    def test_pruned_pipeline_same_as_full(self, flags):
+        bc = cleaner.BaseCleaner(config=get_config(**flags))
+        text = bc.normalize_text(SAMPLE_TEXT)
+
+        assert "parser" in bc.disabled_pipes
+        assert ("ner" in bc.disabled_pipes) == ("exclude_entity_types" in flags)
+
+        # The full pipeline, without the optional `entity_ruler`.
+        full_doc = bc.text_to_doc(text)
+        pruned_doc = cleaner.get_nlp()(text, disable=bc.disabled_pipes)
+
+        assert bc._tokenize_tokens(pruned_doc) == bc._tokenize_tokens(full_doc)
+        assert bc._tokenize_array(pruned_doc) == bc._tokenize_array(full_doc)
+
+    def test_entity_recognizer_modes(self):
+        ruler = cleaner.entity_rules.ENTITY_RULER_NAME
+        statistical = cleaner.BaseCleaner(config=get_config())
+        statistical_ents = [(ent.text, ent.label_) for ent in statistical.text_to_doc(SAMPLE_TEXT).ents]
+        statistical_tokens = statistical._doc_to_tokens(
+            cleaner.get_nlp()(SAMPLE_TEXT, disable=statistical.disabled_pipes))
+
+        rule_based = cleaner.BaseCleaner(config=get_config(params=dict(entity_recognizer="rule_based")))
+
+        assert "ner" in rule_based.disabled_pipes and ruler not in rule_based.disabled_pipes
+        assert ruler in statistical.disabled_pipes and "ner" not in statistical.disabled_pipes
+
+        rule_based_doc = cleaner.get_nlp()(SAMPLE_TEXT, disable=rule_based.disabled_pipes)
+        assert "PERCENT" in {ent.label_ for ent in rule_based_doc.ents}
+
+        # Adding the ruler to the shared pipeline doesn't change the outputs of `ner`.
+        assert [(ent.text, ent.label_) for ent in statistical.text_to_doc(SAMPLE_TEXT).ents] == statistical_ents
+        assert statistical._doc_to_tokens(
+            cleaner.get_nlp()(SAMPLE_TEXT, disable=statistical.disabled_pipes)) == statistical_tokens
+
+    def test_chunked_whitespace_only_text(self):
+        bc = cleaner.BaseCleaner(config=get_config(
+            params=dict(max_chunk_length=50), chunk_long_documents=True, filter_language=False))
+
+        assert bc.get_clean_tokens(" \n" * 100) == []
+        assert bc.get_clean_tokens_batch([" \n" * 100, SAMPLE_TEXT]) == [
+            [], bc.get_clean_tokens(SAMPLE_TEXT)]
+
+    @pytest.mark.parametrize("batch_size", [1, 2, 3])
+    @pytest.mark.parametrize("chunk_long_documents", [False, True])
+    def test_batch_same_as_single(self, batch_size, chunk_long_documents):
+        bc = cleaner.BaseCleaner(config=get_config(
+            params=dict(max_chunk_length=60), chunk_long_documents=chunk_long_documents,
+            filter_language=False))
+
+        # Texts with several chunks are interleaved with short, empty, and repeated texts
+        # to check that the outputs of `nlp.pipe` stay aligned with the inputs.
+        texts = [SAMPLE_TEXT, "World Bank", "", SAMPLE_TEXT.upper(),
+                 "\n\n".join([SAMPLE_TEXT] * 3), "World Bank", " \n"]
+
+        expected = [bc.get_clean_tokens(text) for text in texts]
+
+        assert bc.get_clean_tokens_batch(texts, batch_size=batch_size) == expected
+        assert list(bc.generate_clean_tokens(iter(texts), batch_size=batch_size)) == expected
+
+    def test_skip_invalid_language(self, monkeypatch):
+        bc = cleaner.BaseCleaner(config=get_config())
+        french = "Bonjour, la Banque mondiale soutient le développement des pays."
+        low_score = "Hello world, hello bank."
+
+        def detect_language(text):
+            if text.startswith("Bonjour"):
+                return dict(language="fr", score=0.99)
+
+            return dict(language="en", score=0.5 if text == low_score else 0.99)
+
+        preprocessed = []
+
+        def preprocess_text(text):
+            preprocessed.append(text)
+            return text
+
+        monkeypatch.setattr(bc, "detect_language", detect_language)
+        monkeypatch.setattr(bc, "_preprocess_text", preprocess_text)
+
+        tokens = bc.get_clean_tokens_batch([SAMPLE_TEXT, french, low_score, SAMPLE_TEXT])
+
+        assert tokens[1] == tokens[2] == []
+        assert tokens[0] == tokens[3] != []
+        # The documents in invalid languages are not parsed.
+        assert preprocessed == [SAMPLE_TEXT, SAMPLE_TEXT]
+        assert bc.language_decisions == {("en", True): 2, ("fr", False): 1, ("en", False): 1}
+
+        assert bc.get_clean_tokens(french) == []
+        assert bc.language_decisions[("fr", False)] == 2
+
+    def test_language_filter_disabled(self, monkeypatch):
+        bc = cleaner.BaseCleaner(config=get_config(filter_language=False))
+
+        def detect_language(text):
+            raise AssertionError("The language is not detected if the filter is disabled...")
+
+        monkeypatch.setattr(bc, "detect_language", detect_language)
+
+        assert bc.get_clean_tokens(SAMPLE_TEXT) != []
+        assert bc.language_decisions == {}
+
+    def test_analyze_parses_once(self, monkeypatch):
+        bc = cleaner.BaseCleaner(config=get_config())
+        nlp = cleaner.get_nlp()
+        pipe = nlp.pipe
+        parsed = []
+
+        def counting_pipe(texts, *args, **kwargs):
+            def iter_texts():
+                for text in texts:
+                    parsed.append(text)
+                    yield text
+
+            return pipe(iter_texts(), *args, **kwargs)
+
+        monkeypatch.setattr(nlp, "pipe", counting_pipe)
+
+        # The default config fixes the fragmented tokens, which changes the text.
+        text = SAMPLE_TEXT + " The u n h c r data."
+        assert bc._preprocess_text(text) != text
+
+        output = bc.analyze(text)
+
+        assert output["tokens"] and output["phrases"]
+        assert len(parsed) == 1
+
+    def test_output_cache(self, tmp_path):
+        output_cache = cleaner.DiskCache(str(tmp_path / "cache.db"))
+        bc = cleaner.BaseCleaner(config=get_config(), output_cache=output_cache)
+        tokens = bc.get_clean_tokens(SAMPLE_TEXT)
+
+        assert bc.get_clean_tokens(SAMPLE_TEXT) == tokens
+        assert bc.get_clean_tokens_batch([SAMPLE_TEXT, "World Bank"]) == [
+            tokens, cleaner.BaseCleaner(config=get_config()).get_clean_tokens("World Bank")]
+        assert output_cache.hits == 2
+
+        # Outputs of other configs or extractors are not shared, including the config with the
+        # flags of `other_config` swapped, which has the same `cleaning_config_id`.
+        swapped = get_config(filter_stopwords=True, include_pos_tags=False)
+        other_config = cleaner.BaseCleaner(
+            config=get_config(filter_stopwords=False), output_cache=output_cache)
+        swapped_config = cleaner.BaseCleaner(config=swapped, output_cache=output_cache)
+        with_extractor = cleaner.BaseCleaner(
+            config=get_config(), extractors=[identity_extractor], output_cache=output_cache)
+
+        assert other_config.get_clean_tokens(SAMPLE_TEXT) == cleaner.BaseCleaner(
+            config=get_config(filter_stopwords=False)).get_clean_tokens(SAMPLE_TEXT)
+        assert swapped_config.get_clean_tokens(SAMPLE_TEXT) == cleaner.BaseCleaner(
+            config=swapped).get_clean_tokens(SAMPLE_TEXT)
+        assert with_extractor.get_clean_tokens(SAMPLE_TEXT) == tokens
+        assert output_cache.hits == 2
+
+    @pytest.mark.parametrize("flags", [
+        dict(),
+        dict(expand_acronyms=True),
+        dict(chunk_long_documents=True),
+    ])
+    @pytest.mark.parametrize("return_phrase_count", [False, True])
+    def test_analyze_same_as_individual_calls(self, tmp_path, flags, return_phrase_count):
+        from wb_cleaning.extraction import acronyms, country_extractor, jdc_tags_extractor
+
+        text = SAMPLE_TEXT + "\n\nThe International Development Association (IDA) works in Kenya.\n"
+        config = get_config(params=dict(max_chunk_length=80), **flags)
+        bc = cleaner.BaseCleaner(config=config)
+
+        expected = dict(
+            language=bc.get_language(text),
+            tokens=bc.get_clean_tokens(text),
+            phrases=bc.get_tokens_and_phrases(text, return_phrase_count)["phrases"],
+            countries=country_extractor.get_country_counts(text),
+            acronyms=acronyms.detect_acronyms(text),
+            jdc_tags=jdc_tags_extractor.get_jdc_tag_counts(" ".join(text.split())),
+        )
+
+        assert bc.analyze(text, return_phrase_count=return_phrase_count) == expected
+
+        # The tokens and phrases are shared with the individual calls through the `output_cache`.
+        cached = cleaner.BaseCleaner(
+            config=config, output_cache=cleaner.DiskCache(str(tmp_path / "cache.db")))
+
+        assert cached.analyze(text, return_phrase_count=return_phrase_count) == expected
+        assert cached.get_clean_tokens(text) == expected["tokens"]
+        assert cached.get_tokens_and_phrases(
+            text, return_phrase_count)["phrases"] == expected["phrases"]
+        assert cached.output_cache.hits == 2
+
+
+class TestCorpusCleaner:
+    def make_corpus(self, tmp_path, num_docs=5):
+        for i in range(num_docs):
+            (tmp_path / f"doc_{i}.txt").write_text(f"Document {i} Text")
+
+    def test_sample_independent_of_order(self):
+        doc_ids = [f"doc_{i}.txt" for i in range(2000)]
+        sample = {doc_id for doc_id in doc_ids if cleaner.in_sample(doc_id, 0.3, 1029)}
+
+        shuffled = list(reversed(doc_ids))
+        random.Random(0).shuffle(shuffled)
+
+        assert sample == {doc_id for doc_id in shuffled if cleaner.in_sample(doc_id, 0.3, 1029)}
+        assert 500 < len(sample) < 700
+        assert sample != {doc_id for doc_id in doc_ids if cleaner.in_sample(doc_id, 0.3, 7)}
+        assert sample == {doc_id for doc_id in doc_ids if cleaner.in_sample(doc_id, 0.3, np.int64(1029))}
+
+    @pytest.mark.parametrize("seed", [1029.0, 7.5, "1029", True, None])
+    def test_invalid_seed(self, tmp_path, seed):
+        with pytest.raises(TypeError):
+            cleaner.in_sample("doc_0.txt", 0.3, seed)
+
+        with pytest.raises(TypeError):
+            cleaner.CorpusCleaner(str(tmp_path), split_lower, process_prob=0.5, seed=seed)
+
+    def test_sampled_corpus(self, tmp_path):
+        self.make_corpus(tmp_path, num_docs=20)
+
+        corpus = cleaner.CorpusCleaner(
+            str(tmp_path), split_lower, process_prob=0.5, seed=7)
+        expected = [f"doc_{i}.txt" for i in range(20)
+                    if cleaner.in_sample(f"doc_{i}.txt", 0.5, 7)]
+
+        assert sorted(doc[1] for doc in corpus) == sorted(
+            fname.split("_")[1].split(".")[0] for fname in expected)
+
+    def test_sampled_corpus_id_pattern(self, tmp_path):
+        self.make_corpus(tmp_path, num_docs=20)
+
+        corpus = cleaner.CorpusCleaner(
+            str(tmp_path), split_lower, id_pattern=r"\d+", process_prob=0.5, seed=7)
+
+        # The sample is drawn on the ids matched by the pattern instead of the file names.
+        assert sorted(doc[1] for doc in corpus) == sorted(
+            str(i) for i in range(20) if cleaner.in_sample(str(i), 0.5, 7))
+
+    def test_parallel_same_as_serial(self, tmp_path):
+        self.make_corpus(tmp_path)
+
+        serial = list(cleaner.CorpusCleaner(str(tmp_path), split_lower))
+        parallel = cleaner.CorpusCleaner(
+            str(tmp_path), split_lower, n_workers=2)
+
+        assert list(parallel) == serial
+        assert parallel.fully_trained
+
+        parallel.reset()
+        assert list(parallel) == serial
+
+    @pytest.mark.parametrize("n_workers", [1, 2])
+    def test_colliding_ids(self, tmp_path, monkeypatch, n_workers):
+        # Files sharing an id are cleaned once and yield the document of the first of them.
+        for fname, text in [("1_a.txt", "One A"), ("1_b.txt", "One B"), ("2_a.txt", "Two A"),
+                            ("3_a.txt", "Three A")]:
+            (tmp_path / fname).write_text(text)
+
+        list_files = cleaner.glob.glob
+        monkeypatch.setattr(cleaner.glob, "glob", lambda pattern: sorted(list_files(pattern)))
+
+        corpus = cleaner.CorpusCleaner(
+            str(tmp_path), split_lower, id_pattern=r"^\d+", n_workers=n_workers)
+
+        assert list(corpus) == [["one", "a"], ["one", "a"], ["two", "a"], ["three", "a"]]
+
+    def test_save_load(self, tmp_path):
+        corpus_dir = tmp_path / "corpus"
+        corpus_dir.mkdir()
+        self.make_corpus(corpus_dir)
+
+        corpus = cleaner.CorpusCleaner(str(corpus_dir), split_lower)
+        docs = list(corpus)
+        corpus.save(str(tmp_path / "saved"))
+
+        loaded = cleaner.CorpusCleaner(str(corpus_dir), split_lower)
+        loaded.load(str(tmp_path / "saved"))
+
+        assert loaded.frozen
+        assert list(loaded) == docs
+        assert list(loaded.stream_gensim_transformer(IdentityTransformer())) == docs
+
+    def test_save_load_text_docs(self, tmp_path):
+        corpus_dir = tmp_path / "corpus"
+        corpus_dir.mkdir()
+        self.make_corpus(corpus_dir)
+
+        corpus = cleaner.CorpusCleaner(str(corpus_dir), str.lower)
+        docs = list(corpus)
+        corpus.save(str(tmp_path / "saved"))
+
+        loaded = cleaner.CorpusCleaner(str(corpus_dir), str.lower)
+        loaded.load(str(tmp_path / "saved"))
+
+        assert all(isinstance(doc, str) for doc in docs)
+        assert list(loaded) == docs
+
+    def test_bounded_doc_cache(self, tmp_path):
+        corpus_dir = tmp_path / "corpus"
+        corpus_dir.mkdir()
+        self.make_corpus(corpus_dir, num_docs=10)
+
+        docs = list(cleaner.CorpusCleaner(str(corpus_dir), split_lower))
+
+        corpus = cleaner.CorpusCleaner(
+            str(corpus_dir), split_lower, cache_max_bytes=200, cache_dir=str(tmp_path / "cache"))
+
+        assert list(corpus) == docs
+        assert corpus.clean_doc_cache.memory_bytes <= 200
+        assert corpus.clean_doc_cache.stats()["spilled_docs"] > 0
+        assert list(corpus.stream_gensim_transformer(IdentityTransformer())) == docs
+
+    def test_close_doc_cache(self, tmp_path):
+        corpus_dir = tmp_path / "corpus"
+        corpus_dir.mkdir()
+        self.make_corpus(corpus_dir, num_docs=10)
+        cache_dir = tmp_path / "cache"
+
+        with cleaner.CorpusCleaner(
+                str(corpus_dir), split_lower, cache_max_bytes=0, cache_dir=str(cache_dir)) as corpus:
+            docs = list(corpus)
+            assert len(os.listdir(cache_dir)) == 1
+
+            # The spilled documents of the previous run are removed.
+            corpus.clear_docs()
+            assert list(corpus) == docs
+            assert len(os.listdir(cache_dir)) == 1
+
+        assert os.listdir(cache_dir) == []
+
+    def test_incremental_cleaning(self, tmp_path):
+        corpus_dir = tmp_path / "corpus"
+        corpus_dir.mkdir()
+        self.make_corpus(corpus_dir, num_docs=3)
+        output_dir = str(tmp_path / "output")
+
+        cleaned = []
+
+        def tracked_split_lower(text):
+            cleaned.append(text)
+            return split_lower(text)
+
+        list(cleaner.CorpusCleaner(
+            str(corpus_dir), tracked_split_lower, output_dir=output_dir, cleaning_config_id="a"))
+        assert len(cleaned) == 3
+
+        (corpus_dir / "doc_0.txt").write_text("Changed Text")
+        (corpus_dir / "doc_1.txt").unlink()
+        cleaned.clear()
+
+        corpus = cleaner.CorpusCleaner(
+            str(corpus_dir), tracked_split_lower, output_dir=output_dir, cleaning_config_id="a")
+        updated_docs = list(corpus)
+
+        assert cleaned == ["Changed Text"]
+        assert sorted(updated_docs) == [["changed", "text"], ["document", "2", "text"]]
+        assert not os.path.exists(os.path.join(output_dir, "doc_1.json"))
+
+        cleaned.clear()
+        list(cleaner.CorpusCleaner(
+            str(corpus_dir), tracked_split_lower, output_dir=output_dir, cleaning_config_id="b"))
+        assert len(cleaned) == 2
+
+    def test_incremental_cleaning_swapped_flags(self, tmp_path):
+        corpus_dir = tmp_path / "corpus"
+        corpus_dir.mkdir()
+        self.make_corpus(corpus_dir, num_docs=3)
+        output_dir = str(tmp_path / "output")
+
+        config = get_config(filter_stopwords=True, include_pos_tags=False)
+        swapped = get_config(filter_stopwords=False, include_pos_tags=True)
+        cleaned = []
+
+        list(cleaner.CorpusCleaner(
+            str(corpus_dir), TrackedCleaner(config, cleaned).clean, output_dir=output_dir))
+        assert len(cleaned) == 3
+
+        # The configs have the same `cleaning_config_id` but the outputs are not reused.
+        cleaned.clear()
+        list(cleaner.CorpusCleaner(
+            str(corpus_dir), TrackedCleaner(swapped, cleaned).clean, output_dir=output_dir))
+        assert len(cleaned) == 3
+
+        cleaned.clear()
+        list(cleaner.CorpusCleaner(
+            str(corpus_dir), TrackedCleaner(swapped, cleaned).clean, output_dir=output_dir))
+        assert cleaned == []
+
+    def test_parallel_mm_corpus(self, tmp_path):
+        from gensim.corpora import Dictionary, MmCorpus
+
+        corpus_dir = tmp_path / "corpus"
+        corpus_dir.mkdir()
+        self.make_corpus(corpus_dir, num_docs=10)
+
+        corpus = cleaner.CorpusCleaner(str(corpus_dir), split_lower)
+        dictionary = Dictionary(corpus)
+        bows = list(corpus.stream_gensim_transformer(
+            IdentityTransformer(), dictionary))
+
+        assert list(corpus.stream_gensim_transformer(
+            IdentityTransformer(), dictionary, n_workers=2, shard_size=3)) == bows
+
+        fname = str(tmp_path / "corpus.mm")
+        corpus.save_mm_corpus(
+            fname, IdentityTransformer(), dictionary, n_workers=2, shard_size=3)
+
+        assert [[(i, int(c)) for i, c in bow] for bow in MmCorpus(fname)] == bows
+
+    def test_parallel_transformer_bounded(self, tmp_path, monkeypatch):
+        corpus_dir = tmp_path / "corpus"
+        corpus_dir.mkdir()
+        self.make_corpus(corpus_dir, num_docs=20)
+
+        corpus = cleaner.CorpusCleaner(str(corpus_dir), split_lower)
+        list(corpus)
+        expected = list(corpus.stream_gensim_transformer(IdentityTransformer()))
+
+        iter_doc_shards = corpus._iter_doc_shards
+        num_read = []
+
+        def tracked_doc_shards(shard_size):
+            for shard in iter_doc_shards(shard_size):
+                num_read.append(len(shard))
+                yield shard
+
+        monkeypatch.setattr(corpus, "_iter_doc_shards", tracked_doc_shards)
+
+        docs = corpus.stream_gensim_transformer(
+            IdentityTransformer(), n_workers=2, shard_size=1)
+        assert next(docs) == expected[0]
+        assert sum(num_read) == 2 * cleaner.MAX_PENDING_SHARDS_PER_WORKER
+
+        assert [expected[0]] + list(docs) == expected
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        corpus_dir = tmp_path / "corpus"
+        corpus_dir.mkdir()
+        self.make_corpus(corpus_dir)
+        checkpoint = str(tmp_path / "checkpoint.jsonl")
+
+        interrupted = cleaner.CorpusCleaner(
+            str(corpus_dir), split_lower, checkpoint=checkpoint)
+        expected = [next(interrupted), next(interrupted)]
+        interrupted.clean_doc_generator.close()
+
+        def fail(text):
+            raise AssertionError(f"Checkpointed document cleaned again: {text}")
+
+        resumed = cleaner.CorpusCleaner(
+            str(corpus_dir), fail, checkpoint=checkpoint)
+
+        assert [next(resumed), next(resumed)] == expected
+
+
+class TestImportTime:
+    # Importing the cleaner must not load any model or connect to the cache backend.
+    IMPORT_TIME_BUDGET = 5.0
+    LAZY_RESOURCES = [
+        "nlp", "fasttext_lang_model", "en_lang",
+        "redis_cache", "respeller_cache_decorator"]
+    LAZY_MODULES = ["spacy", "spacy_langdetect", "fasttext", "polyglot", "langdetect"]
+
+    def test_import_time_budget(self):
+        code = "\n".join([
+            "import time",
+            "start = time.perf_counter()",
+            "import wb_cleaning.cleaning.cleaner",
+            "print(time.perf_counter() - start)",
+            "from wb_cleaning.ops import resources",
+            f"print(sum(resources.is_loaded(name) for name in {self.LAZY_RESOURCES}))",
+            f"print(sum(name in sys.modules for name in {self.LAZY_MODULES}))",
+        ])
+
+        output = subprocess.run(
+            [sys.executable, "-c", "import sys\n" + code], stdout=subprocess.PIPE, check=True)
+        elapsed, num_loaded, num_imported = output.stdout.decode().split()
+
+        assert int(num_loaded) == 0
+        assert int(num_imported) == 0
+        assert float(elapsed) < self.IMPORT_TIME_BUDGET
+
+    def test_deprecated_attributes(self):
+        from wb_cleaning.ops import resources
+
+        resources.register("fasttext_lang_model", lambda: "fasttext_model")
+        resources.register("en_lang", lambda: "en_lang")
+
+        try:
+            with pytest.deprecated_call():
+                assert cleaner.FASTTEXT_LANG_MODEL == "fasttext_model"
+
+            with pytest.deprecated_call():
+                assert cleaner.respelling.en_lang == "en_lang"
+        finally:
+            resources.register("fasttext_lang_model", cleaner._load_fasttext_lang_model)
+            resources.register("en_lang", cleaner.respelling.language.Language)
@@ -0,0 +1,58 @@
+import pytest
+
+from wb_cleaning.cleaning import corrections
+
+PAYLOADS = [
+    dict(word="regresion", correct_word="regression", score=0.71),
+    dict(word="povrety", correct_word="poverty", score=0.55),
+    dict(word="xqzt", correct_word=None, score=-1),
+    dict(word="développement", correct_word="development", score=0.4),
+]
+
+
+class FakeSpellChecker:
+    def __init__(self, known):
+        self.known = known
+
+    def set_tokens(self, tokens):
+        self.tokens = list(tokens)
+
+    def __iter__(self):
+        for token in self.tokens:
+            if token not in self.known:
+                self.word = token
+                yield self
+
+
+class TestCorrectionTable:
+    def test_write_load(self, tmp_path):
+        path = str(tmp_path / "corrections")
+        params = dict(sim_thresh=0.0, min_len=3)
+
+        assert corrections.write_correction_table(path, PAYLOADS + PAYLOADS[:1], params) == 4
+
+        table = corrections.CorrectionTable(path)
+
+        assert len(table) == 4
+        assert table.params == params
+
+        for payload in PAYLOADS:
+            assert payload["word"] in table
+            assert table[payload["word"]] == payload
+
+        assert "regression" not in table
+        assert table.get("regression") is None
+        assert dict(table.items())["xqzt"]["correct_word"] is None
+
+        with pytest.raises(KeyError):
+            table["regression"]
+
+    def test_missing_table(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            corrections.get_correction_table(str(tmp_path / "missing"))
+
+    def test_gather_misspelled_words(self):
+        docs = [["poverty", "povrety", "bank"], ["povrety", "regresion"], ["bank"]]
+
+        assert corrections.gather_misspelled_words(
+            docs, FakeSpellChecker({"poverty", "bank"})) == ["povrety", "regresion"]
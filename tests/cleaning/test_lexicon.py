@@ -0,0 +1,27 @@
+from wb_cleaning.cleaning import lexicon
+
+WORDS = ["poverty", "development", "Kenya", "ibrd", "regression", "bank"]
+
+
+class TestFrozenLexicon:
+    def make_lexicon(self, tmp_path, load_factor=0.5):
+        wordlist = tmp_path / "words.txt"
+        wordlist.write_text("\n".join(WORDS))
+
+        fname = str(tmp_path / "lexicon.npy")
+        assert lexicon.build_lexicon(
+            fname, [str(wordlist)], load_factor=load_factor) == len(WORDS)
+
+        return lexicon.FrozenLexicon(fname)
+
+    def test_contains(self, tmp_path):
+        for load_factor in [0.5, 0.99]:
+            known = self.make_lexicon(tmp_path, load_factor)
+
+            assert len(known) == len(WORDS)
+            assert all(word in known for word in WORDS)
+            assert "kenya" not in known
+            assert "regresion" not in known
+
+    def test_missing_lexicon(self, tmp_path):
+        assert lexicon.get_lexicon(str(tmp_path / "missing.npy")) is None
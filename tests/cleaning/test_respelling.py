@@ -0,0 +1,198 @@
+import random
+
+import pytest
+from nltk.metrics.distance import edit_distance
+
+from wb_cleaning import dir_manager
+from wb_cleaning.cleaning import corrections, respelling, segmentation
+from wb_cleaning.types.cleaning import CleaningConfig
+from wb_cleaning.utils.scripts import load_config
+
+MISSPELLED_WORDS = [
+    "regresion", "liot", "povrety", "develpment", "goverment",
+    "infrastucture", "ab", "Bnak", "educaton", "agricultre",
+]
+
+
+SUGGESTIONS = {
+    "regresion": ["regression", "recession", "aggression"],
+    "liot": ["lit", "lot", "riot", "lion", "loot"],
+    "povrety": ["poverty", "povert"],
+    "develpment": ["development", "developments"],
+    "goverment": ["government", "governments", "garment"],
+    "infrastucture": ["infrastructure"],
+    "ab": ["AB", "an"],
+    "Bnak": ["Bank", "bank", "bleak", "snake"],
+    "educaton": ["education", "educator", "educations"],
+    "agricultre": ["agriculture", "agricultural"],
+}
+
+
+def random_word(rng, alphabet, max_len=8):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(1, max_len)))
+
+
+@pytest.fixture
+def fake_suggester(monkeypatch):
+    """Replaces the suggester by the `SUGGESTIONS` so that neither enchant nor the cache backend are used.
+    """
+    suggestions = dict(SUGGESTIONS)
+
+    def suggest_words(word, *args, **kwargs):
+        return list(suggestions.get(word, []))
+
+    def suggest_words_batch(words, *args, **kwargs):
+        return [suggest_words(word) for word in words]
+
+    monkeypatch.setattr(respelling, "suggest_words", suggest_words)
+    monkeypatch.setattr(respelling, "suggest_words_batch", suggest_words_batch)
+
+    return suggestions
+
+
+def infer_correct_word(word, **kwargs):
+    # The undecorated function doesn't read from nor write to the cache backend.
+    return respelling.cached_infer_correct_word.__wrapped__(word, **kwargs)
+
+
+class TestBatchRespelling:
+    def test_batch_edit_distance(self):
+        words = ["kitten", "", "flaw", "regresion", "a"]
+        others = ["sitting", "abc", "lawn", "regression", ""]
+
+        assert respelling.batch_edit_distance(words, others).tolist() == [
+            edit_distance(word, other) for word, other in zip(words, others)]
+
+    @pytest.mark.parametrize("use_suggest_score", [True, False])
+    def test_same_as_cached_infer_correct_word(self, fake_suggester, use_suggest_score):
+        payloads = respelling.infer_correct_words_batch(
+            MISSPELLED_WORDS, use_suggest_score=use_suggest_score)
+
+        for word, payload in zip(MISSPELLED_WORDS, payloads):
+            expected = infer_correct_word(word, use_suggest_score=use_suggest_score)
+
+            assert payload["correct_word"] == expected["correct_word"]
+            assert payload["score"] == pytest.approx(expected["score"])
+
+    def test_no_shared_ngrams(self, fake_suggester):
+        fake_suggester["zzzz"] = ["ab"]
+
+        assert respelling.infer_correct_words_batch(["zzzz"], min_len=1) == [
+            infer_correct_word("zzzz", min_len=1)]
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_random_same_as_cached_infer_correct_word(self, fake_suggester, seed):
+        rng = random.Random(seed)
+        words = set()
+
+        for _ in range(30):
+            word = random_word(rng, "abcde")
+            words.add(word)
+
+            # Candidates from another alphabet don't share any n-gram with the word.
+            fake_suggester[word] = [
+                random_word(rng, rng.choice(["abcde", "xyz"])) for _ in range(rng.randint(0, 6))]
+
+        words = sorted(words)
+        use_suggest_score = rng.random() < 0.5
+        payloads = respelling.infer_correct_words_batch(
+            words, min_len=2, use_suggest_score=use_suggest_score)
+
+        for word, payload in zip(words, payloads):
+            expected = infer_correct_word(
+                word, min_len=2, use_suggest_score=use_suggest_score)
+
+            assert payload["correct_word"] == expected["correct_word"]
+            assert payload["score"] == pytest.approx(expected["score"])
+
+
+class TestFrozenRespeller:
+    def test_only_uses_table(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "corrections")
+        corrections.write_correction_table(path, [
+            dict(word="regresion", correct_word="regression", score=0.71),
+            dict(word="xqzt", correct_word=None, score=-1),
+        ])
+
+        def fail(*args, **kwargs):
+            raise AssertionError("The frozen respeller must not infer corrections...")
+
+        monkeypatch.setattr(respelling, "cached_infer_correct_word", fail)
+        monkeypatch.setattr(respelling, "enchant_suggest", fail)
+
+        respeller = respelling.Respeller(frozen=True, correction_table=path)
+        respeller.resolve_words(["regresion", "povrety"])
+
+        unfixed, fixed = respeller.infer_correct_words(
+            ["regresion", "xqzt", "povrety"], return_tokens_as_list=True,
+            infer_correct_word_params={})
+
+        assert fixed == {"regresion": ["regression"]}
+        assert unfixed == {"xqzt", "povrety"}
+
+
+class TestMemoryCacheConfig:
+    def test_default_config(self):
+        config = load_config(dir_manager.get_configs_dir(
+            'cleaning', 'default.yml'), 'cleaning_config')
+        respeller = respelling.Respeller(config=CleaningConfig(**config).dict())
+
+        assert respeller.spell_cache.max_bytes == respelling.RESPELLER_MEMORY_CACHE_MAX_BYTES
+        assert respeller.spell_cache.ttl == respelling.RESPELLER_MEMORY_CACHE_TTL
+
+    def test_bounds_from_config(self):
+        config = load_config(dir_manager.get_configs_dir(
+            'cleaning', 'default.yml'), 'cleaning_config')
+        config['respeller'].update(spell_cache_max_bytes=1024, spell_cache_ttl=60)
+        respeller = respelling.Respeller(config=CleaningConfig(**config).dict())
+
+        assert respeller.spell_cache.max_bytes == 1024
+        assert respeller.spell_cache.ttl == 60
+
+    def test_bounds_from_args(self):
+        respeller = respelling.Respeller(spell_cache_max_bytes=1024, spell_cache_ttl=60)
+
+        assert respeller.spell_cache.max_bytes == 1024
+        assert respeller.spell_cache.ttl == 60
+
+
+class TestCacheNamespace:
+    def test_namespace_of_params(self):
+        respeller = respelling.Respeller()
+        namespace = respeller.get_cache_namespace()
+
+        assert respeller.get_cache_namespace(sim_thresh=0.5) != namespace
+        assert respeller.get_cache_namespace(min_len=4) != namespace
+        assert respeller.get_cache_namespace(use_suggest_score=False) != namespace
+        assert respeller.get_cache_namespace(sim_thresh=0) == namespace
+        assert respelling.Respeller(suggester="symspell").get_cache_namespace() != namespace
+
+    def test_namespace_ignores_other_params(self):
+        # Parameters that don't change the inferences share the cached inferences.
+        namespace = respelling.Respeller().get_cache_namespace()
+
+        assert respelling.Respeller(spell_threshold=0.5).get_cache_namespace() == namespace
+        assert respelling.Respeller(allow_proper=True).get_cache_namespace() == namespace
+
+    def test_no_collision(self, monkeypatch):
+        calls = []
+
+        def fake_infer(word, cache_namespace=None, **kwargs):
+            calls.append((word, cache_namespace))
+            return dict(word=word, correct_word=None, score=kwargs["sim_thresh"])
+
+        monkeypatch.setattr(respelling, "cached_infer_correct_word", fake_infer)
+
+        respeller = respelling.Respeller()
+        respeller.infer_correct_word("povrety")
+        respelling.Respeller().infer_correct_word("povrety", sim_thresh=0.5)
+
+        assert calls[0][1] != calls[1][1]
+
+
+class TestRecoverSegmentedWords:
+    def test_class_level_call(self):
+        text = "million p rote c te d   by u n h c r Of the world's displaced"
+
+        assert respelling.SpellingModels.recover_segmented_words(
+            text, max_len=5) == segmentation.recover_segmented_words(text, max_len=5)
@@ -0,0 +1,128 @@
+import random
+import re
+
+import pytest
+import wordninja
+
+from wb_cleaning.cleaning import segmentation
+
+
+def legacy_recover_segmented_words(raw_input: str, max_len: int = 5) -> str:
+    """Original character-based implementation of `SpellingModels.recover_segmented_words`.
+    """
+
+    alpha_streak = 0
+    word_streak = 0
+    val_span = ""
+    temp_span = ""
+    ends_space = False
+    spaces = {" ", "\n", "\t"}
+
+    # Handle plural form of acronyms, e.g., IDPs -> IDP
+    raw_text = re.sub(r"(\W[A-Z]{2,})(s)(\W)", r"\1\3", raw_input)
+    # Add non-alpha character at the end.
+    raw_text = raw_text + ' '
+
+    text = ""
+
+    for i in raw_text:
+        if i.isalpha():
+            alpha_streak += 1
+            temp_span += i
+            ends_space = False
+        else:
+            if (alpha_streak and alpha_streak <= max_len) or (val_span and ends_space):
+                if i in spaces:
+                    val_span += temp_span + i
+                    word_streak += 1
+                    temp_span = ""
+                    # Speeds up processing vs. using val_span[-1].isspace()!
+                    ends_space = True
+                    alpha_streak = 0
+                    continue
+
+            if word_streak >= 2:
+                text += " ".join(wordninja.split("".join(val_span.split())))
+                text += " " + temp_span + i
+            else:
+                text += val_span + temp_span + i
+
+            word_streak = 0
+            temp_span = ""
+            val_span = ""
+            ends_space = False
+            alpha_streak = 0
+
+    return text
+
+
+PIECES = [
+    "million", "p", "rote", "c", "te", "d", "by", "u", "n", "h", "r", "Of", "the",
+    "world's", "displaced", "development", "IDPs", "UNHCR", "2019", "²", "café",
+    "résumé", "一", ",", ".", "(", ")", "-", "'", "x1",
+]
+SEPARATORS = [" ", " ", " ", "  ", "\n", "\t", "\r", "\xa0", ""]
+
+
+def random_text(rng, num_pieces):
+    return "".join(rng.choice(PIECES) + rng.choice(SEPARATORS) for _ in range(num_pieces))
+
+
+class TestRecoverSegmentedWords:
+    def test_example(self):
+        text = "million p rote c te d   by u n h c r Of the world's displaced"
+
+        assert segmentation.recover_segmented_words(text) == legacy_recover_segmented_words(text)
+
+    @pytest.mark.parametrize("max_len", [1, 3, 5, 8])
+    def test_same_as_legacy(self, max_len):
+        rng = random.Random(1029 + max_len)
+
+        for _ in range(300):
+            text = random_text(rng, rng.randint(0, 40))
+
+            assert segmentation.recover_segmented_words(
+                text, max_len=max_len) == legacy_recover_segmented_words(text, max_len=max_len)
+
+    def test_alpha_class(self):
+        chars = ["a", "é", "一", "²", "½", "1", "_", " ", "Ⅻ"]
+        pattern = re.compile(segmentation.get_alpha_class("".join(chars)))
+
+        for char in chars:
+            assert bool(pattern.match(char)) == char.isalpha()
+
+        assert segmentation.get_alpha_class("ascii text") == segmentation.ASCII_ALPHA
+        assert segmentation.get_alpha_class("café") == segmentation.WORD_ALPHA
+
+
+class TestFrozenLanguageModel:
+    def make_model(self, tmp_path):
+        wordlist = tmp_path / "words.txt"
+        wordlist.write_text("\n".join(["the", "of", "protected", "by", "unhcr", "world", "bank"]))
+        phrases = tmp_path / "phrases.txt"
+        phrases.write_text("private_sector\nworld_bank\n")
+
+        path = str(tmp_path / "segmentation")
+        assert segmentation.build_model(path, [str(wordlist), str(phrases)]) == 9
+
+        return segmentation.FrozenLanguageModel(path)
+
+    def test_split(self, tmp_path):
+        model = self.make_model(tmp_path)
+
+        assert model.split("protectedbyunhcr") == ["protected", "by", "unhcr"]
+        assert model.split("PrivateSector") == ["Private", "Sector"]
+        # The words of the phrases are ranked separately.
+        assert model.word_cost("the") < model.word_cost("bank") < model.word_cost("unhcr")
+        assert model.word_cost("missing") == float("inf")
+
+    def test_recover_segmented_words(self, tmp_path):
+        model = self.make_model(tmp_path)
+        text = "million p rote c te d   by u n h c r , of t he world economies"
+
+        assert segmentation.recover_segmented_words(
+            text, model=model) == "million protected by unhcr , of the world economies "
+
+    def test_missing_model(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            segmentation.get_language_model(str(tmp_path / "missing"))
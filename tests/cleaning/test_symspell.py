@@ -0,0 +1,45 @@
+from nltk.metrics.distance import edit_distance
+
+from wb_cleaning.cleaning import symspell
+
+WORDS = ["poverty", "development", "regression", "government", "Kenya", "bank", "band", "bland"]
+
+
+class TestSymSpellIndex:
+    def make_index(self, tmp_path):
+        wordlist = tmp_path / "words.txt"
+        wordlist.write_text("\n".join(WORDS))
+
+        path = str(tmp_path / "index")
+        assert symspell.build_index(path, [str(wordlist)]) == len(WORDS)
+
+        return symspell.SymSpellIndex(path)
+
+    def test_lookup(self, tmp_path):
+        index = self.make_index(tmp_path)
+
+        assert index.lookup("regresion") == ["regression"]
+        assert index.lookup("devlopment") == ["development"]
+        assert index.lookup("kenia") == ["Kenya"]
+        assert index.lookup("bank")[0] == "bank"
+        assert index.lookup("xyz") == []
+
+    def test_ranking(self, tmp_path):
+        index = self.make_index(tmp_path)
+
+        # Same distance candidates follow the order of the word list.
+        assert index.lookup("banx") == ["bank", "band", "bland"]
+        assert index.lookup("blank") == ["bank", "bland", "band"]
+
+    def test_same_as_brute_force(self, tmp_path):
+        index = self.make_index(tmp_path)
+
+        for word in ["goverment", "povety", "bnk", "regressionn", "pverty"]:
+            expected = {w for w in WORDS if edit_distance(word, w.lower()) <= 2}
+            assert set(index.lookup(word)) == expected
+
+    def test_read_hunspell_dic(self, tmp_path):
+        dic = tmp_path / "en_US.dic"
+        dic.write_text("3\nbank/MS\nKenya/M\npoverty\n")
+
+        assert list(symspell.read_wordlist(str(dic))) == ["bank", "Kenya", "poverty"]
@@ -0,0 +1,85 @@
+import random
+import re
+from collections import Counter
+
+from wb_cleaning.extraction import acronyms
+
+
+def legacy_extract_acronyms(txt):
+    """Original implementation of `acronyms.extract_acronyms` using a single alternation regex.
+    """
+    acronyms_list = [i.strip('(').strip(')') for i in acronyms.acronyms_pattern.findall(txt)]
+    keyword = '|'.join([rf'\({k}\)' for k in acronyms_list])
+    candidates_acronym_pattern = "((?:[a-zA-ZÀ-ÖØ-öø-ÿа-ҳА-Ҳ'-]+ ){0,5})(" + keyword + ")"
+    candidates_acronym_pattern = re.compile(candidates_acronym_pattern)
+    acronym_candidates_lists = candidates_acronym_pattern.findall(
+        acronyms.whitespaces_pattern.sub(' ', txt))
+    detected_acronyms = {}
+
+    for ip in acronym_candidates_lists:
+        candidate, acronym = ip
+        candidate = ' '.join(acronyms.alphabet_pattern.findall(candidate))
+
+        full_name = []
+        acr = acronym.strip('(').strip(')')
+        l = 0
+        acr_char_counts = Counter(acr)
+        for c in candidate.strip().split()[::-1]:
+            c_title = c.title()
+            if c in acronyms.stops and l > 0:
+                full_name.append(c)
+            elif (c_title[0] in acr_char_counts) and (acr_char_counts[c_title[0]] > 0):
+                l += 1
+                full_name.append(c_title)
+                acr_char_counts[c_title[0]] -= 1
+            if l >= len(acr):
+                detected_acronyms[acr] = " ".join(full_name[::-1])
+                break
+
+    return detected_acronyms
+
+
+PIECES = [
+    "National", "Population", "and", "Housing", "Census", "(NPHC)", "of", "the",
+    "Landscape", "Approach", "to", "Forest", "Restoration", "Conservation", "(LAFREC)",
+    "(LAFREC),", "(NPC)", "(PHC)", "(AB)", "(Ab)", "(A)", "population", "housing",
+    "non-governmental", "organization's", "(NGO)", "Élection", "census,", "1990", "x" * 300,
+]
+SEPARATORS = [" ", " ", " ", "  ", "\n", "\t", "", ", "]
+
+
+def random_text(rng, num_pieces):
+    return "".join(rng.choice(PIECES) + rng.choice(SEPARATORS) for _ in range(num_pieces))
+
+
+class TestExtractAcronyms:
+    def test_example(self):
+        txt = ("The National Population and Housing Census (NPHC) was funded by the\n"
+               "International Development Association (IDA) and the (IDA) Trust Fund.")
+
+        assert acronyms.extract_acronyms(txt) == {
+            "NPHC": "National Population and Housing Census",
+            "IDA": "International Development Association",
+        }
+
+    def test_same_as_legacy(self):
+        rng = random.Random(1029)
+
+        for _ in range(500):
+            txt = random_text(rng, rng.randint(1, 60))
+            expected = legacy_extract_acronyms(txt)
+
+            # The original implementation returned {'': ''} for texts without acronyms.
+            expected.pop("", None)
+
+            assert acronyms.extract_acronyms(txt) == expected
+
+    def test_no_acronyms(self):
+        assert acronyms.extract_acronyms("No acronyms in this text.") == {}
+        assert acronyms.extract_acronyms_array("No acronyms in this text.") is None
+
+    def test_long_candidate_words(self):
+        # Words longer than the searched window are not cut.
+        txt = " ".join(["Global", "Alliance", "a" * 1000, "Zone", "(GAZ)"])
+
+        assert acronyms.extract_acronyms(txt) == legacy_extract_acronyms(txt)
@@ -0,0 +1,230 @@
+import pytest
+
+from wb_cleaning.ops import cache_utils, resources
+from wb_cleaning.ops.disk_cache import DiskCache
+
+
+class FakeRedis:
+    '''In-process stand-in of the redis hash commands that counts the round-trips.
+    '''
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def hget(self, name, key):
+        self.round_trips += 1
+        return self.data.get(name, {}).get(key)
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        self.round_trips += 1
+        self._hset(name, key, value, mapping)
+
+    def _hset(self, name, key=None, value=None, mapping=None):
+        bucket = self.data.setdefault(name, {})
+
+        items = dict(mapping or {})
+
+        if key is not None:
+            items[key] = value
+
+        for k, v in items.items():
+            bucket[self._str(k)] = v if isinstance(v, bytes) else str(v).encode('utf-8')
+
+    @staticmethod
+    def _str(key):
+        # Redis doesn't distinguish the bytes and str keys.
+        return key.decode('utf-8') if isinstance(key, bytes) else key
+
+    def _hmget(self, name, keys):
+        return [self.data.get(name, {}).get(key) for key in keys]
+
+    def _hsetnx(self, name, key, value):
+        bucket = self.data.setdefault(name, {})
+
+        if self._str(key) in bucket:
+            return 0
+
+        self._hset(name, key, value)
+        return 1
+
+    def hkeys(self, name):
+        self.round_trips += 1
+        return [key.encode('utf-8') for key in self.data.get(name, {})]
+
+    def hlen(self, name):
+        self.round_trips += 1
+        return len(self.data.get(name, {}))
+
+    def hdel(self, name, *keys):
+        self.round_trips += 1
+        return sum(self.data.get(name, {}).pop(key, None) is not None for key in keys)
+
+    def delete(self, *names):
+        self.round_trips += 1
+        return sum(self.data.pop(name, None) is not None for name in names)
+
+    def hscan_iter(self, name, match=None, count=None):
+        self.round_trips += 1
+        return iter([(key.encode('utf-8'), value) for key, value in self.data.get(name, {}).items()])
+
+    def memory_usage(self, key):
+        self.round_trips += 1
+        return sum(len(key) + len(value) for key, value in self.data.get(key, {}).items()) or None
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def hmget(self, name, keys):
+        self.commands.append(lambda: self.redis._hmget(name, keys))
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        self.commands.append(lambda: self.redis._hset(name, key, value, mapping))
+
+    def hsetnx(self, name, key, value):
+        self.commands.append(lambda: self.redis._hsetnx(name, key, value))
+
+    def execute(self):
+        self.redis.round_trips += 1
+        return [command() for command in self.commands]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+    resources.register('redis_cache', lambda: redis)
+    monkeypatch.setattr(cache_utils, '_REGISTERED_BUCKETS', set())
+    monkeypatch.setattr(cache_utils, 'BATCH_CHUNK_SIZE', 3)
+
+    yield redis
+
+    resources.register('redis_cache', cache_utils._connect_redis)
+
+
+def square(x, **kwargs):
+    return x * x
+
+
+class TestRedisCacher:
+    def test_cacher(self, fake_redis):
+        cached_square = cache_utils.redis_cacher(square)
+
+        assert cached_square(3, argument_hash='3') == 9
+        assert cached_square(3, argument_hash='3') == 9
+
+        # The bucket is registered only on the first call.
+        assert fake_redis.round_trips == 4
+        assert cache_utils.get_func_fullname(square) in fake_redis.data[cache_utils.CACHE_HASH_BUCKET]
+
+    def test_map(self, fake_redis):
+        cached_square = cache_utils.redis_cacher(square)
+        cached_square(2, argument_hash='2')
+        computed = []
+
+        def compute_many(keys):
+            computed.extend(keys)
+            return [int(key) ** 2 for key in keys]
+
+        round_trips = fake_redis.round_trips
+        keys = [str(i) for i in range(10)] + ['2', '5']
+
+        assert cached_square.map(keys, compute_many) == [int(key) ** 2 for key in keys]
+        assert sorted(computed, key=int) == [str(i) for i in range(10) if i != 2]
+        # One pipelined hmget and one pipelined hset regardless of the number of keys.
+        assert fake_redis.round_trips - round_trips == 2
+
+        computed.clear()
+        assert cached_square.map(keys, compute_many) == [int(key) ** 2 for key in keys]
+        assert computed == []
+        assert cached_square(7, argument_hash='7') == 49
+
+
+class TestNamespaces:
+    def test_namespaced_buckets(self, fake_redis):
+        cached_square = cache_utils.redis_cacher(square)
+        func_id = cache_utils.get_func_fullname(square)
+
+        assert cached_square(3, argument_hash='3', cache_namespace='a') == 9
+        cached_square.map(['1', '2'], lambda keys: [-1 for key in keys], namespace='b')
+
+        # The same key doesn't collide across namespaces.
+        assert cached_square(2, argument_hash='2', cache_namespace='a') == 4
+        assert cached_square.map(['2'], lambda keys: [0], namespace='b') == [-1]
+        assert cache_utils.list_namespaces(func_id) == ['a', 'b']
+        assert cache_utils.get_namespace_size(func_id, 'b')['count'] == 2
+
+    def test_copy_and_evict(self, fake_redis):
+        cached_square = cache_utils.redis_cacher(square)
+        func_id = cache_utils.get_func_fullname(square)
+
+        cached_square.map([str(i) for i in range(5)], lambda keys: [int(key) ** 2 for key in keys],
+                          namespace='a')
+        cached_square(1, argument_hash='1', cache_namespace='b')
+        fake_redis.data[cache_utils.get_bucket_id(func_id, 'b')]['1'] = b'-1'
+
+        assert cache_utils.copy_namespace(func_id, 'a', 'b') == 4
+        assert cached_square.map(['1', '4'], lambda keys: [0] * len(keys), namespace='b') == [-1, 16]
+        assert cache_utils.copy_namespace(func_id, 'a', 'b', overwrite=True) == 5
+        assert cached_square(1, argument_hash='1', cache_namespace='b') == 1
+
+        assert cache_utils.evict_namespace(func_id, 'a') == 5
+        assert cache_utils.list_namespaces(func_id) == ['b']
+        assert cache_utils.get_namespace_size(func_id, 'a') == dict(count=0, memory=None)
+
+    def test_legacy_bucket(self, fake_redis):
+        cached_square = cache_utils.redis_cacher(square)
+        func_id = cache_utils.get_func_fullname(square)
+
+        cached_square(2, argument_hash='2')
+        cached_square(3, argument_hash='3', cache_namespace='a')
+
+        # The values cached without a namespace are listed in the empty namespace.
+        assert cache_utils.list_namespaces(func_id) == ['', 'a']
+        assert cache_utils.get_namespace_size(func_id, '')['count'] == 1
+        assert cache_utils.copy_namespace(func_id, '', 'a') == 1
+        assert cache_utils.get_namespace_size(func_id, 'a')['count'] == 2
+
+
+class TestDiskCacher:
+    def test_map(self, tmp_path):
+        disk_cache = DiskCache(str(tmp_path / "cache.db"))
+        cached_square = cache_utils.make_disk_cacher(disk_cache)(square)
+        computed = []
+
+        def compute_many(keys):
+            computed.extend(keys)
+            return [int(key) ** 2 for key in keys]
+
+        assert cached_square(2, argument_hash='2') == 4
+
+        keys = ['1', '2', '3', '1']
+        assert cached_square.map(keys, compute_many) == [1, 4, 9, 1]
+        assert computed == ['1', '3']
+
+        computed.clear()
+        assert cached_square.map(keys, compute_many) == [1, 4, 9, 1]
+        assert computed == []
+        assert len(disk_cache) == 3
+
+    def test_namespaces(self, tmp_path):
+        disk_cache = DiskCache(str(tmp_path / "cache.db"))
+        cached_square = cache_utils.make_disk_cacher(disk_cache)(square)
+
+        assert cached_square(2, argument_hash='2', cache_namespace='a') == 4
+        assert cached_square.map(['2'], lambda keys: [-1], namespace='b') == [-1]
+        assert cached_square.map(['2'], lambda keys: [0], namespace='a') == [4]
+
+    def test_bounded(self, tmp_path):
+        disk_cache = DiskCache(str(tmp_path / "cache.db"), max_size=100)
+        cached_square = cache_utils.make_disk_cacher(disk_cache)(square)
+
+        cached_square.map([str(i) for i in range(100)], lambda keys: [int(key) ** 2 for key in keys])
+
+        assert disk_cache.size <= 100
+        assert disk_cache.stats()["evictions"] > 0
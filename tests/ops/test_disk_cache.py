@@ -0,0 +1,60 @@
+from wb_cleaning.ops.disk_cache import DiskCache, make_cache_key
+
+
+class TestDiskCache:
+    def test_get_set(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "cache.db"))
+        key = make_cache_key("some text", "config-id")
+
+        assert cache.get(key) is None
+
+        cache.set(key, ["some", "text"])
+
+        assert cache.get(key) == ["some", "text"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_persistence(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        DiskCache(path).set("key", {"tokens": ["a"]})
+
+        assert DiskCache(path).get("key") == {"tokens": ["a"]}
+
+    def test_make_cache_key(self):
+        assert make_cache_key("text", "config-a") == make_cache_key("text", "config-a")
+        assert make_cache_key("text", "config-a") != make_cache_key("text", "config-b")
+
+    def test_eviction(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "cache.db"), max_size=1000)
+
+        for i in range(100):
+            cache.set(f"key-{i}", ["token"] * 5)
+
+        assert cache.size <= 1000
+        assert cache.stats()["evictions"] > 0
+        # The most recently stored entries are kept.
+        assert "key-99" in cache
+        assert "key-0" not in cache
+
+    def test_hits_are_not_written(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "cache.db"))
+        cache.set("key", ["a"])
+        total_changes = cache.conn.total_changes
+
+        for _ in range(10):
+            assert cache.get("key") == ["a"]
+
+        assert cache.conn.total_changes == total_changes
+
+    def test_hits_keep_entries(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "cache.db"), max_size=1000)
+        cache.set("key-0", ["token"] * 5)
+
+        for i in range(1, 100):
+            # The buffered access time is written before evicting.
+            cache.get("key-0")
+            cache.set(f"key-{i}", ["token"] * 5)
+
+        assert cache.stats()["evictions"] > 0
+        assert "key-0" in cache
+        assert "key-1" not in cache
@@ -0,0 +1,49 @@
+import time
+
+from wb_cleaning.ops.memory_cache import MemoryCache
+
+
+class TestMemoryCache:
+    def test_get_set(self):
+        cache = MemoryCache()
+
+        assert cache.get("key") is None
+        cache["key"] = {"correct_word": "poverty"}
+
+        assert "key" in cache
+        assert cache["key"] == {"correct_word": "poverty"}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_max_items(self):
+        cache = MemoryCache(max_items=2)
+        cache["a"] = 1
+        cache["b"] = 2
+
+        # Accessing "a" makes "b" the least recently used.
+        assert cache["a"] == 1
+        cache["c"] = 3
+
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_max_bytes(self):
+        cache = MemoryCache(max_bytes=1000, sizeof=lambda key, value: 100)
+
+        for i in range(50):
+            cache[f"key-{i}"] = i
+
+        assert len(cache) == 10
+        assert cache.size <= 1000
+        assert "key-49" in cache
+        assert "key-0" not in cache
+
+    def test_ttl(self):
+        cache = MemoryCache(ttl=0.01)
+        cache["key"] = "value"
+        time.sleep(0.02)
+
+        assert cache.get("key") is None
+        assert len(cache) == 0
+        assert cache.stats()["expirations"] == 1
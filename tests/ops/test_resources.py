@@ -0,0 +1,34 @@
+import pytest
+
+from wb_cleaning.ops import resources
+
+
+class TestResources:
+    def test_get_loads_once(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return object()
+
+        resources.register("test_resource", loader)
+
+        assert not resources.is_loaded("test_resource")
+
+        value = resources.get("test_resource")
+
+        assert resources.is_loaded("test_resource")
+        assert value is resources.get("test_resource")
+        assert len(calls) == 1
+
+    def test_release(self):
+        resources.register("test_release", object)
+        value = resources.get("test_release")
+        resources.release("test_release")
+
+        assert not resources.is_loaded("test_release")
+        assert value is not resources.get("test_release")
+
+    def test_unregistered(self):
+        with pytest.raises(KeyError):
+            resources.get("test_unregistered")
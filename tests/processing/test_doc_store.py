@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pytest
+
+from wb_cleaning.processing.doc_store import SpillingDocCache, TokenIdCorpus, estimate_doc_size
+
+DOCS = [
+    ["world", "bank", "poverty"],
+    [],
+    ["bank", "loan", "world", "bank"],
+]
+
+
+class TestTokenIdCorpus:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "corpus")
+
+        assert TokenIdCorpus.write(path, iter(DOCS)) == len(DOCS)
+
+        corpus = TokenIdCorpus(path)
+
+        assert len(corpus) == len(DOCS)
+        assert list(corpus) == DOCS
+        assert corpus[-1] == DOCS[-1]
+        assert isinstance(corpus.tokens, np.memmap)
+        assert len(corpus.vocab) == 4
+
+    def test_empty_corpus(self, tmp_path):
+        path = str(tmp_path / "corpus")
+        TokenIdCorpus.write(path, [[], []])
+
+        assert list(TokenIdCorpus(path)) == [[], []]
+
+    def test_text_docs(self, tmp_path):
+        # Texts would otherwise be stored as sequences of characters.
+        with pytest.raises(TypeError):
+            TokenIdCorpus.write(str(tmp_path / "corpus"), [DOCS[0], "world bank"])
+
+
+class TestSpillingDocCache:
+    def test_spill_and_read_back(self, tmp_path):
+        max_bytes = estimate_doc_size(DOCS[0]) + estimate_doc_size(DOCS[2])
+        cache = SpillingDocCache(max_bytes, str(tmp_path / "docs"))
+
+        for i in range(10):
+            cache[i] = DOCS[i % len(DOCS)]
+
+        assert cache.memory_bytes <= max_bytes
+        assert cache.stats()["spilled_docs"] > 0
+        assert len(cache) == 10
+        assert [cache[i] for i in range(10)] == [DOCS[i % len(DOCS)] for i in range(10)]
+
+    def test_overwrite(self, tmp_path):
+        cache = SpillingDocCache(0, str(tmp_path / "docs"))
+        cache["a"] = DOCS[0]
+        cache["a"] = DOCS[2]
+
+        assert len(cache) == 1
+        assert cache["a"] == DOCS[2]
+        assert "b" not in cache
+
+    def test_shared_path(self, tmp_path):
+        path = str(tmp_path / "docs")
+        first = SpillingDocCache(0, path)
+        second = SpillingDocCache(0, path)
+        first["a"] = DOCS[0]
+        second["a"] = DOCS[2]
+
+        assert first["a"] == DOCS[0]
+        assert second["a"] == DOCS[2]
+
+        first.close()
+        second.close()
+
+        assert os.listdir(path) == []
+
+    def test_close_temporary_dir(self):
+        cache = SpillingDocCache(0)
+        cache["a"] = DOCS[0]
+
+        assert os.path.isdir(cache.path)
+
+        cache.close()
+
+        assert not os.path.exists(cache.path)
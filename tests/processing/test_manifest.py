@@ -0,0 +1,52 @@
+import os
+
+from wb_cleaning.processing.manifest import CorpusManifest
+
+
+class TestCorpusManifest:
+    def make_file(self, tmp_path, name="doc.txt", text="Some text"):
+        fpath = tmp_path / name
+        fpath.write_text(text)
+
+        return str(fpath)
+
+    def test_is_current(self, tmp_path):
+        fpath = self.make_file(tmp_path)
+        manifest = CorpusManifest(str(tmp_path / "manifest.sqlite"))
+
+        assert not manifest.is_current(fpath, "config-a")
+
+        manifest.update(fpath, "config-a")
+
+        assert manifest.is_current(fpath, "config-a")
+        assert not manifest.is_current(fpath, "config-b")
+
+    def test_changed_content(self, tmp_path):
+        fpath = self.make_file(tmp_path)
+        manifest = CorpusManifest(str(tmp_path / "manifest.sqlite"))
+        manifest.update(fpath, "config-a")
+
+        self.make_file(tmp_path, text="Some other text")
+
+        assert not manifest.is_current(fpath, "config-a")
+        assert [entry["fpath"] for entry in manifest.stale()] == [fpath]
+
+    def test_touched_file_is_current(self, tmp_path):
+        fpath = self.make_file(tmp_path)
+        manifest = CorpusManifest(str(tmp_path / "manifest.sqlite"))
+        manifest.update(fpath, "config-a")
+
+        os.utime(fpath, (0, 0))
+
+        assert manifest.is_current(fpath, "config-a")
+
+    def test_remove_missing(self, tmp_path):
+        kept = self.make_file(tmp_path, "kept.txt")
+        removed = self.make_file(tmp_path, "removed.txt")
+        manifest = CorpusManifest(str(tmp_path / "manifest.sqlite"))
+        manifest.update(kept, "config-a")
+        manifest.update(removed, "config-a")
+
+        assert [entry["fpath"] for entry in manifest.remove_missing([kept])] == [removed]
+        assert len(manifest) == 1
+        assert manifest.stale("config-b")[0]["fpath"] == kept